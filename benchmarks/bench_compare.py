@@ -0,0 +1,75 @@
+# bench_compare.py
+# Description: Cost of growing a multi-file comparison report from cached analyses.
+
+"""
+Build comparison reports over synthetic ``.IDE`` recordings:
+
+* ``cold``: the first ``--files - 1`` files, none analysed before
+* ``+1 file``: the same files plus one new file; only the new file should
+  be analysed, the others come from the analysis cache
+* ``warm``: the same report again, everything cached
+* ``re-hash``: reading every file to hash its contents, which the content
+  hash memo of the analysis cache saves on every cached file
+
+Analysis cache and columnar store are private temporary directories.
+
+Usage:
+    python benchmarks/bench_compare.py --files 30 --samples 2e5
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import warnings
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.synthetic import write_synthetic_ide  # noqa: E402
+from vibecheck.vc_cache import AnalysisCache, hash_file  # noqa: E402
+from vibecheck.vc_compare import build_comparison_report  # noqa: E402
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def run(n_files, n_samples, sample_rate, workers):
+    # endaq warns about empty low-frequency bands
+    warnings.simplefilter("ignore", RuntimeWarning)
+    import vibecheck.vc_cache as vc_cache
+    import vibecheck.vc_columnar as vc_columnar
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for i in range(n_files):
+            paths.append(os.path.join(tmp, f"site{i:02d}.IDE"))
+            write_synthetic_ide(paths[-1], n_samples, sample_rate, seed=10 * i)
+        vc_cache._default_cache = cache = AnalysisCache(os.path.join(tmp, "cache"))
+        vc_columnar._default_store = vc_columnar.ColumnarStore(os.path.join(tmp, "columnar"))
+        print(f"{n_files} files of {n_samples:.0f} samples per channel at {sample_rate:g} Hz, "
+              f"{os.path.getsize(paths[0]) / 1e6:.1f} MB each")
+
+        print(f"{'report':>9} {'files':>6} {'analysed':>9} {'time s':>8} {'HTML kB':>8}")
+        for label, files in (("cold", paths[:-1]), ("+1 file", paths), ("warm", paths)):
+            misses = cache.misses
+            html, elapsed = _timed(lambda: build_comparison_report(files, workers=workers))
+            print(f"{label:>9} {len(files):6d} {cache.misses - misses:9d} {elapsed:8.2f} "
+                  f"{len(html.encode('utf-8')) / 1e3:8.0f}")
+        _, elapsed = _timed(lambda: [hash_file(p) for p in paths])
+        print(f"{'re-hash':>9} {len(paths):6d} {'':>9} {elapsed:8.2f}")
+        vc_cache._default_cache = None
+        vc_columnar._default_store = None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Comparison report benchmark.")
+    parser.add_argument("--files", type=int, default=30)
+    parser.add_argument("--samples", type=float, default=2e5, help="Samples per channel")
+    parser.add_argument("--sample-rate", type=float, default=5000)
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args()
+    run(args.files, int(args.samples), args.sample_rate, args.workers)
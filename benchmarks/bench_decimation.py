@@ -0,0 +1,78 @@
+# bench_decimation.py
+# Description: Full-rate versus decimated PSD: time, memory and in-band error.
+
+"""
+Compare the Welch PSD at the native sample rate with the PSD of the same
+channel decimated to the VC band of interest (``vibecheck.vc_psd.DecimatedReader``):
+wall time, peak traced memory, Welch segment length, and the largest
+relative difference of the PSD and VC curves inside the band.
+
+The recording is generated once and held in memory, so the timings cover
+the analysis only.
+
+Usage:
+    python benchmarks/bench_decimation.py --minutes 10 --sample-rates 5000 20000
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+import warnings
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.synthetic import SyntheticChannelReader  # noqa: E402
+from vibecheck.vc_analyzer_endaq import analysis_params, vc_curves_from_psd  # noqa: E402
+from vibecheck.vc_psd import ArrayChannelReader, DecimatedReader, welch_streaming  # noqa: E402
+
+
+def _measure(fn):
+    """Return (result, wall seconds, peak traced bytes)."""
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def run(minutes, sample_rates):
+    # endaq warns about empty low-frequency bands
+    warnings.simplefilter("ignore", RuntimeWarning)
+    params = analysis_params(decimate=True)
+    band_hz = params["band_hz"]
+    # Preserve the upper edge of the highest band starting below band_hz
+    passband = band_hz * 2 ** (1 / params["octave_bins"])
+    print(f"Band of interest up to {band_hz:g} Hz (pass band {passband:.1f} Hz), "
+          f"{params['bin_width']:g} Hz bins, {minutes:g} min per channel")
+    print(f"{'rate':>8} {'q':>4} {'nperseg':>9} {'full s':>8} {'dec s':>8} {'full MB':>8} {'dec MB':>8} "
+          f"{'PSD err':>9} {'VC err':>9}")
+    for rate in sample_rates:
+        synthetic = SyntheticChannelReader(int(minutes * 60 * rate), rate)
+        reader = ArrayChannelReader(np.concatenate(list(synthetic.iter_blocks())), rate, synthetic.columns)
+        decimated = DecimatedReader(reader, passband, params["bin_width"])
+
+        full, t_full, m_full = _measure(lambda: welch_streaming(reader, params["bin_width"]))
+        reduced, t_dec, m_dec = _measure(lambda: welch_streaming(decimated, params["bin_width"]))
+
+        in_band = reduced.index[(reduced.index >= params["fstart"]) & (reduced.index <= band_hz)]
+        psd_err = np.max(np.abs(reduced.loc[in_band].to_numpy() / full.loc[in_band].to_numpy() - 1))
+        vc_full, vc_dec = vc_curves_from_psd(full, params), vc_curves_from_psd(reduced, params)
+        bands = vc_dec.index[vc_dec.index <= band_hz]
+        vc_err = np.max(np.abs(vc_dec.loc[bands].to_numpy() / vc_full.loc[bands].to_numpy() - 1))
+        print(f"{rate:>8g} {decimated.q:>4} {2 * (len(reduced) - 1):>9} {t_full:>8.2f} {t_dec:>8.2f} "
+              f"{m_full / 2 ** 20:>8.1f} {m_dec / 2 ** 20:>8.1f} {psd_err:>9.1e} {vc_err:>9.1e}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Decimation stage benchmark.")
+    parser.add_argument("--minutes", type=float, default=10.0)
+    parser.add_argument("--sample-rates", type=float, nargs="+", default=[5000.0, 20000.0])
+    args = parser.parse_args()
+    run(args.minutes, args.sample_rates)
@@ -0,0 +1,84 @@
+# bench_envelopes.py
+# Description: Percentile envelopes: streaming quantile sketches versus keeping every window's curves.
+
+"""
+Compute L10/L50/L90 envelopes of one channel's VC curves across time
+windows in two ways and compare time, peak traced memory and accuracy:
+
+* ``exact``: keep the curves of every window (``window_vc_curves``) and
+  take ``np.quantile`` at the end; memory grows with the recording
+* ``sketch``: ``vc_spectrogram.channel_envelopes``, each batch of windows
+  is counted into a ``QuantileSketch`` and dropped; memory is fixed by the
+  sketch's accuracy and range
+
+Both include the windowed Welch work itself (whose FFT batch buffer is the
+same for both), so the growth of the ``exact`` peak with the recording
+length is the figure to look at. The channel is generated once per length
+and held in memory before tracing starts.
+
+Usage:
+    python benchmarks/bench_envelopes.py --minutes 10 60 240 --sample-rate 1000
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+import warnings
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.synthetic import SyntheticChannelReader  # noqa: E402
+from vibecheck.vc_analyzer_endaq import analysis_params  # noqa: E402
+from vibecheck.vc_psd import ArrayChannelReader  # noqa: E402
+from vibecheck.vc_spectrogram import _plan_windows, channel_envelopes, window_vc_curves  # noqa: E402
+
+
+def _measure(fn):
+    """Return (result, wall seconds, peak traced bytes)."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def run(minutes_list, sample_rate, window_seconds):
+    # endaq warns about empty low-frequency bands
+    warnings.simplefilter("ignore", RuntimeWarning)
+    params = analysis_params(envelopes=True)
+    levels = params["envelopes"]["levels"]
+    print(f"{window_seconds:g} s windows at {sample_rate:g} Hz, levels {levels}, "
+          f"sketch accuracy {params['envelopes']['accuracy']:g}")
+    print(f"{'minutes':>8} {'windows':>8} {'exact s':>8} {'sketch s':>9} {'exact MB':>9} {'sketch MB':>10} "
+          f"{'max rel err':>12}")
+    for minutes in minutes_list:
+        synthetic = SyntheticChannelReader(int(minutes * 60 * sample_rate), sample_rate)
+        reader = ArrayChannelReader(np.concatenate(list(synthetic.iter_blocks())), sample_rate, synthetic.columns)
+
+        def exact():
+            curves, _ = window_vc_curves(reader, _plan_windows(reader, window_seconds), sample_rate,
+                                         params["bin_width"], params["fstart"], params["octave_bins"])
+            return np.concatenate([np.quantile(curves, 1 - level / 100, axis=0, method="lower")
+                                   for level in levels], axis=1), len(curves)
+
+        (reference, n_windows), exact_s, exact_peak = _measure(exact)
+        envelopes, sketch_s, sketch_peak = _measure(lambda: channel_envelopes(reader, params, window_seconds))
+        # Envelope columns are level-major, like the exact reference
+        error = np.nanmax(np.abs(envelopes.to_numpy() / reference - 1))
+        print(f"{minutes:8g} {n_windows:8d} {exact_s:8.2f} {sketch_s:9.2f} {exact_peak / 1e6:9.1f} "
+              f"{sketch_peak / 1e6:10.1f} {error:12.4f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Percentile envelope benchmark.")
+    parser.add_argument("--minutes", type=float, nargs="+", default=[10, 60, 240])
+    parser.add_argument("--sample-rate", type=float, default=1000)
+    parser.add_argument("--window", type=float, default=10, help="Window length in seconds")
+    args = parser.parse_args()
+    run(args.minutes, args.sample_rate, args.window)
@@ -0,0 +1,60 @@
+# bench_fft_plans.py
+# Description: Welch set-up cost with and without the shared plan cache.
+
+"""
+Time the per-channel Welch set-up (window, window power, FFT plan) for a
+batch of channels at the sample rates of the common enDAQ loggers, once
+building everything per channel (a fresh ``PlanCache`` each time, as before
+the cache existed) and once through the process-wide cache, then print the
+cache statistics served at ``/api/stats``.
+
+pocketfft also keeps its own plans, so after the first channel the "cold"
+path mainly pays for the window; the numbers are per-channel overhead,
+which matters most for the many short channels of a batch.
+
+Usage:
+    python benchmarks/bench_fft_plans.py --channels 200
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from vibecheck.vc_config import ANALYSIS_BIN_WIDTH  # noqa: E402
+from vibecheck.vc_fftplans import PlanCache, get_plan_cache  # noqa: E402
+
+RATES = (5000.0, 10000.0, 20000.0)
+
+
+def time_setup(n_channels, make_cache):
+    rng = np.random.default_rng(0)
+    start = time.perf_counter()
+    for i in range(n_channels):
+        # Measured rates differ slightly from file to file
+        rate = RATES[i % len(RATES)] * (1 + rng.normal(scale=1e-7))
+        # Segment length exactly as WelchAccumulator derives it
+        make_cache().welch_plan(int(rate / ANALYSIS_BIN_WIDTH))
+    return time.perf_counter() - start
+
+
+def run(n_channels):
+    cold = time_setup(n_channels, PlanCache)
+    shared = get_plan_cache()
+    warm = time_setup(n_channels, lambda: shared)
+    print(f"{n_channels} channels at {', '.join(f'{r:g}' for r in RATES)} Hz, {ANALYSIS_BIN_WIDTH:g} Hz bins")
+    print(f"  per-channel build: {cold / n_channels * 1e3:.2f} ms/channel")
+    print(f"  shared cache:      {warm / n_channels * 1e3:.3f} ms/channel ({cold / warm:.0f}x)")
+    print(json.dumps(get_plan_cache().stats(), indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="FFT plan cache benchmark.")
+    parser.add_argument("--channels", type=int, default=200)
+    args = parser.parse_args()
+    run(args.channels)
@@ -0,0 +1,90 @@
+# bench_import_time.py
+# Description: Cold-start benchmark for the Flask backend.
+
+"""
+Measure how long a fresh interpreter needs before the Flask backend can
+answer ``/api/health``, using ``python -X importtime``.
+
+Each run starts a new interpreter, imports ``vibecheck.flask_server`` and
+calls ``/api/health`` through the test client. Reported per run: the
+cumulative import time of the module, the time to the first health
+response, and whether any of the heavy analysis libraries were loaded.
+``--max-ms`` makes the script exit non-zero when the median time to health
+exceeds a budget, so it can guard against regressions.
+
+Usage:
+    python benchmarks/bench_import_time.py --runs 5 --top 15 --max-ms 500
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+HEAVY_MODULES = ("endaq", "idelib", "scipy", "pandas", "plotly", "matplotlib", "numpy")
+
+PROBE = f"""
+import json, sys, time
+start = time.perf_counter()
+from vibecheck.flask_server import app
+imported = time.perf_counter()
+app.test_client().get('/api/health')
+healthy = time.perf_counter()
+print(json.dumps({{
+    "import_ms": 1e3 * (imported - start),
+    "health_ms": 1e3 * (healthy - start),
+    "heavy": [m for m in {HEAVY_MODULES!r} if m in sys.modules],
+}}))
+"""
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+
+def parse_importtime(stderr):
+    """Return ``{module: (self_us, cumulative_us)}`` from ``-X importtime`` output."""
+    modules = {}
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, _, name = match.groups()
+            modules[name] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+def probe():
+    env = dict(os.environ, PYTHONPATH=ROOT + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", PROBE], cwd=ROOT, env=env,
+                          capture_output=True, text=True, check=True)
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result["modules"] = parse_importtime(proc.stderr)
+    return result
+
+
+def run(runs, top, max_ms):
+    results = [probe() for _ in range(runs)]
+    health = statistics.median(r["health_ms"] for r in results)
+    imports = statistics.median(r["import_ms"] for r in results)
+    print(f"vibecheck.flask_server import: {imports:.0f} ms (median of {runs})")
+    print(f"first /api/health response:   {health:.0f} ms")
+    print(f"heavy modules loaded at start: {', '.join(results[-1]['heavy']) or 'none'}")
+    print("\nslowest imports (cumulative, last run):")
+    modules = sorted(results[-1]["modules"].items(), key=lambda kv: kv[1][1], reverse=True)
+    for name, (self_us, cumulative_us) in modules[:top]:
+        print(f"  {cumulative_us / 1e3:8.1f} ms  {self_us / 1e3:8.1f} ms self  {name}")
+    if max_ms is not None and health > max_ms:
+        print(f"\nFAIL: time to health {health:.0f} ms exceeds budget of {max_ms:.0f} ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Flask backend cold-start benchmark.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="Slowest imports to list")
+    parser.add_argument("--max-ms", type=float, default=None, help="Fail above this median time to health")
+    args = parser.parse_args()
+    sys.exit(run(args.runs, args.top, args.max_ms))
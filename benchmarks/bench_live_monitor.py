@@ -0,0 +1,54 @@
+# bench_live_monitor.py
+# Description: Update latency and CPU cost of the live VC monitor.
+
+"""
+Replay a synthetic recording through ``vibecheck.vc_live.LiveMonitor`` as
+fast as possible and report, per published update, the wall-clock latency
+(new block in to VC curves out) and the CPU time spent, for a few window
+lengths. Memory is bounded by the window, not the recording, so the cost
+per update should stay flat however long the replay runs.
+
+Usage:
+    python benchmarks/bench_live_monitor.py --minutes 10 --windows 30 60 120
+"""
+
+import argparse
+import os
+import sys
+import time
+import warnings
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.synthetic import SyntheticChannelReader  # noqa: E402
+from vibecheck.vc_live import LiveMonitor, ReplaySource  # noqa: E402
+
+
+def run(minutes, sample_rate, windows, block_seconds):
+    # endaq warns about empty low-frequency octave bins on every update
+    warnings.simplefilter("ignore", RuntimeWarning)
+    n_samples = int(minutes * 60 * sample_rate)
+    print(f"Replaying {minutes:g} min at {sample_rate:g} Hz, {block_seconds:g} s blocks, one update per block")
+    print(f"{'window':>8} {'updates':>8} {'latency':>12} {'cpu':>12} {'wall':>8}")
+    for window in windows:
+        reader = SyntheticChannelReader(n_samples, sample_rate)
+        source = ReplaySource(reader, speed=None, block_seconds=block_seconds)
+        monitor = LiveMonitor(source, "bench", window_seconds=window, update_interval=0.0)
+        start = time.perf_counter()
+        monitor.start().join()
+        wall = time.perf_counter() - start
+        stats = monitor.to_dict()
+        if stats["status"] != "stopped":
+            raise RuntimeError(stats["error"])
+        print(f"{window:>6g} s {stats['updates']:>8} {stats['mean_latency_ms']:>9.2f} ms "
+              f"{stats['mean_cpu_ms']:>9.2f} ms {wall:>6.1f} s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Live monitor update latency benchmark.")
+    parser.add_argument("--minutes", type=float, default=10.0, help="Length of the replayed recording")
+    parser.add_argument("--sample-rate", type=float, default=5000.0)
+    parser.add_argument("--windows", type=float, nargs="+", default=[30, 60, 120], help="Window lengths in s")
+    parser.add_argument("--block-seconds", type=float, default=1.0)
+    args = parser.parse_args()
+    run(args.minutes, args.sample_rate, args.windows, args.block_seconds)
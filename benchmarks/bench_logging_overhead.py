@@ -0,0 +1,148 @@
+# bench_logging_overhead.py
+# Description: Per-request cost of logging, before and after the background log writer.
+
+"""
+Compare the logging a report request used to do on the request thread with
+what it does now.
+
+* before: ``analyze_endaq`` printed every step, the report builder logged
+  the analyzer output (including two ``DataFrame.head()`` renders) and
+  every figure at INFO through a synchronous file handler, and each
+  temporary-log message opened, appended to and closed the log file.
+* after: the same call sites at their current levels (DEBUG is off, so the
+  DataFrames are never rendered), INFO records handed to the
+  ``vc_logging`` background writer, and the temporary log written through
+  one open file handle by its own listener thread.
+
+Both variants write to files in a temporary directory. The time reported
+is what the request thread spends; the background writer's work runs
+concurrently (and is flushed, untimed, between rounds).
+
+Usage:
+    python benchmarks/bench_logging_overhead.py --requests 2000 --temp-messages 5
+"""
+
+import argparse
+import contextlib
+import datetime as dt
+import logging
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from vibecheck import vc_utils  # noqa: E402
+from vibecheck.vc_logging import start_listener  # noqa: E402
+
+FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
+
+
+def vc_frames():
+    """Two VC-curve frames shaped like a dual-sensor analysis (1/12 octave, 1-1000 Hz)."""
+    freqs = 2 ** np.arange(0, np.log2(1000), 1 / 12)
+    rng = np.random.default_rng(0)
+    return tuple(pd.DataFrame(rng.random((len(freqs), 3)), index=freqs, columns=["X", "Y", "Z"])
+                 for _ in range(2))
+
+
+def legacy_temp_log(path, message, level="INFO"):
+    """The previous ``vc_utils._write_to_temp_log``: open, append, close per message."""
+    timestamp = dt.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    with open(path, "a") as f:
+        f.write(f"[{timestamp}] [{level}] {message}\n")
+
+
+def request_before(logger, frames, temp_path, temp_messages):
+    source = "survey_0001.IDE"
+    print(f"Opening IDE file: {source}")
+    print("Successfully loaded IDE document")
+    print("Getting acceleration channels...")
+    print(f"Found {len(frames)} acceleration channels")
+    for i in range(len(frames)):
+        print(f"Calculating PSD and VC curves for channel {i}...")
+    print("Analysis complete")
+    logger.info(f"Analyzer output type: {type(frames)}")
+    for i, df in enumerate(frames):
+        logger.info(f"Sensor {i} DataFrame shape: {getattr(df, 'shape', None)}")
+        logger.info(f"Sensor {i} DataFrame head:\n{getattr(df, 'head', lambda: None)()}")
+    for i in range(len(frames)):
+        for ax in "XYZ":
+            logger.info(f"✓ Generated figure: Sensor {i} – {ax}")
+    logger.info("HTML Report saved to: report.html")
+    for n in range(temp_messages):
+        legacy_temp_log(temp_path, f"Progress message {n}")
+
+
+def request_after(logger, frames, temp_messages):
+    source = "survey_0001.IDE"
+    logger.debug("Opening IDE file: %s", source)
+    logger.debug("Found %d acceleration channels", len(frames))
+    for i in range(len(frames)):
+        logger.debug("Calculating PSD and VC curves for channel %s", i)
+    logger.debug("Analysis of %s complete", source)
+    if logger.isEnabledFor(logging.DEBUG):
+        for i, df in enumerate(frames):
+            logger.debug("Sensor %d DataFrame shape: %s\n%s", i, df.shape, df.head())
+    for i in range(len(frames)):
+        for ax in "XYZ":
+            logger.debug("Generated figure: %s – %s", f"Sensor {i}", ax)
+    logger.info("HTML Report saved to: %s", "report.html")
+    for n in range(temp_messages):
+        vc_utils._write_to_temp_log(f"Progress message {n}")
+
+
+def make_logger(name, handler):
+    logger = logging.getLogger(f"bench.{name}")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    logger.handlers = [handler]
+    return logger
+
+
+def run(requests, temp_messages):
+    frames = vc_frames()
+    with tempfile.TemporaryDirectory() as tmp:
+        # Before: prints to stdout, synchronous file handler, open-per-message temp log
+        sync_handler = logging.FileHandler(os.path.join(tmp, "before.log"), encoding="utf-8")
+        sync_handler.setFormatter(logging.Formatter(FORMAT))
+        before_logger = make_logger("before", sync_handler)
+        temp_path = os.path.join(tmp, "before_temp.txt")
+        with open(os.path.join(tmp, "stdout.txt"), "w") as out, contextlib.redirect_stdout(out):
+            start = time.perf_counter()
+            for _ in range(requests):
+                request_before(before_logger, frames, temp_path, temp_messages)
+            before = (time.perf_counter() - start) / requests
+        sync_handler.close()
+
+        # After: background writer for the log file and for the temporary log
+        file_handler = logging.FileHandler(os.path.join(tmp, "after.log"), encoding="utf-8")
+        file_handler.setFormatter(logging.Formatter(FORMAT))
+        queue_handler, listener = start_listener(file_handler)
+        after_logger = make_logger("after", queue_handler)
+        vc_utils._open_temp_log(os.path.join(tmp, "after_temp.txt"))
+        start = time.perf_counter()
+        for _ in range(requests):
+            request_after(after_logger, frames, temp_messages)
+        after = (time.perf_counter() - start) / requests
+        drain_start = time.perf_counter()
+        listener.close()
+        vc_utils._close_temp_log()
+        drain = time.perf_counter() - drain_start
+
+    print(f"{requests} requests, {temp_messages} temporary-log messages each")
+    print(f"before: {before * 1e6:8.1f} us/request on the request thread")
+    print(f"after:  {after * 1e6:8.1f} us/request on the request thread "
+          f"({before / after:.0f}x less; background writer drained in {drain:.2f} s)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-request logging overhead benchmark.")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--temp-messages", type=int, default=5, help="Temporary-log messages per request")
+    args = parser.parse_args()
+    run(args.requests, args.temp_messages)
@@ -0,0 +1,59 @@
+# bench_metrics_overhead.py
+# Description: Cost of the stage timers, enabled and disabled.
+
+"""
+Measure the per-call overhead of ``vibecheck.vc_metrics`` stage timers and
+counters with metrics enabled and disabled, and the overhead on a full
+streaming channel analysis (which records a handful of stages).
+
+Usage:
+    python benchmarks/bench_metrics_overhead.py --calls 200000
+"""
+
+import argparse
+import os
+import sys
+import time
+import warnings
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.synthetic import SyntheticChannelReader  # noqa: E402
+from vibecheck import vc_metrics  # noqa: E402
+from vibecheck.vc_analyzer_endaq import _analyze_source, analysis_params  # noqa: E402
+
+
+def per_call(registry, calls):
+    start = time.perf_counter()
+    for _ in range(calls):
+        with registry.stage("bench"):
+            pass
+        registry.inc("vibecheck_bench_total")
+    return (time.perf_counter() - start) / calls
+
+
+def run(calls, seconds):
+    warnings.simplefilter("ignore", RuntimeWarning)
+    enabled = vc_metrics.MetricsRegistry(enabled=True)
+    disabled = vc_metrics.MetricsRegistry(enabled=False)
+    print(f"stage + counter, enabled:  {per_call(enabled, calls) * 1e6:6.2f} us/call")
+    print(f"stage + counter, disabled: {per_call(disabled, calls) * 1e6:6.2f} us/call")
+
+    reader = SyntheticChannelReader(int(seconds * 5000), 5000.0)
+    params = analysis_params()
+    timings = {}
+    for label, registry in (("disabled", disabled), ("enabled", enabled)):
+        vc_metrics._registry = registry
+        start = time.perf_counter()
+        _analyze_source(reader, params)
+        timings[label] = time.perf_counter() - start
+    print(f"channel analysis ({seconds:g} s of data): disabled {timings['disabled']:.3f} s, "
+          f"enabled {timings['enabled']:.3f} s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Metrics overhead benchmark.")
+    parser.add_argument("--calls", type=int, default=200_000)
+    parser.add_argument("--seconds", type=float, default=600.0, help="Length of the analysed channel")
+    args = parser.parse_args()
+    run(args.calls, args.seconds)
@@ -0,0 +1,45 @@
+# bench_parallel_channels.py
+# Description: Wall-clock benchmark for per-channel parallel analysis.
+
+"""
+Time ``vibecheck.vc_analyzer_endaq.analyze_sources`` on synthetic
+dual-sensor (25g + 40g) recordings, sequentially and with a process pool.
+
+Usage:
+    python benchmarks/bench_parallel_channels.py --samples 20000000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.synthetic import SyntheticChannelReader  # noqa: E402
+from vibecheck.vc_analyzer_endaq import analysis_params, analyze_sources  # noqa: E402
+from vibecheck.vc_config import NUM_WORKERS  # noqa: E402
+
+
+def run(n_samples, n_channels, workers):
+    sources = [
+        SyntheticChannelReader(n_samples, name=f"{25 + 15 * i}g", seed=i)
+        for i in range(n_channels)
+    ]
+    params = analysis_params()
+    timings = {}
+    for label, n_workers in (("sequential", 1), ("parallel", workers)):
+        start = time.perf_counter()
+        analyze_sources(sources, params, workers=n_workers)
+        timings[label] = time.perf_counter() - start
+        print(f"{label:>10} ({n_workers} workers): {timings[label]:.2f} s")
+    print(f"speed-up: {timings['sequential'] / timings['parallel']:.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parallel per-channel analysis benchmark.")
+    parser.add_argument("--samples", type=int, default=20_000_000, help="Samples per channel")
+    parser.add_argument("--channels", type=int, default=2)
+    parser.add_argument("--workers", type=int, default=NUM_WORKERS)
+    args = parser.parse_args()
+    run(args.samples, args.channels, args.workers)
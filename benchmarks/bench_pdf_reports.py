@@ -0,0 +1,139 @@
+# bench_pdf_reports.py
+# Description: Benchmark for a 100-file PDF report campaign.
+
+"""
+Time VC classification and PDF assembly for a survey campaign of synthetic
+dual-sensor recordings.
+
+* classification: the old per-level ``np.all`` scan over every axis versus
+  ``summarize_frames`` (one ``searchsorted`` over all axes)
+* reports: ``write_pdf_report`` for every file, sequentially and with a
+  process pool (the work ``generate_pdf_reports`` does after analysis)
+* snapshots (``--snapshots``, needs Kaleido and Chrome): the same pool with
+  PNG snapshots, rendered by a new Kaleido renderer per file versus one
+  renderer per worker process (``generate_pdf_reports``)
+
+Usage:
+    python benchmarks/bench_pdf_reports.py --files 100 [--snapshots]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.synthetic import synthetic_vc_frames  # noqa: E402
+from vibecheck import vc_generate_pdf  # noqa: E402
+from vibecheck.vc_batch import summarize_frames  # noqa: E402
+from vibecheck.vc_config import PLOT_FREQ_RANGE, VC_THRESHOLDS  # noqa: E402
+from vibecheck.vc_generate_pdf import write_pdf_report  # noqa: E402
+
+
+def classify_per_level(frames, freq_range=PLOT_FREQ_RANGE, thresholds=VC_THRESHOLDS):
+    """Reference: the previous per-axis, per-level classification."""
+    fmin, fmax = freq_range
+    levels = sorted(thresholds.items(), key=lambda x: x[1])
+    result = []
+    for df in frames:
+        band = df[(df.index >= fmin) & (df.index <= fmax)]
+        for col in band.columns:
+            arr = np.asarray(list(band[col].to_numpy()), dtype=float)
+            result.append(next((name for name, limit in levels if np.all(arr <= limit)), None))
+    return result
+
+
+def _write(args):
+    frames, pdf_out, title = args
+    return write_pdf_report(frames, pdf_out, title)
+
+
+def _write_with_snapshots(args, renderer):
+    from vibecheck.vc_plot_sensor_data import build_vc_figure_specs, sensor_name
+
+    frames, pdf_out, title = args
+    ide_path = os.path.join(os.path.dirname(pdf_out), title)
+    specs = build_vc_figure_specs([{"name": sensor_name(i), "df": df} for i, df in enumerate(frames)])
+    snapshots = vc_generate_pdf._batch_snapshots(renderer.submit(specs, ide_path), timeout=120)
+    try:
+        return write_pdf_report(frames, pdf_out, title, snapshots), len(snapshots)
+    finally:
+        renderer.release(ide_path)
+
+
+def _write_renderer_per_file(args):
+    from vibecheck.vc_snapshots import SnapshotRenderer
+
+    renderer = SnapshotRenderer()
+    try:
+        return _write_with_snapshots(args, renderer)
+    finally:
+        renderer.shutdown()
+
+
+def _write_renderer_per_worker(args):
+    return _write_with_snapshots(args, vc_generate_pdf._worker_renderer)
+
+
+def run_snapshots(jobs, workers):
+    """Time the pool with snapshots, one renderer per file versus per worker."""
+    timings = {}
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        rendered = sum(n for _, n in pool.map(_write_renderer_per_file, jobs))
+    timings["per file"] = time.perf_counter() - start
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=vc_generate_pdf._init_pdf_worker) as pool:
+        rendered += sum(n for _, n in pool.map(_write_renderer_per_worker, jobs))
+    timings["per worker"] = time.perf_counter() - start
+    if not rendered:
+        print("snapshots: none rendered (is Kaleido/Chrome installed?)")
+    for label, seconds in timings.items():
+        print(f"renderer {label:>10}: {seconds:.2f} s ({len(jobs) / seconds:.1f} reports/sec)")
+
+
+def run(n_files, workers, snapshots=False):
+    campaign = [synthetic_vc_frames(n_sensors=2, seed=seed) for seed in range(n_files)]
+
+    start = time.perf_counter()
+    for frames in campaign:
+        classify_per_level(frames)
+    loop = time.perf_counter() - start
+    start = time.perf_counter()
+    for frames in campaign:
+        summarize_frames(frames)
+    vectorized = time.perf_counter() - start
+    print(f"classification: per-level {loop * 1e3:.1f} ms, vectorized {vectorized * 1e3:.1f} ms "
+          f"({n_files} files)")
+
+    with tempfile.TemporaryDirectory() as out:
+        jobs = [(frames, os.path.join(out, f"file_{i:03d}.pdf"), f"file_{i:03d}.IDE")
+                for i, frames in enumerate(campaign)]
+        timings = {}
+        start = time.perf_counter()
+        for job in jobs:
+            _write(job)
+        timings["sequential"] = time.perf_counter() - start
+        start = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(_write, jobs))
+        timings["parallel"] = time.perf_counter() - start
+        if snapshots:
+            run_snapshots(jobs, workers)
+    for label, seconds in timings.items():
+        print(f"{label:>10}: {seconds:.2f} s ({n_files / seconds:.1f} reports/sec)")
+    print(f"speed-up: {timings['sequential'] / timings['parallel']:.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="PDF report campaign benchmark.")
+    parser.add_argument("--files", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--snapshots", action="store_true", help="Also time reports with PNG snapshots")
+    args = parser.parse_args()
+    run(args.files, args.workers, args.snapshots)
@@ -0,0 +1,67 @@
+# bench_report_encoding.py
+# Description: Figure serialization cost, legacy JSON vs compact encoding.
+
+"""
+Compare the previous figure serialization (``go.Figure`` ->
+``fig.to_dict()`` -> ``json.dumps(cls=PlotlyJSONEncoder)`` with the VC
+threshold shapes repeated on every figure) against the compact encoding
+(plain-dict specs, shared VC template, base64 typed arrays).
+
+Usage:
+    python benchmarks/bench_report_encoding.py --repeats 20
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import plotly  # noqa: E402
+
+from benchmarks.synthetic import synthetic_vc_frames  # noqa: E402
+from vibecheck.vc_plot_sensor_data import (  # noqa: E402
+    build_vc_figure_specs,
+    encode_figure_spec,
+    sensor_name,
+    spec_to_figure,
+    vc_threshold_template,
+)
+
+
+def legacy(sensors):
+    figs = [spec_to_figure(spec) for spec in build_vc_figure_specs(sensors)]
+    return [json.dumps(fig.to_dict(), cls=plotly.utils.PlotlyJSONEncoder) for fig in figs]
+
+
+def compact(sensors):
+    payloads = [encode_figure_spec(spec) for spec in build_vc_figure_specs(sensors)]
+    return [json.dumps(vc_threshold_template())] + payloads
+
+
+def run(repeats, fmax):
+    sensors = [{"name": sensor_name(i), "df": df}
+               for i, df in enumerate(synthetic_vc_frames(fmax=fmax))]
+    print(f"{'encoding':>8} {'ms/report':>10} {'payload KB':>11}")
+    results = {}
+    for label, fn in (("legacy", legacy), ("compact", compact)):
+        fn(sensors)  # warm up
+        start = time.perf_counter()
+        for _ in range(repeats):
+            payloads = fn(sensors)
+        ms = (time.perf_counter() - start) / repeats * 1e3
+        size = sum(len(p) for p in payloads) / 1024
+        results[label] = (ms, size)
+        print(f"{label:>8} {ms:>10.2f} {size:>11.1f}")
+    print(f"time ratio: {results['compact'][0] / results['legacy'][0]:.2f}, "
+          f"size ratio: {results['compact'][1] / results['legacy'][1]:.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Figure serialization benchmark.")
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--fmax", type=float, default=2500.0, help="Highest VC band (sets points per trace)")
+    args = parser.parse_args()
+    run(args.repeats, args.fmax)
@@ -0,0 +1,59 @@
+# bench_report_modes.py
+# Description: Size and latency of reports with inline vs shared Plotly.js.
+
+"""
+Render the same six-figure report with each Plotly.js mode and compare the
+HTML size, render time, and the bytes a client downloads for a series of
+reports (the shared bundle is fetched once and then served from cache).
+
+Usage:
+    python benchmarks/bench_report_modes.py --reports 10
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.synthetic import synthetic_vc_frames  # noqa: E402
+from vibecheck.vc_plot_sensor_data import (  # noqa: E402
+    build_vc_figure_specs,
+    get_plotly_js,
+    render_report_html,
+    sensor_name,
+)
+
+
+def run(n_reports, repeats):
+    sensors = [{"name": sensor_name(i), "df": df} for i, df in enumerate(synthetic_vc_frames())]
+    figs = build_vc_figure_specs(sensors)
+    bundle = len(get_plotly_js().encode("utf-8"))
+
+    get_plotly_js.cache_clear()
+    start = time.perf_counter()
+    get_plotly_js()
+    first_extract = time.perf_counter() - start
+    print(f"Plotly.js bundle: {bundle / 1024 ** 2:.2f} MB, first extraction {first_extract * 1e3:.1f} ms")
+
+    out_dir = tempfile.mkdtemp(prefix="vc_bench_")
+    print(f"{'mode':>8} {'HTML KB':>9} {'render ms':>10} {f'{n_reports} reports MB':>15}")
+    for mode in ("inline", "shared", "sidecar"):
+        html_out = os.path.join(out_dir, f"report_{mode}.html")
+        start = time.perf_counter()
+        for _ in range(repeats):
+            html = render_report_html(figs, "bench", plotly_js=mode, html_out=html_out)
+        render_ms = (time.perf_counter() - start) / repeats * 1e3
+        size = len(html.encode("utf-8"))
+        transfer = n_reports * size + (bundle if mode != "inline" else 0)
+        print(f"{mode:>8} {size / 1024:>9.1f} {render_ms:>10.1f} {transfer / 1024 ** 2:>15.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report size/latency per Plotly.js mode.")
+    parser.add_argument("--reports", type=int, default=10, help="Reports viewed by one client")
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+    run(args.reports, args.repeats)
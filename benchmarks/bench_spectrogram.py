@@ -0,0 +1,98 @@
+# bench_spectrogram.py
+# Description: VC spectrogram: per-window Welch loop versus batched windows, and the parallel file path.
+
+"""
+Time the VC curves of every window of a long channel.
+
+* ``loop``: one ``WelchAccumulator`` and one VC-curve integration per
+  window, the straightforward way to window the whole-file analysis
+* ``batched``: ``vc_spectrogram.window_vc_curves``, segments of several
+  windows in one FFT, summed per window with ``reduceat``, and one VC-curve
+  integration per batch
+
+Both run in-process on the same in-memory channel (generated once), so the
+timings cover the analysis only; the largest relative difference between
+the two is printed as a check. With ``--ide`` the recording is also written
+as a dual-sensor ``.IDE`` file and ``vc_spectrogram`` is timed end to end
+from its columnar sidecar (created before timing) with ``--workers``
+processes.
+
+Usage:
+    python benchmarks/bench_spectrogram.py --minutes 60 --window 10 --ide --workers 4
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import warnings
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.synthetic import SyntheticChannelReader, write_synthetic_ide  # noqa: E402
+from vibecheck.vc_config import ANALYSIS_BIN_WIDTH, ANALYSIS_FSTART, ANALYSIS_OCTAVE_BINS  # noqa: E402
+from vibecheck.vc_octave import vc_curves_array  # noqa: E402
+from vibecheck.vc_psd import ArrayChannelReader, WelchAccumulator  # noqa: E402
+from vibecheck.vc_spectrogram import vc_spectrogram, window_vc_curves  # noqa: E402
+
+
+def per_window_loop(data, sample_rate, window_rows):
+    curves = []
+    for start in range(0, len(data) - window_rows + 1, window_rows):
+        acc = WelchAccumulator(sample_rate, ANALYSIS_BIN_WIDTH, data.shape[1])
+        acc.update(data[start:start + window_rows])
+        vc, _ = vc_curves_array(acc.psd().T, acc.freqs, ANALYSIS_FSTART, ANALYSIS_OCTAVE_BINS)
+        curves.append(vc.T)
+    return np.stack(curves)
+
+
+def run(minutes, sample_rate, window_seconds, ide, workers):
+    # endaq warns about empty low-frequency bands
+    warnings.simplefilter("ignore", RuntimeWarning)
+    n_samples = int(minutes * 60 * sample_rate)
+    synthetic = SyntheticChannelReader(n_samples, sample_rate)
+    data = np.concatenate(list(synthetic.iter_blocks()))
+    reader = ArrayChannelReader(data, sample_rate, synthetic.columns)
+    window_rows = int(round(window_seconds * sample_rate))
+    n_windows = n_samples // window_rows
+    edges = reader.timestamp_ns(0) + int(round(window_seconds * 1e9)) * np.arange(n_windows + 1, dtype=np.int64)
+    print(f"{minutes:g} min at {sample_rate:g} Hz, {n_windows} windows of {window_seconds:g} s, 3 axes")
+
+    start = time.perf_counter()
+    loop = per_window_loop(data, sample_rate, window_rows)
+    loop_s = time.perf_counter() - start
+    start = time.perf_counter()
+    batched, _ = window_vc_curves(reader, edges, sample_rate)
+    batched_s = time.perf_counter() - start
+    error = np.max(np.abs(batched - loop) / np.abs(loop).max())
+    print(f"loop:    {loop_s:7.2f} s")
+    print(f"batched: {batched_s:7.2f} s ({loop_s / batched_s:.1f}x; max rel. difference {error:.1e})")
+
+    if ide:
+        import vibecheck.vc_columnar as vc_columnar
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "spectrogram.IDE")
+            write_synthetic_ide(path, n_samples, sample_rate)
+            # A private sidecar store, so the user's store is left alone
+            vc_columnar._default_store = vc_columnar.ColumnarStore(os.path.join(tmp, "columnar"))
+            vc_columnar._default_store.ensure(path)
+            start = time.perf_counter()
+            spectrograms = vc_spectrogram(path, window_seconds, workers=workers)
+            elapsed = time.perf_counter() - start
+            vc_columnar._default_store = None
+        print(f"vc_spectrogram (2 channels, columnar, {workers} workers): {elapsed:.2f} s; "
+              f"classes of the 25g windows: {sorted({str(c) for c in spectrograms[0].vc_class})}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="VC spectrogram benchmark.")
+    parser.add_argument("--minutes", type=float, default=10)
+    parser.add_argument("--sample-rate", type=float, default=5000)
+    parser.add_argument("--window", type=float, default=10, help="Window length in seconds")
+    parser.add_argument("--ide", action="store_true", help="Also time vc_spectrogram on an IDE file")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+    run(args.minutes, args.sample_rate, args.window, args.ide, args.workers)
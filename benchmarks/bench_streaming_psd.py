@@ -0,0 +1,68 @@
+# bench_streaming_psd.py
+# Description: Peak-memory benchmark for the streaming Welch PSD.
+
+"""
+Compare peak memory and wall time of the in-memory PSD path
+(``to_dataframe`` + ``endaq.calc.psd.welch``) against
+``vibecheck.vc_psd.welch_streaming`` on synthetic recordings.
+
+The in-memory path is only run up to ``--inmemory-max-gb`` since it has to
+hold the whole recording; the streaming path is run on the full size.
+
+Usage:
+    python benchmarks/bench_streaming_psd.py --gigabytes 2
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import endaq  # noqa: E402
+
+from benchmarks.synthetic import SyntheticChannelReader  # noqa: E402
+from vibecheck.vc_config import ANALYSIS_BIN_WIDTH  # noqa: E402
+from vibecheck.vc_psd import welch_streaming  # noqa: E402
+
+
+def _measure(fn):
+    """Return (wall seconds, peak traced bytes); timed untraced since tracemalloc slows pandas."""
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def run(gigabytes, sample_rate, inmemory_max_gb):
+    reader = SyntheticChannelReader(1, sample_rate)
+    n_samples = int(gigabytes * 1024 ** 3 / (8 * (len(reader.columns) + 1)))
+    sizes = sorted({n_samples, n_samples // 10, n_samples // 100})
+    print(f"{'samples':>14} {'equiv GB':>9} {'mode':>10} {'seconds':>9} {'peak MB':>9}")
+    for n in sizes:
+        reader = SyntheticChannelReader(n, sample_rate)
+        gb = reader.nbytes / 1024 ** 3
+        modes = [("streaming", lambda: welch_streaming(reader, ANALYSIS_BIN_WIDTH))]
+        if gb <= inmemory_max_gb:
+            modes.append(("in-memory", lambda: endaq.calc.psd.welch(
+                reader.to_dataframe(), bin_width=ANALYSIS_BIN_WIDTH)))
+        for mode, fn in modes:
+            elapsed, peak = _measure(fn)
+            print(f"{n:>14,} {gb:>9.2f} {mode:>10} {elapsed:>9.2f} {peak / 1024 ** 2:>9.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Streaming PSD memory benchmark.")
+    parser.add_argument("--gigabytes", type=float, default=2.0,
+                        help="Equivalent in-memory size of the largest recording")
+    parser.add_argument("--sample-rate", type=float, default=5000.0)
+    parser.add_argument("--inmemory-max-gb", type=float, default=0.5,
+                        help="Largest recording to also run through the in-memory path")
+    args = parser.parse_args()
+    run(args.gigabytes, args.sample_rate, args.inmemory_max_gb)
@@ -0,0 +1,92 @@
+# bench_time_window.py
+# Description: Analysis time of a time window versus the whole recording.
+
+"""
+Analyse time windows of increasing length from one synthetic ``.IDE``
+recording and report the time against the window length, for both read
+paths of ``analyze_endaq``:
+
+* ``ide``: the IDE file is parsed; only the data blocks overlapping the
+  window are decoded (``readData`` with ``startTime``/``endTime``)
+* ``columnar``: the columnar sidecar (created before timing) is memory
+  mapped; the window is found by binary search on the time column
+* ``cold``: ``columnar`` enabled but no sidecar yet (deleted before every
+  run): a window is read from the IDE file rather than ingesting the whole
+  recording, and only the whole-file run pays for creating the sidecar
+
+With the selection pushed down to the readers the cost follows the window,
+not the file: the last column is the time per analysed second of data,
+which should stay roughly flat. The analysis cache is off and channels are
+analysed in-process.
+
+Usage:
+    python benchmarks/bench_time_window.py --samples 2e6 --fractions 0.05 0.1 0.5 1
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+import warnings
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.synthetic import write_synthetic_ide  # noqa: E402
+from vibecheck.vc_analyzer_endaq import analyze_endaq  # noqa: E402
+from vibecheck.vc_columnar import ColumnarStore  # noqa: E402
+
+
+def _median_time(fn, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def run(n_samples, sample_rate, fractions, repeats):
+    # endaq warns about empty low-frequency bands, and about short windows
+    warnings.simplefilter("ignore", RuntimeWarning)
+    warnings.simplefilter("ignore", UserWarning)
+    import vibecheck.vc_columnar as vc_columnar
+
+    duration = n_samples / sample_rate
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "window.IDE")
+        write_synthetic_ide(path, n_samples, sample_rate)
+        # A private sidecar store, so the user's store is left alone
+        vc_columnar._default_store = ColumnarStore(os.path.join(tmp, "columnar"))
+        vc_columnar._default_store.ensure(path)
+
+        print(f"{n_samples:.0f} samples per channel at {sample_rate:g} Hz ({duration:g} s), "
+              f"{os.path.getsize(path) / 1e6:.0f} MB")
+        print(f"{'path':>9} {'window s':>9} {'time s':>8} {'ms per s':>9}")
+        store = vc_columnar._default_store
+        for label, columnar in (("ide", False), ("columnar", True), ("cold", True)):
+            for fraction in fractions:
+                window = duration * fraction
+                # Centred in the recording
+                start = (duration - window) / 2
+                kwargs = {} if fraction >= 1 else {"start": start, "end": start + window}
+
+                def analyze():
+                    if label == "cold":
+                        store.discard(path)
+                    analyze_endaq(path, use_cache=False, workers=1, columnar=columnar, **kwargs)
+                elapsed = _median_time(analyze, repeats)
+                print(f"{label:>9} {window:9.1f} {elapsed:8.3f} {1e3 * elapsed / window:9.2f}")
+        vc_columnar._default_store = None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time-window analysis benchmark.")
+    parser.add_argument("--samples", type=float, default=2e6, help="Samples per channel")
+    parser.add_argument("--sample-rate", type=float, default=5000)
+    parser.add_argument("--fractions", type=float, nargs="+", default=[0.05, 0.1, 0.5, 1.0],
+                        help="Window lengths as fractions of the recording")
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+    run(int(args.samples), args.sample_rate, args.fractions, args.repeats)
@@ -0,0 +1,106 @@
+# bench_upload_latency.py
+# Description: End-to-end /api/analyze latency versus upload size.
+
+"""
+Compare the request I/O path of the old upload handling (``file.save`` to a
+temp dir, report written to disk and read back by ``send_file``) with the
+in-place path of ``vibecheck.vc_upload`` (upload parsed straight into the
+buffer the analysis reads, report returned from memory).
+
+The analysis itself is replaced by a full read of the uploaded data plus a
+fixed-size report, so only the I/O overhead is measured. With ``--ide`` the
+real ``/api/analyze`` endpoint is timed as well; after the first request the
+analysis is served from the cache, so the remaining latency is upload
+handling and report rendering.
+
+Usage:
+    python benchmarks/bench_upload_latency.py --sizes 1 10 50 100 --runs 3
+    python benchmarks/bench_upload_latency.py --ide recording.IDE
+"""
+
+import argparse
+import io
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+from flask import Flask, Response, request
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from vibecheck.vc_cache import hash_file  # noqa: E402
+from vibecheck.vc_upload import UploadRequest, upload_source  # noqa: E402
+
+REPORT = "<html>" + "x" * 50_000 + "</html>"  # about the size of a shared-mode report
+
+
+def make_app(in_place):
+    app = Flask(__name__)
+    if in_place:
+        app.request_class = UploadRequest
+
+    @app.route("/analyze", methods=["POST"])
+    def analyze():
+        file = request.files["file"]
+        if in_place:
+            hash_file(upload_source(file))
+            return Response(REPORT, mimetype="text/html")
+        temp_dir = tempfile.mkdtemp(prefix="vcbench_")
+        try:
+            path = os.path.join(temp_dir, "upload.IDE")
+            file.save(path)
+            hash_file(path)
+            html_path = os.path.join(temp_dir, "report.html")
+            with open(html_path, "w", encoding="utf-8") as f:
+                f.write(REPORT)
+            with open(html_path, "rb") as f:
+                # Read fully before the directory goes away, like send_file would
+                return Response(f.read(), mimetype="text/html")
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    return app
+
+
+def time_post(client, url, payload, name, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        rv = client.post(url, data={"file": (io.BytesIO(payload), name)}, content_type="multipart/form-data")
+        rv.get_data()
+        timings.append(time.perf_counter() - start)
+        assert rv.status_code == 200, rv.status_code
+    return statistics.median(timings)
+
+
+def run(sizes_mb, runs, ide):
+    clients = {label: make_app(in_place).test_client()
+               for label, in_place in (("temp-dir", False), ("in-place", True))}
+    print(f"{'upload':>10} {'temp-dir':>10} {'in-place':>10} {'speed-up':>9}")
+    for size_mb in sizes_mb:
+        payload = os.urandom(int(size_mb * 1024 * 1024))
+        t = {label: time_post(client, "/analyze", payload, "bench.IDE", runs)
+             for label, client in clients.items()}
+        print(f"{size_mb:>7g} MB {t['temp-dir'] * 1e3:>7.0f} ms {t['in-place'] * 1e3:>7.0f} ms "
+              f"{t['temp-dir'] / t['in-place']:>8.2f}x")
+
+    if ide:
+        from vibecheck.flask_server import app
+        with open(ide, "rb") as f:
+            payload = f.read()
+        client = app.test_client()
+        time_post(client, "/api/analyze", payload, os.path.basename(ide), 1)  # fill the cache
+        latency = time_post(client, "/api/analyze", payload, os.path.basename(ide), runs)
+        print(f"\n/api/analyze, {len(payload) / 2**20:.1f} MB IDE (cached analysis): {latency * 1e3:.0f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Upload handling latency benchmark.")
+    parser.add_argument("--sizes", type=float, nargs="+", default=[1, 10, 50, 100], help="Upload sizes in MB")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--ide", help="Also time the real /api/analyze endpoint with this IDE file")
+    args = parser.parse_args()
+    run(args.sizes, args.runs, args.ide)
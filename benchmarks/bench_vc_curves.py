@@ -0,0 +1,66 @@
+# bench_vc_curves.py
+# Description: Per-channel endaq VC curves versus the stacked vc_octave engine.
+
+"""
+Time the PSD -> VC-curve step for a batch of channels: ``endaq.calc.psd.vc_curves``
+once per channel DataFrame (the previous path) against
+``vibecheck.vc_octave``, both on stacked arrays (``vc_curves_array``) and
+with DataFrames in and out (``vc_curves_frames``).
+
+Usage:
+    python benchmarks/bench_vc_curves.py --channels 16 64 256
+"""
+
+import argparse
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import endaq  # noqa: E402
+
+from benchmarks.synthetic import SyntheticChannelReader  # noqa: E402
+from vibecheck.vc_config import ANALYSIS_BIN_WIDTH, ANALYSIS_FSTART, ANALYSIS_OCTAVE_BINS  # noqa: E402
+from vibecheck.vc_octave import vc_curves_array, vc_curves_frames  # noqa: E402
+from vibecheck.vc_psd import welch_streaming  # noqa: E402
+
+
+def best_of(fn, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def run(channel_counts, sample_rate, runs):
+    # endaq warns about empty low-frequency bands on every call
+    warnings.simplefilter("ignore", RuntimeWarning)
+    base = welch_streaming(SyntheticChannelReader(int(30 * sample_rate), sample_rate), ANALYSIS_BIN_WIDTH)
+    rng = np.random.default_rng(0)
+    kwargs = dict(fstart=ANALYSIS_FSTART, octave_bins=ANALYSIS_OCTAVE_BINS)
+    print(f"{len(base)} PSD bins per axis, {ANALYSIS_OCTAVE_BINS:g} bands per octave")
+    print(f"{'channels':>9} {'endaq':>10} {'frames':>10} {'array':>10} {'frames x':>9} {'array x':>8}")
+    for n in channel_counts:
+        psds = [base * rng.lognormal(0.0, 0.5) for _ in range(n)]
+        stacked = np.stack([psd.to_numpy().T for psd in psds])
+        freqs = base.index.to_numpy()
+        t_endaq = best_of(lambda: [endaq.calc.psd.vc_curves(psd, **kwargs) for psd in psds], runs)
+        t_frames = best_of(lambda: vc_curves_frames(psds, **kwargs), runs)
+        t_array = best_of(lambda: vc_curves_array(stacked, freqs, **kwargs), runs)
+        print(f"{n:>9} {t_endaq * 1e3:>7.1f} ms {t_frames * 1e3:>7.1f} ms {t_array * 1e3:>7.2f} ms "
+              f"{t_endaq / t_frames:>8.1f}x {t_endaq / t_array:>7.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="VC-curve engine benchmark.")
+    parser.add_argument("--channels", type=int, nargs="+", default=[16, 64, 256])
+    parser.add_argument("--sample-rate", type=float, default=5000.0)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    run(args.channels, args.sample_rate, args.runs)
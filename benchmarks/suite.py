@@ -0,0 +1,343 @@
+# suite.py
+# Description: Reproducible end-to-end benchmark suite with baseline comparison.
+
+"""
+Time the analysis and report path on synthetic ``.IDE`` recordings of
+increasing size and compare the results against a stored baseline.
+
+For every size (samples per channel, 10^5 and up) a dual-sensor recording
+is written with ``benchmarks.synthetic.write_synthetic_ide`` (deterministic
+for a given seed; reused from ``--data-dir`` when it already exists), and
+these cases are timed:
+
+* ``ide_parse``: parse one channel of the file (``IDEChannelSource.open``)
+* ``psd``: Welch PSD of that channel (``vc_psd.channel_psd``)
+* ``vc_curves``: VC curves from that PSD (``vc_curves_from_psd``)
+* ``analyze_endaq``: the whole analysis parsing the IDE file, cache off
+* ``analyze_columnar``: the same, read from the file's columnar sidecar
+  (created before timing)
+* ``create_vc_plots_plotly``: HTML report from the file, analysis cache
+  cold, columnar sidecar present
+* ``api_analyze``: ``POST /api/analyze`` through the Flask test client,
+  analysis cache cold
+
+Every case first runs once untimed on a tiny recording (imports, plan
+caches, Plotly.js), then ``--repeats`` times per size; the median is what
+gets compared. Results are written as JSON. With ``--baseline``, each case
+whose median is more than ``--tolerance`` (relative) and ``--min-delta``
+(absolute, to ignore timer noise on fast cases) slower than the baseline
+is reported as a regression and the script exits with status 1.
+Baselines are only comparable on the same machine and settings; the
+environment is stored with the results and differences are warned about.
+
+A 10^9-sample dual-sensor recording is about 25 GB on disk.
+
+Usage:
+    python benchmarks/suite.py --sizes 1e5 1e6 1e7 --output results.json
+    python benchmarks/suite.py --sizes 1e5 1e6 1e7 --baseline results.json
+"""
+
+import argparse
+import datetime as dt
+import io
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.synthetic import IDE_CHANNEL_IDS, write_synthetic_ide  # noqa: E402
+
+RESULTS_VERSION = 1
+CASES = ("ide_parse", "psd", "vc_curves", "analyze_endaq", "analyze_columnar", "create_vc_plots_plotly",
+         "api_analyze")
+WARMUP_SAMPLES = 20_000
+
+
+class Dataset:
+    """A synthetic recording on disk and what the cases need to run on it."""
+
+    def __init__(self, data_dir, n_samples, sample_rate, seed):
+        self.n_samples = n_samples
+        self.path = os.path.join(data_dir, f"synthetic_{n_samples}_{sample_rate:g}Hz_s{seed}.IDE")
+        if not os.path.exists(self.path):
+            partial = self.path + ".partial"
+            write_synthetic_ide(partial, n_samples, sample_rate, seed=seed)
+            os.replace(partial, self.path)
+        # The cases that work on one channel use the 25g sensor
+        self.channel_id = IDE_CHANNEL_IDS["25g"]
+        self.psd = None
+
+
+def _case_functions(client, params, workers, out_dir):
+    from vibecheck.vc_analyzer_endaq import IDEChannelSource, analyze_endaq, vc_curves_from_psd
+    from vibecheck.vc_cache import get_analysis_cache
+    from vibecheck.vc_columnar import get_columnar_store
+    from vibecheck.vc_plot_sensor_data import create_vc_plots_plotly
+    from vibecheck.vc_psd import channel_psd
+
+    cache = get_analysis_cache()
+
+    def cold(dataset):
+        # Only this recording's entry: the user's other cache entries stay
+        cache.discard(cache.key_for(dataset.path, params))
+
+    def ide_parse(dataset):
+        IDEChannelSource(dataset.path, dataset.channel_id).open()
+
+    def psd(dataset):
+        reader = IDEChannelSource(dataset.path, dataset.channel_id).open()
+        start = time.perf_counter()
+        dataset.psd = channel_psd(reader, params["bin_width"])
+        return time.perf_counter() - start
+
+    def vc_curves(dataset):
+        if dataset.psd is None:
+            psd(dataset)
+        vc_curves_from_psd(dataset.psd, params)
+
+    def analyze(dataset):
+        analyze_endaq(dataset.path, use_cache=False, workers=workers, columnar=False)
+
+    def analyze_columnar(dataset):
+        get_columnar_store().ensure(dataset.path)
+        start = time.perf_counter()
+        analyze_endaq(dataset.path, use_cache=False, workers=workers, columnar=True)
+        return time.perf_counter() - start
+
+    def report(dataset):
+        cold(dataset)
+        get_columnar_store().ensure(dataset.path)
+        start = time.perf_counter()
+        if not create_vc_plots_plotly(dataset.path, os.path.join(out_dir, "report.html")):
+            raise RuntimeError("create_vc_plots_plotly failed")
+        return time.perf_counter() - start
+
+    def api(dataset):
+        cold(dataset)
+        with open(dataset.path, "rb") as f:
+            payload = f.read()
+        start = time.perf_counter()
+        rv = client.post("/api/analyze", data={"file": (io.BytesIO(payload), os.path.basename(dataset.path))},
+                         content_type="multipart/form-data")
+        rv.get_data()
+        if rv.status_code != 200:
+            raise RuntimeError(f"/api/analyze returned {rv.status_code}: {rv.get_data(as_text=True)[:200]}")
+        return time.perf_counter() - start
+
+    return {"ide_parse": ide_parse, "psd": psd, "vc_curves": vc_curves, "analyze_endaq": analyze,
+            "analyze_columnar": analyze_columnar, "create_vc_plots_plotly": report, "api_analyze": api}
+
+
+def time_case(function, dataset, repeats):
+    """Run a case ``repeats`` times; cases may return their own timing (excluding set-up)."""
+    runs = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        measured = function(dataset)
+        runs.append(measured if measured is not None else time.perf_counter() - start)
+    return runs
+
+
+def environment():
+    import numpy
+    import scipy
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        commit = ""
+    return {
+        "python": platform.python_version(),
+        "numpy": numpy.__version__,
+        "scipy": scipy.__version__,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "commit": commit or None,
+    }
+
+
+def result_key(case, n_samples):
+    return f"{case}/{n_samples:.0e}"
+
+
+def run_suite(sizes, cases=CASES, repeats=3, sample_rate=5000.0, seed=0, workers=1, data_dir=None):
+    """
+    Run the benchmark cases on synthetic recordings of each size.
+
+    Args:
+        sizes (list[int]): Samples per channel
+        cases (tuple[str]): Case names, see :data:`CASES`
+        repeats (int): Timed runs per case and size
+        sample_rate (float): Sample rate of the recordings in Hz
+        seed (int): Seed of the synthetic signals
+        workers (int): Worker processes for ``analyze_endaq``
+        data_dir (str): Where recordings are kept between runs (default: a temp dir)
+
+    Returns:
+        dict: JSON-serializable results
+    """
+    from vibecheck.flask_server import app
+    from vibecheck.vc_analyzer_endaq import analysis_params
+
+    # endaq warns about empty low-frequency octave bins; report/snapshot logs are noise here
+    warnings.simplefilter("ignore", RuntimeWarning)
+    logging.getLogger("vibecheck").setLevel(logging.ERROR)
+    temp_dir = tempfile.TemporaryDirectory(prefix="vcsuite_")
+    keep_data = data_dir is not None
+    data_dir = data_dir or temp_dir.name
+    os.makedirs(data_dir, exist_ok=True)
+    client = app.test_client()
+    functions = _case_functions(client, analysis_params(), workers, temp_dir.name)
+
+    results = {}
+    datasets = []
+    try:
+        warmup = Dataset(data_dir, WARMUP_SAMPLES, sample_rate, seed)
+        datasets.append(warmup)
+        for case in cases:
+            functions[case](warmup)
+
+        for n_samples in sizes:
+            start = time.perf_counter()
+            dataset = Dataset(data_dir, n_samples, sample_rate, seed)
+            datasets.append(dataset)
+            print(f"{n_samples:.0e} samples/channel: {os.path.getsize(dataset.path) / 2**20:,.1f} MB IDE "
+                  f"(ready in {time.perf_counter() - start:.1f} s)", flush=True)
+            for case in cases:
+                runs = time_case(functions[case], dataset, repeats)
+                median = statistics.median(runs)
+                results[result_key(case, n_samples)] = {
+                    "case": case,
+                    "samples": n_samples,
+                    "median_s": median,
+                    "min_s": min(runs),
+                    "runs_s": runs,
+                    "samples_per_s": n_samples / median if median > 0 else None,
+                }
+                print(f"  {case:<24} {median * 1e3:>10.1f} ms  (min {min(runs) * 1e3:.1f} ms)", flush=True)
+    finally:
+        if not keep_data:
+            # Sidecars of recordings that are about to be deleted
+            from vibecheck.vc_columnar import get_columnar_store
+            for dataset in datasets:
+                get_columnar_store().discard(dataset.path)
+        temp_dir.cleanup()
+
+    return {
+        "version": RESULTS_VERSION,
+        "created": dt.datetime.now(dt.timezone.utc).isoformat(timespec="seconds"),
+        "environment": environment(),
+        "config": {"sample_rate": sample_rate, "seed": seed, "repeats": repeats, "workers": workers},
+        "results": results,
+    }
+
+
+def compare(current, baseline, tolerance=0.25, min_delta=0.005):
+    """
+    Compare suite results against a baseline.
+
+    Args:
+        current (dict): Results of :func:`run_suite`
+        baseline (dict): Earlier results
+        tolerance (float): Relative slow-down that counts as a regression
+        min_delta (float): Smallest absolute slow-down in seconds that counts
+
+    Returns:
+        list[dict]: One row per case and size, with ``status`` one of
+        ``"ok"``, ``"faster"``, ``"regression"``, ``"new"`` or ``"missing"``
+    """
+    rows = []
+    old_results = baseline.get("results", {})
+    new_results = current.get("results", {})
+    for key in sorted(set(old_results) | set(new_results)):
+        old, new = old_results.get(key), new_results.get(key)
+        row = {"key": key, "baseline_s": old and old["median_s"], "current_s": new and new["median_s"],
+               "ratio": None}
+        if old is None:
+            row["status"] = "new"
+        elif new is None:
+            row["status"] = "missing"
+        else:
+            delta = new["median_s"] - old["median_s"]
+            row["ratio"] = new["median_s"] / old["median_s"] if old["median_s"] > 0 else None
+            if delta > min_delta and delta > tolerance * old["median_s"]:
+                row["status"] = "regression"
+            elif -delta > min_delta and -delta > tolerance * old["median_s"]:
+                row["status"] = "faster"
+            else:
+                row["status"] = "ok"
+        rows.append(row)
+    return rows
+
+
+def environment_differences(current, baseline):
+    """Environment and config fields that differ between two result sets."""
+    differences = []
+    for section in ("environment", "config"):
+        old, new = baseline.get(section, {}), current.get(section, {})
+        for field in sorted(set(old) | set(new)):
+            if field != "commit" and old.get(field) != new.get(field):
+                differences.append(f"{section}.{field}: {old.get(field)} -> {new.get(field)}")
+    return differences
+
+
+def print_comparison(rows):
+    print(f"\n{'case':<36} {'baseline':>10} {'current':>10} {'ratio':>7}  status")
+    for row in rows:
+        old = f"{row['baseline_s'] * 1e3:.1f}" if row["baseline_s"] is not None else "-"
+        new = f"{row['current_s'] * 1e3:.1f}" if row["current_s"] is not None else "-"
+        ratio = f"{row['ratio']:.2f}" if row["ratio"] is not None else "-"
+        print(f"{row['key']:<36} {old:>10} {new:>10} {ratio:>7}  {row['status']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="End-to-end benchmark suite on synthetic IDE recordings.")
+    parser.add_argument("--sizes", type=float, nargs="+", default=[1e5, 1e6, 1e7], help="Samples per channel")
+    parser.add_argument("--cases", nargs="+", choices=CASES, default=list(CASES))
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--sample-rate", type=float, default=5000.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes for analyze_endaq")
+    parser.add_argument("--data-dir", help="Keep the generated recordings here and reuse them")
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--baseline", help="Compare against results stored earlier")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Relative slow-down treated as a regression")
+    parser.add_argument("--min-delta", type=float, default=0.005, help="Ignore slow-downs below this many seconds")
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    current = run_suite([int(n) for n in args.sizes], tuple(args.cases), args.repeats, args.sample_rate,
+                        args.seed, args.workers, args.data_dir)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    if baseline is None:
+        return 0
+    for difference in environment_differences(current, baseline):
+        print(f"warning: baseline differs in {difference}")
+    rows = compare(current, baseline, args.tolerance, args.min_delta)
+    print_comparison(rows)
+    regressions = [row["key"] for row in rows if row["status"] == "regression"]
+    if regressions:
+        print(f"\nFAIL: {len(regressions)} regression(s) beyond {args.tolerance:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,165 @@
+# synthetic.py
+# Description: Synthetic enDAQ-like acceleration recordings for benchmarks.
+
+"""
+Synthetic multi-axis acceleration sources.
+
+:class:`SyntheticChannelReader` implements the same reader interface as
+``vibecheck.vc_psd.IDEChannelReader`` but generates its samples on the fly,
+so arbitrarily long recordings can be streamed without ever existing on
+disk or in memory. :func:`write_synthetic_ide` writes the same signals as a
+real ``.IDE`` file, for benchmarking the full path from file to report.
+"""
+
+import numpy as np
+import pandas as pd
+
+from vibecheck.vc_psd import block_rows_for
+
+# Tones (Hz, amplitude in g) layered over broadband noise on every axis
+DEFAULT_TONES = ((4.0, 2e-4), (12.5, 1e-4), (30.0, 5e-5), (60.0, 2e-4))
+
+# Channel IDs of the 25g and 40g accelerometers on the dual-sensor loggers
+IDE_CHANNEL_IDS = {"25g": 8, "40g": 80}
+# Start of synthetic recordings (TimeBaseUTC, seconds)
+IDE_UTC_START = 1_700_000_000
+
+
+class SyntheticChannelReader:
+    """
+    Deterministic synthetic acceleration channel.
+
+    Args:
+        n_samples (int): Length of the recording
+        sample_rate (float): Sample rate in Hz
+        axes (tuple[str]): Axis labels, e.g. ``("X", "Y", "Z")``
+        name (str): Channel name, used as the column suffix (``"X (25g)"``)
+        noise (float): Standard deviation of the broadband noise in g
+        seed (int): Base seed; each block is seeded from it and its offset
+    """
+
+    def __init__(self, n_samples, sample_rate=5000.0, axes=("X", "Y", "Z"),
+                 name="25g", noise=1e-4, tones=DEFAULT_TONES, seed=0):
+        self.n_samples = int(n_samples)
+        self.sample_rate = float(sample_rate)
+        self.name = name
+        self.columns = [f"{ax} ({name})" for ax in axes]
+        self.noise = noise
+        self.tones = tones
+        self.seed = seed
+
+    def open(self):
+        """Synthetic readers are their own channel source (and cheap to pickle)."""
+        return self
+
+    @property
+    def nbytes(self):
+        """Size of the equivalent in-memory DataFrame (timestamps + axes)."""
+        return self.n_samples * (len(self.columns) + 1) * 8
+
+    def _block(self, start, stop):
+        rng = np.random.default_rng((self.seed, start))
+        t = np.arange(start, stop) / self.sample_rate
+        data = rng.normal(0.0, self.noise, size=(stop - start, len(self.columns)))
+        for i, (freq, amp) in enumerate(self.tones):
+            phase = np.arange(len(self.columns)) * (i + 1)
+            data += amp * np.sin(2 * np.pi * freq * t[:, np.newaxis] + phase)
+        return data
+
+    def iter_blocks(self, block_rows=None, start=0, stop=None):
+        block_rows = block_rows or block_rows_for(len(self.columns))
+        stop = self.n_samples if stop is None else min(stop, self.n_samples)
+        for i in range(start, stop, block_rows):
+            yield self._block(i, min(i + block_rows, stop))
+
+    def to_dataframe(self):
+        data = np.concatenate(list(self.iter_blocks()), axis=0)
+        t = pd.to_timedelta(np.arange(self.n_samples) / self.sample_rate, unit="s")
+        return pd.DataFrame(data, index=pd.Index(t, name="timestamp"), columns=self.columns)
+
+
+def synthetic_vc_frames(n_sensors=2, fmax=2500.0, seed=0):
+    """
+    VC-curve DataFrames shaped like ``analyze_endaq`` output.
+
+    Third-octave band centres from 1 Hz to ``fmax`` as the index, columns
+    ``X``/``Y``/``Z`` in mm/s RMS, one frame per sensor.
+    """
+    rng = np.random.default_rng(seed)
+    centres = 2 ** np.arange(0, np.log2(fmax) + 1 / 6, 1 / 3)
+    frames = []
+    for _ in range(n_sensors):
+        base = 2e-3 / np.sqrt(centres)
+        data = {ax: base * rng.lognormal(0.0, 0.3, len(centres)) for ax in "XYZ"}
+        frames.append(pd.DataFrame(data, index=pd.Index(centres, name="frequency (Hz)")))
+    return frames
+
+
+def write_synthetic_ide(path, n_samples, sample_rate=5000.0, sensors=("25g", "40g"),
+                        block_rows=1024, seed=0):
+    """
+    Write a multi-sensor synthetic recording as an enDAQ ``.IDE`` file.
+
+    Each sensor becomes one three-axis acceleration channel (float32
+    samples, no calibration) holding the signal of a
+    :class:`SyntheticChannelReader`; blocks of the channels are interleaved
+    as a logger writes them. The file is written block by block, so its
+    size is not limited by memory.
+
+    Args:
+        path (str): Output file
+        n_samples (int): Samples per channel
+        sample_rate (float): Sample rate in Hz
+        sensors (tuple[str]): Sensor names, e.g. ``("25g", "40g")``
+        block_rows (int): Samples per data block
+        seed (int): Base seed; sensor ``i`` uses ``seed + i``
+
+    Returns:
+        dict: Channel ID per sensor name
+    """
+    import ebmlite
+
+    schema = ebmlite.loadSchema("mide_ide.xml")
+    ids = {name: IDE_CHANNEL_IDS.get(name, 8 * (i + 1)) for i, name in enumerate(sensors)}
+    readers = [SyntheticChannelReader(n_samples, sample_rate, name=name, seed=seed + i)
+               for i, name in enumerate(sensors)]
+    channels = [{
+        "ChannelID": ids[name],
+        "ChannelName": f"{name} Accelerometer",
+        "ChannelFormat": "<fff",
+        "TimeCodeScale": "1/1000000",  # timestamps in microseconds
+        "TimeCodeModulus": 2 ** 62,
+        "SubChannel": [{
+            "SubChannelID": j,
+            "SubChannelName": column,
+            "SubChannelAxisName": column[0],
+            "SubChannelLabel": "Acceleration",
+            "SubChannelUnits": "g",
+            "SubChannelSensorRef": i,
+        } for j, column in enumerate(reader.columns)],
+    } for i, (name, reader) in enumerate(zip(sensors, readers))]
+
+    with open(path, "wb") as f:
+        f.write(schema.encodes({"EBML": {
+            "EBMLVersion": 1, "EBMLReadVersion": 1, "EBMLMaxIDLength": 4, "EBMLMaxSizeLength": 8,
+            "DocType": "mide", "DocTypeVersion": 2, "DocTypeReadVersion": 2,
+        }}))
+        f.write(schema.encodes({"RecordingProperties": {
+            "RecorderInfo": {"ProductName": "Synthetic", "RecorderSerial": 1},
+            "SensorList": {"Sensor": [{"SensorID": i, "SensorName": f"{name} Accelerometer"}
+                                      for i, name in enumerate(sensors)]},
+            "ChannelList": {"Channel": channels},
+        }}))
+        f.write(schema.encodes({"TimeBaseUTC": IDE_UTC_START}))
+
+        blocks = zip(*(reader.iter_blocks(block_rows) for reader in readers))
+        for start, channel_blocks in zip(range(0, n_samples, block_rows), blocks):
+            stop = start + len(channel_blocks[0])
+            for name, data in zip(sensors, channel_blocks):
+                f.write(schema.encodes({"ChannelDataBlock": {
+                    "ChannelIDRef": ids[name],
+                    "StartTimeCodeAbs": round(start * 1e6 / sample_rate),
+                    "EndTimeCodeAbs": round((stop - 1) * 1e6 / sample_rate),
+                    "ChannelDataPayload": data.astype("<f4").tobytes(),
+                }}))
+    return ids
@@ -16,6 +16,9 @@ const store = new Store();
 let mainWindow;
 let flaskProcess;
 
+// Address of the Flask API (see vibecheck/flask_server.py)
+const API_URL = 'http://localhost:5001';
+
 // Configure auto-updater
 autoUpdater.autoDownload = false;
 autoUpdater.autoInstallOnAppQuit = true;
@@ -208,6 +211,36 @@ ipcMain.handle('analyze-file', async (event, filePath) => {
   }
 });
 
+// Start a live VC monitor on a recording in progress
+ipcMain.handle('start-live', async (event, filePath) => {
+  try {
+    const response = await axios.post(`${API_URL}/api/live`, { path: filePath });
+    return {
+      success: true,
+      id: response.data.id,
+      eventsUrl: `${API_URL}${response.data.events_url}`
+    };
+  } catch (error) {
+    console.error('Live monitor error:', error);
+    return {
+      success: false,
+      error: (error.response && error.response.data && error.response.data.error) ||
+        error.message || 'Failed to start live monitor'
+    };
+  }
+});
+
+// Stop a live VC monitor; its event stream ends
+ipcMain.handle('stop-live', async (event, monitorId) => {
+  try {
+    await axios.delete(`${API_URL}/api/live/${monitorId}`);
+    return { success: true };
+  } catch (error) {
+    console.error('Error stopping live monitor:', error);
+    return { success: false, error: error.message || 'Failed to stop live monitor' };
+  }
+});
+
 // Handle app updates
 autoUpdater.on('checking-for-update', () => {
   mainWindow.webContents.send('update-status', 'Checking for updates...');
@@ -108,3 +108,946 @@ def test_allowed_file():
     assert allowed_file('sample.IDE')
     assert allowed_file('demo.ide')
     assert not allowed_file('not.txt')
+
+
+def test_analysis_cache_roundtrip_and_eviction(tmp_path, mock_analysis_results):
+    """Cached frames round-trip exactly and the LRU bound is enforced."""
+    from vibecheck.vc_cache import AnalysisCache
+
+    cache = AnalysisCache(str(tmp_path), max_bytes=10**9)
+    frames = list(mock_analysis_results)
+    cache.put('a', frames)
+    restored = cache.get('a')
+    assert len(restored) == 2
+    pd.testing.assert_frame_equal(restored[0], frames[0], check_names=False)
+    assert cache.get('missing') is None
+
+    entry_size = cache.stats()['bytes']
+    cache.max_bytes = int(entry_size * 1.5)
+    os.utime(tmp_path / 'a.npz', (0, 0))  # make 'a' the least recently used
+    cache.put('b', frames)
+    assert cache.get('a') is None
+    assert cache.get('b') is not None
+
+    # Only recordings that stay on disk are kept in the path -> hash index
+    recording, spool = tmp_path / 'survey.IDE', tmp_path / 'upload.IDE'
+    recording.write_bytes(b'ide')
+    spool.write_bytes(b'ide')
+    assert cache.content_hash(str(spool), remember=False) == cache.content_hash(str(recording))
+    assert list(cache._load_hashes()) == [os.path.abspath(recording)]
+
+
+def test_analyze_endaq_cache_hit_skips_reader(tmp_path, monkeypatch, mock_analysis_results):
+    """A cache hit must never open the IDE file."""
+    import endaq.ide
+    from vibecheck.vc_analyzer_endaq import analysis_params
+    from vibecheck.vc_cache import AnalysisCache
+
+    ide = tmp_path / 'upload.IDE'
+    ide.write_bytes(b'not really an IDE file')
+    cache = AnalysisCache(str(tmp_path / 'cache'))
+    cache.put(cache.key_for(str(ide), analysis_params()), list(mock_analysis_results))
+
+    def fail(*args, **kwargs):
+        raise AssertionError('get_doc called on cache hit')
+    monkeypatch.setattr(endaq.ide, 'get_doc', fail)
+
+    result = analyze_endaq(str(ide), cache=cache)
+    assert isinstance(result, tuple) and len(result) == 2
+    assert list(result[0].columns) == ['X', 'Y', 'Z']
+
+
+def test_streaming_welch_matches_endaq():
+    """Block-wise Welch must reproduce endaq.calc.psd.welch on the same samples."""
+    import endaq
+    from vibecheck.vc_psd import ArrayChannelReader, welch_streaming
+
+    rng = np.random.default_rng(0)
+    reader = ArrayChannelReader(rng.normal(size=(50_001, 3)) + 0.3, 2000.0,
+                                ['X (25g)', 'Y (25g)', 'Z (25g)'])
+    expected = endaq.calc.psd.welch(reader.to_dataframe(), bin_width=0.25)
+    # Small, odd-sized blocks exercise the carried-over segment tail
+    streamed = welch_streaming(reader, 0.25, block_rows=777)
+    np.testing.assert_allclose(streamed.index, expected.index)
+    np.testing.assert_allclose(streamed.values, expected.values, rtol=1e-9, atol=1e-15)
+    assert list(streamed.columns) == list(expected.columns)
+
+    # The one-shot path of small channels goes through the cached FFT plan too
+    from vibecheck.vc_fftplans import get_plan_cache
+    from vibecheck.vc_psd import channel_psd
+    hits = get_plan_cache().stats()["hits"]
+    np.testing.assert_allclose(channel_psd(reader, 0.25).values, expected.values, rtol=1e-9, atol=1e-15)
+    assert get_plan_cache().stats()["hits"] > hits
+
+
+def test_analyze_sources_parallel_matches_sequential(monkeypatch):
+    """Any number of channels is analysed, and the pool preserves order and results."""
+    from vibecheck import vc_analyzer_endaq
+    from vibecheck.vc_psd import ArrayChannelReader
+
+    rng = np.random.default_rng(1)
+    sources = [
+        ArrayChannelReader(rng.normal(scale=1e-3 * (i + 1), size=(20_000, 3)), 1000.0,
+                           [f'{ax} ({g}g)' for ax in 'XYZ'], name=f'{g}g')
+        for i, g in enumerate((25, 40, 100))
+    ]
+    params = vc_analyzer_endaq.analysis_params()
+    sequential = vc_analyzer_endaq.analyze_sources(sources, params, workers=1)
+    monkeypatch.setattr(vc_analyzer_endaq.os, 'cpu_count', lambda: 3)
+    parallel = vc_analyzer_endaq.analyze_sources(sources, params, workers=3)
+    assert len(parallel) == 3
+    for a, b in zip(sequential, parallel):
+        assert list(b.columns) == ['X', 'Y', 'Z']
+        pd.testing.assert_frame_equal(a, b)
+    assert parallel[2]['X'].max() > parallel[0]['X'].max()
+
+    # A cancelled analysis returns without waiting for the channels still running
+    import functools
+    import time
+    import types
+    from vibecheck.vc_jobs import JobCancelled
+
+    def cancel(*args, **kwargs):
+        raise JobCancelled('job')
+    slow = types.SimpleNamespace(open=functools.partial(time.sleep, 4))
+    start = time.perf_counter()
+    with pytest.raises(JobCancelled):
+        vc_analyzer_endaq.analyze_sources([sources[0], slow], params, workers=2, status_callback=cancel)
+    assert time.perf_counter() - start < 3
+
+
+def test_batch_collect_and_report(tmp_path, mock_analysis_results):
+    """Directories expand to IDE files, and summaries roll up into the batch report."""
+    import json
+    from vibecheck.vc_batch import collect_ide_files, summarize_frames, write_batch_report
+
+    for name in ('b.IDE', 'a.ide', 'notes.txt'):
+        (tmp_path / name).write_bytes(b'x')
+    files = collect_ide_files([str(tmp_path)])
+    assert [os.path.basename(f) for f in files] == ['a.ide', 'b.IDE']
+    with pytest.raises(ValueError):
+        collect_ide_files([str(tmp_path / 'missing')])
+
+    df = mock_analysis_results[0].copy()
+    df.loc[:, 'Z'] = 0.0005
+    sensors = summarize_frames([df])
+    assert sensors[0]['name'] == '25G Sensor'
+    assert sensors[0]['axes']['Z']['vc_class'] == 'VC-F'
+    assert sensors[0]['axes']['X']['vc_class'] is None  # ~0.1 mm/s exceeds VC-A
+
+    summaries = [{'name': 'a.ide', 'status': 'ok', 'sensors': sensors},
+                 {'name': 'b.IDE', 'status': 'error', 'error': 'bad file'}]
+    json_path, html_path = write_batch_report(summaries, str(tmp_path), elapsed=2.0)
+    report = json.loads(open(json_path).read())
+    assert report['succeeded'] == 1 and report['failed'] == 1
+    assert report['files_per_sec'] == 1.0
+    assert 'bad file' in open(html_path).read()
+
+    # Same-named recordings from different directories keep separate summaries
+    from vibecheck.vc_batch import _analyze_file
+    from vibecheck.vc_compare import comparison_labels
+
+    paths = [str(tmp_path / d / 'DAQ00001.IDE') for d in ('site_a', 'site_b')]
+    written = [_analyze_file(p, str(tmp_path), name=n)['summary_path'] for p, n in zip(paths, comparison_labels(paths))]
+    assert [os.path.basename(p) for p in written] == ['site_a_DAQ00001_summary.json', 'site_b_DAQ00001_summary.json']
+    assert json.loads(open(written[1]).read())['file'] == paths[1]
+
+
+def test_job_queue_progress_cancel_and_backpressure(tmp_path):
+    """Jobs report progress, can be cancelled while running, and a full queue rejects work."""
+    import threading
+    import time
+    from vibecheck.vc_jobs import CANCELLED, DONE, JobQueue, QueueFullError
+
+    release = threading.Event()
+
+    def runner(ide_path, html_out, status_callback):
+        status_callback('progress', 'half way', progress=0.5)
+        if 'slow' in ide_path:
+            while True:
+                release.wait(0.01)
+                status_callback('progress', 'still working', progress=0.6)
+        with open(html_out, 'w') as f:
+            f.write('<!DOCTYPE html>')
+        return True
+
+    def wait_for(job, states):
+        deadline = time.time() + 5
+        while job.status not in states and time.time() < deadline:
+            time.sleep(0.01)
+        return job.status
+
+    jobs = JobQueue(runner, workers=1, max_depth=1)
+    slow = jobs.submit('slow.IDE', str(tmp_path), 'slow.IDE')
+    while slow.progress < 0.5:
+        time.sleep(0.01)
+    assert slow.status == 'running'
+
+    queued = jobs.submit('fast.IDE', str(tmp_path), 'fast.IDE')
+    with pytest.raises(QueueFullError):
+        jobs.submit('extra.IDE', str(tmp_path), 'extra.IDE')
+    # A cancelled queued job frees its place at once
+    jobs.cancel(queued.id)
+    assert queued.status == CANCELLED and jobs.depth() == 0
+    queued = jobs.submit('fast.IDE', str(tmp_path), 'fast.IDE')
+
+    jobs.cancel(slow.id)
+    assert wait_for(slow, {CANCELLED}) == CANCELLED
+    assert wait_for(queued, {DONE}) == DONE
+    assert queued.to_dict()['progress'] == 1.0
+    assert os.path.exists(queued.result_path)
+
+
+def test_api_jobs_unknown_id(client):
+    rv = client.get('/api/jobs/does-not-exist')
+    assert rv.status_code == 404
+    rv = client.post('/api/jobs', data={}, content_type='multipart/form-data')
+    assert rv.status_code == 400
+
+
+def test_report_plotly_js_modes(tmp_path, mock_analysis_results):
+    """Shared/sidecar reports reference Plotly.js instead of embedding the bundle."""
+    from vibecheck.vc_plot_sensor_data import build_vc_figure_specs, get_plotly_js, render_report_html
+
+    sensors = [{'name': '25G Sensor', 'df': mock_analysis_results[0]}]
+    figs = build_vc_figure_specs(sensors)
+    assert len(figs) == 3
+
+    inline = render_report_html(figs, 'demo', plotly_js='inline')
+    shared = render_report_html(figs, 'demo', plotly_js='shared', plotly_js_url='http://h/p.js')
+    html_out = tmp_path / 'report.html'
+    sidecar = render_report_html(figs, 'demo', plotly_js='sidecar', html_out=str(html_out))
+
+    bundle = get_plotly_js()
+    assert get_plotly_js.cache_info().hits > 0
+    assert bundle in inline
+    assert bundle not in shared and 'src="http://h/p.js"' in shared
+    assert len(shared) * 10 < len(inline)
+    assert (tmp_path / 'plotly.min.js').read_text(encoding='utf-8') == bundle
+    assert 'src="plotly.min.js?v=' in sidecar
+
+
+def test_api_plotly_asset_is_cacheable(client):
+    rv = client.get('/assets/plotly.min.js')
+    assert rv.status_code == 200
+    assert rv.mimetype == 'application/javascript'
+    assert 'immutable' in rv.headers['Cache-Control']
+    rv = client.get('/assets/plotly.min.js', headers={'If-None-Match': rv.headers['ETag']})
+    assert rv.status_code == 304
+
+
+def test_compact_figure_encoding(mock_analysis_results):
+    """Arrays are sent as base64 float64 and the VC layout is shared, not repeated."""
+    import base64
+    import json
+    from vibecheck.vc_plot_sensor_data import (
+        build_vc_figure_specs, encode_figure_spec, render_report_html, spec_to_figure)
+
+    df = mock_analysis_results[0]
+    specs = build_vc_figure_specs([{'name': '25G Sensor', 'df': df}])
+    payload = json.loads(encode_figure_spec(specs[0]))
+    y = payload['data'][0]['y']
+    assert y['dtype'] == 'f8'
+    np.testing.assert_array_equal(np.frombuffer(base64.b64decode(y['bdata']), '<f8'), df['X'].to_numpy())
+    assert 'shapes' not in payload['layout']
+
+    fig = spec_to_figure(specs[0])
+    assert len(fig.layout.shapes) == len(VC_THRESHOLDS)
+    assert len(fig.layout.annotations) == len(VC_THRESHOLDS) + 1  # + peak label
+
+    html = render_report_html(specs, 'demo', plotly_js='shared')
+    assert html.count('VC-A (0.050 mm/s)') == 1
+    assert html.count("vcPlot('plot") == 3
+
+
+def test_snapshot_renderer_batches_off_request(mock_analysis_results):
+    """Submitting returns at once; the whole report renders as one batch on the worker."""
+    import threading
+    from vibecheck.vc_plot_sensor_data import build_vc_figure_specs
+    from vibecheck.vc_snapshots import SnapshotRenderer
+
+    release = threading.Event()
+    calls = []
+
+    def fake_render(specs, paths, tabs):
+        release.wait(5)
+        calls.append(len(specs))
+        for path in paths:
+            with open(path, 'wb') as f:
+                f.write(b'png')
+
+    renderer = SnapshotRenderer(render_fn=fake_render, tabs=2)
+    specs = build_vc_figure_specs([{'name': '25G Sensor', 'df': df} for df in mock_analysis_results][:1])
+    batch = renderer.submit(specs, '/data/DAQ_test.IDE')
+    assert not batch.done
+    assert renderer.batch_for('/data/DAQ_test.IDE') is batch
+    release.set()
+    paths = batch.wait(5)
+    assert calls == [3]
+    assert [os.path.basename(p) for p in paths] == [
+        'DAQ_test_25G_Sensor_X.png', 'DAQ_test_25G_Sensor_Y.png', 'DAQ_test_25G_Sensor_Z.png']
+
+    # Same file name, other report: its own PNGs; the oldest batches are dropped with their PNGs
+    renderer.max_batches = 2
+    other = renderer.submit(specs, 'DAQ_test.IDE', key='upload:1')
+    assert other.wait(5) and set(other.paths).isdisjoint(paths)
+    renderer.submit(specs, '/data/other.IDE').wait(5)
+    assert renderer.batch_for('/data/DAQ_test.IDE') is None
+    assert not any(os.path.exists(p) for p in paths) and all(os.path.exists(p) for p in other.paths)
+    renderer.shutdown()
+    assert not any(os.path.exists(p) for p in other.paths)
+
+
+def test_pdf_workers_reuse_parent_snapshots(monkeypatch, mock_analysis_results):
+    """PNGs the parent already rendered are handed to the PDF workers; nothing is started otherwise."""
+    from vibecheck import vc_snapshots
+    from vibecheck.vc_generate_pdf import _rendered_snapshots
+    from vibecheck.vc_plot_sensor_data import build_vc_figure_specs
+
+    monkeypatch.setattr(vc_snapshots, '_renderer', None)
+    assert _rendered_snapshots('/data/DAQ_test.IDE', 1) is None
+    assert vc_snapshots.peek_snapshot_renderer() is None
+
+    def fake_render(specs, paths, tabs):
+        for path in paths:
+            with open(path, 'wb') as f:
+                f.write(b'png')
+
+    renderer = vc_snapshots.SnapshotRenderer(render_fn=fake_render)
+    monkeypatch.setattr(vc_snapshots, '_renderer', renderer)
+    specs = build_vc_figure_specs([{'name': '25G Sensor', 'df': mock_analysis_results[0]}])
+    batch = renderer.submit(specs, '/data/DAQ_test.IDE')
+    snapshots = _rendered_snapshots('/data/DAQ_test.IDE', 5)
+    assert snapshots == {('25G Sensor', spec['axis']): path for spec, path in zip(specs, batch.paths)}
+    assert _rendered_snapshots('/data/other.IDE', 1) is None
+    # A PDF worker releases each file's PNGs once its report is written
+    renderer.release('/data/DAQ_test.IDE')
+    assert renderer.batch_for('/data/DAQ_test.IDE') is None
+    assert not any(os.path.exists(p) for p in batch.paths)
+    renderer.shutdown()
+
+
+def test_classify_vc_matches_per_level_scan():
+    """The vectorized searchsorted classification agrees with scanning each level."""
+    from vibecheck.vc_generate_pdf import classify_vc
+
+    rng = np.random.default_rng(0)
+    peaks = np.concatenate([rng.uniform(0, 0.06, 200), list(VC_THRESHOLDS.values()), [np.nan]])
+    expected = []
+    for peak in peaks:
+        passed = [name for name, limit in sorted(VC_THRESHOLDS.items(), key=lambda x: x[1]) if peak <= limit]
+        expected.append(passed[0] if passed else None)
+    assert list(classify_vc(peaks)) == expected
+
+
+def test_write_pdf_report_uses_snapshots(tmp_path, mock_analysis_results):
+    """PDF pages embed available PNG snapshots and draw the remaining figures."""
+    import re
+    from PIL import Image
+    from vibecheck.vc_generate_pdf import write_pdf_report
+
+    png = tmp_path / 'snap.png'
+    Image.new('RGB', (64, 40), 'white').save(png)
+    pdf_out = tmp_path / 'report.pdf'
+    write_pdf_report(mock_analysis_results, str(pdf_out), 'test.IDE',
+                     snapshots={('25G Sensor', 'X'): str(png)})
+    data = pdf_out.read_bytes()
+    assert data.startswith(b'%PDF')
+    # Summary page plus one page per sensor axis
+    assert len(re.findall(rb'/Type\s*/Page\b(?!s)', data)) == 1 + 2 * 3
+    assert data.count(b'/Subtype /Image') >= 1
+
+
+def test_server_import_is_lazy():
+    """Importing the Flask backend must not load the analysis stack."""
+    import subprocess
+    code = ("import sys, vibecheck.flask_server; "
+            "print(','.join(m for m in ('endaq', 'scipy', 'pandas', 'plotly') if m in sys.modules))")
+    root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+    out = subprocess.run([sys.executable, '-c', code], cwd=root, capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == ''
+
+
+def test_api_analyze_reads_upload_in_place(client, monkeypatch, mock_analysis_results):
+    """Uploads reach the analysis as in-memory bytes or a spool file, never a copy."""
+    import io
+    from vibecheck import vc_analyzer_endaq, vc_upload
+
+    seen = []
+    def fake_analyze(source, **kwargs):
+        seen.append((source, os.path.exists(source) if isinstance(source, str) else None))
+        return mock_analysis_results
+    monkeypatch.setattr(vc_analyzer_endaq, 'analyze_endaq', fake_analyze)
+
+    payload = b'IDE' * 1000
+    rv = client.post('/api/analyze', data={'file': (io.BytesIO(payload), 'small.IDE')},
+                     content_type='multipart/form-data')
+    assert rv.status_code == 200 and rv.mimetype == 'text/html'
+    assert b'small.IDE' in rv.data
+    assert seen[-1] == (payload, None)
+    # The same report stays available under its id
+    view = client.get(rv.headers['X-Report-Url'])
+    assert view.status_code == 200 and view.data == rv.data
+
+    monkeypatch.setattr(vc_upload, 'UPLOAD_MEMORY_MAX_BYTES', 0)
+    rv = client.post('/api/analyze', data={'file': (io.BytesIO(payload), 'large.IDE')},
+                     content_type='multipart/form-data')
+    assert rv.status_code == 200
+    spool_path, existed = seen[-1]
+    assert existed and os.path.basename(spool_path).startswith(vc_upload.SPOOL_PREFIX)
+    assert not os.path.exists(spool_path)  # removed when the request closed
+
+
+def test_report_store_lookup_and_eviction(tmp_path):
+    """Reports resolve by id only, and eviction honours age and total size."""
+    import time
+    from vibecheck.vc_reports import ReportStore
+
+    store = ReportStore(str(tmp_path), max_bytes=250, max_age=60)
+    first, second = store.put('a' * 100), store.put('b' * 100)
+    assert first != second
+    with open(store.path(first, 'report.html')) as f:
+        assert f.read() == 'a' * 100
+    assert store.path('0' * 32, 'report.html') is None
+    assert store.path(first, '../' + second + '/report.html') is None
+
+    # Viewing `first` makes `second` the least recently used
+    store.path(first, 'report.html')
+    third = store.put('c' * 100)
+    assert store.evict() == 1
+    assert store.path(second, 'report.html') is None
+    assert store.path(third, 'report.html') is not None
+
+    # The index is rebuilt from disk, and unviewed reports expire
+    reopened = ReportStore(str(tmp_path), max_bytes=250, max_age=60)
+    assert reopened.path(first, 'report.html') is not None
+    assert reopened.evict(now=time.time() + 120) == 2
+    assert reopened.stats()['reports'] == 0
+
+
+def test_incremental_welch_matches_full_analysis(tmp_path):
+    """Resuming saved accumulator state on appended samples equals a full re-analysis."""
+    from vibecheck.vc_incremental import IncrementalStateStore, update_channel
+    from vibecheck.vc_psd import ArrayChannelReader, welch_streaming
+
+    rng = np.random.default_rng(3)
+    data = rng.normal(size=(50_003, 3))
+    columns = ['X (25g)', 'Y (25g)', 'Z (25g)']
+    params = {'bin_width': 1.0}
+
+    recording = tmp_path / 'growing.IDE'
+    recording.write_bytes(b'header' + b'0' * 100)
+    store = IncrementalStateStore(str(tmp_path / 'state'))
+    _, state = update_channel(ArrayChannelReader(data[:20_011], 1000.0, columns), 1.0)
+    store.save(str(recording), params, {8: state})
+
+    # The logger appends; the re-parsed channel covers the whole recording
+    with open(recording, 'ab') as f:
+        f.write(b'1' * 50)
+    saved = store.load(str(recording), params)
+    full = ArrayChannelReader(data, 1000.0, columns)
+    psd, new_state = update_channel(full, 1.0, saved[8])
+    expected = welch_streaming(full, 1.0)
+    np.testing.assert_allclose(psd.to_numpy(), expected.to_numpy(), rtol=1e-12)
+    np.testing.assert_allclose(psd.index, expected.index)
+    assert new_state['welch']['samples_seen'] == len(data)
+
+    # A replaced (not appended) file invalidates the state
+    recording.write_bytes(b'other' + b'0' * 200)
+    assert store.load(str(recording), params) == {}
+
+
+def test_incremental_analysis_of_channel_shorter_than_one_segment(tmp_path, monkeypatch):
+    """A just-started recording falls back to endaq's Welch, and its state still resumes."""
+    import endaq
+    from benchmarks.synthetic import write_synthetic_ide
+    import vibecheck.vc_incremental as vc_incremental
+    from vibecheck.vc_analyzer_endaq import analysis_params
+    from vibecheck.vc_psd import ArrayChannelReader, welch_streaming
+
+    rng = np.random.default_rng(4)
+    data = rng.normal(size=(3_000, 3))
+    columns = ['X (25g)', 'Y (25g)', 'Z (25g)']
+    short = ArrayChannelReader(data[:600], 1000.0, columns)
+    psd, state = vc_incremental.update_channel(short, 1.0)
+    expected = endaq.calc.psd.welch(short.to_dataframe(), bin_width=1.0)
+    np.testing.assert_allclose(psd.to_numpy(), expected.to_numpy(), rtol=1e-9)
+    assert state['welch']['samples_seen'] == 600
+    full = ArrayChannelReader(data, 1000.0, columns)
+    psd, _ = vc_incremental.update_channel(full, 1.0, state)
+    np.testing.assert_allclose(psd.to_numpy(), welch_streaming(full, 1.0).to_numpy(), rtol=1e-12)
+
+    # 2 s at 5 kHz is shorter than one 4 s segment at 0.25 Hz resolution
+    path = tmp_path / 'started.IDE'
+    write_synthetic_ide(str(path), 10_000, 5000.0, block_rows=500)
+    store = vc_incremental.IncrementalStateStore(str(tmp_path / 'state'))
+    monkeypatch.setattr(vc_incremental, '_default_store', store)
+    result = analyze_endaq(str(path), workers=1, incremental=True, decimate=False)
+    full = analyze_endaq(str(path), use_cache=False, workers=1, columnar=False, decimate=False)
+    np.testing.assert_allclose(result[0].to_numpy(), full[0].to_numpy(), rtol=1e-6)
+    assert set(store.load(str(path), analysis_params(decimate=False))) == {8, 80}
+
+
+def test_incremental_analysis_warns_that_it_does_not_decimate(tmp_path, monkeypatch, caplog):
+    """Incremental runs skip decimation with a warning, at the native rate, and bypass the cache."""
+    from benchmarks.synthetic import write_synthetic_ide
+    import vibecheck.vc_incremental as vc_incremental
+    from vibecheck.vc_cache import AnalysisCache
+
+    path = tmp_path / 'growing.IDE'
+    write_synthetic_ide(str(path), 20_000, 2000.0, block_rows=500)
+    store = vc_incremental.IncrementalStateStore(str(tmp_path / 'state'))
+    monkeypatch.setattr(vc_incremental, '_default_store', store)
+    cache = AnalysisCache(str(tmp_path / 'cache'))
+    with caplog.at_level('WARNING', logger='vibecheck.vc_analyzer_endaq'):
+        result = analyze_endaq(str(path), cache=cache, workers=1, incremental=True, decimate=True)
+    assert 'does not decimate' in caplog.text
+    full = analyze_endaq(str(path), use_cache=False, workers=1, columnar=False, decimate=False)
+    np.testing.assert_allclose(result[0].to_numpy(), full[0].to_numpy(), rtol=1e-9)
+    assert cache._entries() == []
+
+    # In-memory files (uploads) have no state to continue from: full analysis, with a warning
+    caplog.clear()
+    with caplog.at_level('WARNING', logger='vibecheck.vc_analyzer_endaq'):
+        result = analyze_endaq(path.read_bytes(), use_cache=False, incremental=True, decimate=False)
+    assert 'needs a file on disk' in caplog.text
+    np.testing.assert_allclose(result[0].to_numpy(), full[0].to_numpy(), rtol=1e-9)
+
+
+def test_sliding_welch_matches_scipy_over_window():
+    """The sliding accumulator's PSD equals Welch over just the samples in its window."""
+    from scipy import signal
+    from vibecheck.vc_psd import SlidingWelchAccumulator
+
+    rng = np.random.default_rng(5)
+    data = rng.normal(size=(30_017, 2))
+    acc = SlidingWelchAccumulator.for_window(1000.0, 1.0, 2, window_seconds=8.0)
+    for i in range(0, len(data), 777):
+        acc.update(data[i:i + 777])
+    assert acc.segment_count == acc.max_segments < acc.total_segments
+
+    start, stop = acc.window_samples()
+    _, expected = signal.welch(data[start:stop], fs=acc.sample_rate, window='hann', nperseg=acc.nperseg,
+                               noverlap=acc.nperseg - acc.step, axis=0, average='mean')
+    np.testing.assert_allclose(acc.psd(), expected, rtol=1e-10)
+
+
+def test_api_live_streams_server_sent_events(client):
+    """A live monitor publishes VC updates over SSE and ends with an "end" event."""
+    import json
+    from vibecheck.vc_live import ReplaySource, get_live_registry
+    from vibecheck.vc_psd import ArrayChannelReader
+
+    rng = np.random.default_rng(6)
+    # X is ten times louder than Y and Z, so it alone decides the site's class
+    reader = ArrayChannelReader(rng.normal(scale=[1.0, 0.1, 0.1], size=(40_000, 3)), 1000.0,
+                                ['X (25g)', 'Y (25g)', 'Z (25g)'])
+    registry = get_live_registry()
+    monitor = registry.start(ReplaySource(reader, speed=None, block_seconds=2.0), 'replay')
+    monitor.update_interval = 0.0
+
+    rv = client.get(f'/api/live/{monitor.id}/events')
+    assert rv.mimetype == 'text/event-stream'
+    assert rv.headers['Access-Control-Allow-Origin'] == '*'
+    messages = rv.get_data(as_text=True).strip().split('\n\n')
+    updates = [json.loads(m.split('data: ', 1)[1]) for m in messages if m.startswith('id:')]
+    assert messages[-1].startswith('event: end')
+    assert updates and updates[-1]['time_s'] == pytest.approx(40.0, abs=0.01)
+    assert set(updates[-1]['curves']) == {'X', 'Y', 'Z'}
+    assert set(updates[-1]['axes']) == {'X', 'Y', 'Z'}
+    axes = updates[-1]['axes']
+    assert axes['X']['vc_class'] == 'VC-D' and axes['Y']['vc_class'] == axes['Z']['vc_class'] == 'VC-F'
+    assert updates[-1]['vc_class'] == 'VC-D'
+
+    monitor.join(5)
+    assert any(m['id'] == monitor.id and m['status'] == 'stopped'
+               for m in client.get('/api/live').get_json()['monitors'])
+    assert client.delete('/api/live/unknown').status_code == 404
+    assert client.post('/api/live', json={'path': 'missing.txt'}).status_code == 400
+
+
+def test_vectorized_vc_curves_match_endaq():
+    """Stacked band integration reproduces endaq's VC curves, across frequency grids."""
+    import endaq
+    from vibecheck.vc_octave import band_table, vc_curves_frames
+    from vibecheck.vc_psd import ArrayChannelReader, welch_streaming
+
+    rng = np.random.default_rng(7)
+    psds = [welch_streaming(ArrayChannelReader(rng.normal(size=(n, 3)), fs, ['X (a)', 'Y (a)', 'Z (a)']), 1.0)
+            for n, fs in ((20_000, 1000.0), (30_000, 1000.0), (50_000, 5000.0))]
+    for fstart, octave_bins in ((1.0, 3.0), (2.0, 12.0)):
+        for psd, vc in zip(psds, vc_curves_frames(psds, fstart, octave_bins)):
+            expected = endaq.calc.psd.vc_curves(psd, fstart=fstart, octave_bins=octave_bins)
+            np.testing.assert_array_equal(vc.index, expected.index)
+            assert list(vc.columns) == list(expected.columns)
+            np.testing.assert_allclose(vc.to_numpy(), expected.to_numpy(), rtol=1e-8)
+    assert band_table(psds[0].index, 1.0, 3.0) is band_table(psds[1].index, 1.0, 3.0)
+
+
+def test_decimated_psd_matches_full_rate_in_band():
+    """Decimation before the PSD keeps the in-band PSD and VC curves of the full-rate analysis."""
+    from vibecheck.vc_analyzer_endaq import channel_vc_curves
+    from vibecheck.vc_psd import ArrayChannelReader, DecimatedReader, Decimator, welch_streaming
+
+    rng = np.random.default_rng(8)
+    t = np.arange(200_003) / 2000.0
+    data = rng.normal(scale=1e-4, size=(len(t), 2)) + 1e-3 * np.sin(2 * np.pi * 31.0 * t)[:, np.newaxis]
+    reader = ArrayChannelReader(data, 2000.0, ['X (a)', 'Y (a)'])
+
+    # Streaming output equals the delay-compensated FIR filter, sampled every q
+    decimator = Decimator(reader.sample_rate, 60.0, 2)
+    out = np.concatenate([decimator.process(b) for b in reader.iter_blocks(7_919)] + [decimator.flush()])
+    filtered = np.stack([np.convolve(data[:, i], decimator.taps) for i in range(2)], axis=1)
+    np.testing.assert_allclose(out, filtered[decimator.delay::decimator.q][:len(out)], atol=1e-15)
+    assert len(out) == -(-len(data) // decimator.q)
+
+    decimated = DecimatedReader(reader, 60.0, bin_width=0.5)
+    full, reduced = welch_streaming(reader, 0.5), welch_streaming(decimated, 0.5)
+    assert decimated.q > 1 and len(reduced) < len(full) / decimated.q + 1
+    in_band = reduced.index[(reduced.index >= 1) & (reduced.index <= 60)]
+    np.testing.assert_allclose(reduced.loc[in_band], full.loc[in_band], rtol=1e-3)
+
+    params = {'bin_width': 0.5, 'fstart': 1.0, 'octave_bins': 3.0}
+    vc_full = channel_vc_curves(reader, params)
+    vc_reduced = channel_vc_curves(reader, dict(params, band_hz=50.0))
+    assert 50.0 < vc_reduced.index.max() < 50.0 * 2 ** (1 / 6)
+    np.testing.assert_allclose(vc_reduced, vc_full.loc[vc_reduced.index], rtol=1e-3)
+
+
+def test_fft_plan_cache_reuse_and_stats(client):
+    """Accumulators share cached Welch plans; hits and evictions show up in /api/stats."""
+    from vibecheck.vc_fftplans import PlanCache, get_plan_cache
+    from vibecheck.vc_psd import WelchAccumulator
+
+    cache = PlanCache(max_entries=2)
+    first = cache.welch_plan(1000)
+    assert cache.welch_plan(1000) is first
+    cache.welch_plan(2000)
+    cache.welch_plan(4000)
+    assert cache.welch_plan(1000) is not first
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['evictions'], stats['entries']) == (1, 4, 2, 2)
+
+    before = get_plan_cache().stats()['hits']
+    a, b = WelchAccumulator(1000.0, 0.5, 3), WelchAccumulator(1000.0001, 0.5, 1)
+    assert a.window is b.window
+    body = client.get('/api/stats').get_json()
+    assert body['fft_plans']['hits'] >= before + 1
+    assert 'reports' in body
+
+
+def test_metrics_stages_and_prometheus_endpoint(client):
+    """Stage timers, worker capture and HTTP counters render as Prometheus text."""
+    from vibecheck.vc_metrics import STAGE_METRIC, MetricsRegistry, _max_rss, current_rss
+
+    registry = MetricsRegistry(buckets=(0.1, 1.0))
+    with registry.stage('welch'):
+        pass
+    # A buffer freed before the stage ends still counts, through the peak
+    size = _max_rss() - current_rss() + 64 * 2**20
+    with registry.stage('decode'):
+        buffer = np.ones(size // 8)
+        del buffer
+    with registry.capture() as captured:
+        registry.observe(STAGE_METRIC, 0.5, stage='ide_parse')
+        registry.inc('vibecheck_analysis_cache_total', result='hit')
+    assert 'ide_parse' not in registry.render_prometheus()
+    registry.record(captured)
+    text = registry.render_prometheus()
+    assert 'vibecheck_stage_duration_seconds_bucket{stage="welch",le="0.1"} 1' in text
+    assert 'vibecheck_stage_duration_seconds_bucket{stage="ide_parse",le="0.1"} 0' in text
+    assert 'vibecheck_stage_duration_seconds_bucket{stage="ide_parse",le="1"} 1' in text
+    assert 'vibecheck_stage_duration_seconds_count{stage="ide_parse"} 1' in text
+    assert 'vibecheck_analysis_cache_total{result="hit"} 1' in text
+    assert 'vibecheck_stage_peak_rss_increase_bytes{stage="welch"}' in text
+    growth = registry._gauges[('vibecheck_stage_peak_rss_increase_bytes', (('stage', 'decode'),))]
+    assert growth >= 32 * 2**20
+
+    disabled = MetricsRegistry(enabled=False)
+    with disabled.stage('welch'):
+        disabled.inc('vibecheck_analysis_cache_total', result='hit')
+    assert disabled.render_prometheus().count('vibecheck_stage') == 0
+
+    client.get('/api/health')
+    rv = client.get('/api/metrics')
+    assert rv.mimetype == 'text/plain'
+    body = rv.get_data(as_text=True)
+    assert '# TYPE vibecheck_http_request_duration_seconds histogram' in body
+    assert 'vibecheck_http_requests_total{endpoint="health_check",status="200"}' in body
+
+
+def test_async_logging_defers_formatting_and_temp_log_roundtrip(tmp_path):
+    """Records are formatted on the listener thread; the temp log keeps one open handle."""
+    import logging
+    import threading
+    from vibecheck import vc_utils
+    from vibecheck.vc_logging import start_listener
+
+    rendered_on = []
+
+    class Costly:
+        def __str__(self):
+            rendered_on.append(threading.current_thread())
+            return "costly"
+
+    handler = logging.FileHandler(tmp_path / "app.log", encoding="utf-8")
+    handler.setFormatter(logging.Formatter("%(levelname)s %(message)s"))
+    queue_handler, listener = start_listener(handler)
+    logger = logging.getLogger("vibecheck.test_async")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    logger.addHandler(queue_handler)
+    try:
+        logger.debug("never rendered %s", Costly())
+        logger.info("rendered later %s", Costly())
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            logger.error("failed", exc_info=True)
+        assert listener.flush()
+    finally:
+        logger.removeHandler(queue_handler)
+        listener.close()
+    assert len(rendered_on) == 1 and rendered_on[0] is not threading.current_thread()
+    text = (tmp_path / "app.log").read_text(encoding="utf-8")
+    assert "INFO rendered later costly" in text
+    assert "ValueError: boom" in text
+
+    path = vc_utils.create_temp_log()
+    try:
+        vc_utils._write_to_temp_log("step one", "warning")
+        vc_utils._write_to_temp_log("step two", "progress")
+        assert vc_utils.log_error_to_file("bad input", "Traceback ...", "ValueError") == path
+        content = open(path, encoding="utf-8").read()
+        assert content.startswith("VibeCheck Pro Temporary Log")
+        assert "[WARNING] step one" in content
+        assert "[INFO] step two" in content
+        assert "Error Type: ValueError" in content and "Traceback ..." in content
+    finally:
+        vc_utils.cleanup_temp_log()
+    assert not os.path.exists(path)
+
+
+def test_synthetic_ide_roundtrip_and_suite_comparison(tmp_path):
+    """Synthetic IDE files analyse like their generator; the suite flags slow-downs."""
+    from benchmarks.suite import compare
+    from benchmarks.synthetic import SyntheticChannelReader, write_synthetic_ide
+    from vibecheck.vc_analyzer_endaq import analysis_params, channel_vc_curves
+    from vibecheck.vc_psd import ArrayChannelReader
+
+    path = tmp_path / 'synthetic.IDE'
+    ids = write_synthetic_ide(str(path), 30_000, 2000.0, block_rows=500)
+    result = analyze_endaq(str(path), use_cache=False, workers=1, columnar=False)
+    assert ids == {'25g': 8, '40g': 80}
+    assert isinstance(result, tuple) and len(result) == 2
+    # The generator's noise depends on its block size; the file holds float32 samples
+    generator = SyntheticChannelReader(30_000, 2000.0, name='25g')
+    samples = np.concatenate(list(generator.iter_blocks(500))).astype(np.float32)
+    expected = channel_vc_curves(ArrayChannelReader(samples, 2000.0, generator.columns), analysis_params())
+    np.testing.assert_allclose(result[0].to_numpy(), expected.to_numpy(), rtol=1e-6)
+
+    def suite(**medians):
+        return {'results': {k: {'median_s': v} for k, v in medians.items()}}
+    rows = {row['key']: row['status'] for row in compare(
+        suite(a=1.30, b=0.0012, c=0.5, d=1.0), suite(a=1.0, b=0.001, c=1.0, e=1.0))}
+    assert rows == {'a': 'regression', 'b': 'ok', 'c': 'faster', 'd': 'new', 'e': 'missing'}
+
+
+def test_columnar_sidecar_projection_and_invalidation(tmp_path, monkeypatch):
+    """Sidecar reads match the IDE file, project axes/time ranges, and follow source changes."""
+    from benchmarks.synthetic import write_synthetic_ide
+    import vibecheck.vc_cache as vc_cache
+    import vibecheck.vc_columnar as vc_columnar
+    from vibecheck.vc_analyzer_endaq import IDEChannelSource
+    from vibecheck.vc_batch import _analyze_file
+    from vibecheck.vc_columnar import ColumnarStore
+
+    path = tmp_path / 'survey.IDE'
+    write_synthetic_ide(str(path), 20_000, 2000.0, block_rows=500)
+    store = ColumnarStore(str(tmp_path / 'columnar'))
+    sources = store.sources(str(path))
+    assert [s.channel_id for s in sources] == [8, 80] and store.misses == 1
+
+    ide = IDEChannelSource(str(path), 8).open()
+    sidecar = sources[0].open()
+    assert sidecar.columns == ide.columns and sidecar.n_samples == ide.n_samples
+    assert sidecar.sample_rate == ide.sample_rate
+    full = np.concatenate(list(ide.iter_blocks()))
+    np.testing.assert_array_equal(np.concatenate(list(sidecar.iter_blocks(block_rows=777))), full)
+
+    # Z only, samples 2000..5999 (times are 500 us apart)
+    t0 = sidecar.timestamp_ns(0)
+    window = store.sources(str(path), columns=['Z'], start_ns=t0 + 1_000_000_000,
+                           end_ns=t0 + 2_999_500_000)[0].open()
+    assert window.columns == ['Z (25g)'] and window.n_samples == 4000
+    np.testing.assert_array_equal(np.concatenate(list(window.iter_blocks())), full[2000:6000, 2:])
+    assert store.hits == 1
+
+    # Rewriting the recording invalidates the sidecar
+    write_synthetic_ide(str(path), 10_000, 2000.0, block_rows=500)
+    os.utime(path, ns=(0, 0))
+    assert store.load(str(path)) is None
+    assert store.sources(str(path))[0].open().n_samples == 10_000 and store.misses == 2
+
+    # Temporary copies (uploads, batch inputs) are read without writing a sidecar
+    monkeypatch.setattr(vc_columnar, '_default_store', store)
+    monkeypatch.setattr(vc_cache, '_default_cache', vc_cache.AnalysisCache(str(tmp_path / 'cache')))
+    upload = tmp_path / 'upload.IDE'
+    shutil.copy(path, upload)
+    assert _analyze_file(str(upload), str(tmp_path), columnar=False)["status"] == "ok"
+    assert store.load(str(upload)) is None and store.misses == 2
+
+
+def test_time_axis_channel_selection_is_pushed_down(tmp_path, client, monkeypatch):
+    """Windowed IDE readers match the full channel; selections key the cache and skip channels."""
+    import io
+    from benchmarks.synthetic import write_synthetic_ide
+    from vibecheck.vc_analyzer_endaq import IDEChannelSource, analysis_selection, analyze_endaq
+    from vibecheck.vc_cache import AnalysisCache
+
+    path = tmp_path / 'survey.IDE'
+    write_synthetic_ide(str(path), 20_000, 2000.0, block_rows=500)
+    full = np.concatenate(list(IDEChannelSource(str(path), 8).open().iter_blocks()))
+
+    # 1.0 s .. 3.0 s inclusive: samples 2000..6000 (times are 500 us apart)
+    selection = analysis_selection(start=1, end='0:03', axes='y,z')
+    assert selection == {'start_us': 1e6, 'end_us': 3e6, 'axes': ['Y', 'Z']}
+    window = IDEChannelSource(str(path), 8, selection).open()
+    assert window.columns == ['Y (25g)', 'Z (25g)'] and window.n_samples == 4001
+    assert window.timestamp_ns(0) == 1_000_000_000 and window.index_after(2_999_999_999) == 4000
+    np.testing.assert_array_equal(np.concatenate(list(window.iter_blocks(block_rows=333))), full[2000:6001, 1:])
+    assert window.to_dataframe().shape == (4001, 2)
+    # Only the blocks around the window were decoded
+    assert len(window.session) < 6000
+
+    cache = AnalysisCache(str(tmp_path / 'cache'))
+    result = analyze_endaq(str(path), cache=cache, workers=1, columnar=False, start=1, end=3, channels='40g')
+    assert result[0] is None and list(result[1].columns) == ['X', 'Y', 'Z']
+    cached = analyze_endaq(str(path), cache=cache, workers=1, columnar=False, start=1, end=3, channels='40g')
+    assert cached[0] is None and np.allclose(cached[1].values, result[1].values)
+    assert len(cache._entries()) == 1
+
+    # Without a sidecar, a selection reads the IDE file instead of ingesting all of it
+    import vibecheck.vc_columnar as vc_columnar
+    store = vc_columnar.ColumnarStore(str(tmp_path / 'columnar'))
+    monkeypatch.setattr(vc_columnar, '_default_store', store)
+    windowed = analyze_endaq(str(path), use_cache=False, workers=1, columnar=True, start=1, end=3, channels='40g')
+    assert np.allclose(windowed[1].values, result[1].values)
+    assert store.load(str(path)) is None and store.misses == 0
+
+    with pytest.raises(ValueError):
+        analysis_selection(start=5, end=2)
+    with pytest.raises(ValueError):
+        analyze_endaq(str(path), use_cache=False, workers=1, columnar=False, channels='100g')
+    rv = client.post('/api/analyze', data={'file': (io.BytesIO(b'x'), 'a.IDE'), 'start': 'soon'},
+                     content_type='multipart/form-data')
+    assert rv.status_code == 400
+
+
+def test_vc_spectrogram_windows_match_welch_and_classify(tmp_path, monkeypatch):
+    """Batched window curves equal a per-window Welch; parallel runs match and windows are classified."""
+    from benchmarks.synthetic import write_synthetic_ide
+    from vibecheck.vc_octave import vc_curves_array
+    from vibecheck.vc_psd import ArrayChannelReader, WelchAccumulator
+    import vibecheck.vc_spectrogram as vc_spectrogram_module
+    from vibecheck.vc_spectrogram import vc_spectrogram, window_vc_curves
+
+    rng = np.random.default_rng(0)
+    data = rng.standard_normal((50_000, 3)) * 1e-3
+    reader = ArrayChannelReader(data, 1000.0, ['X (a)', 'Y (a)', 'Z (a)'])
+    edges = [reader.timestamp_ns(0) + k * 10_000_000_000 for k in range(6)]
+    curves, centers = window_vc_curves(reader, edges, 1000.0, 0.25, 1.0, 3)
+    assert curves.shape == (5, len(centers), 3)
+    acc = WelchAccumulator(1000.0, 0.25, 3)
+    acc.update(data[20_000:30_000])
+    expected, _ = vc_curves_array(acc.psd().T, acc.freqs, 1.0, 3)
+    np.testing.assert_allclose(curves[2], expected.T, rtol=1e-10)
+
+    path = tmp_path / 'survey.IDE'
+    write_synthetic_ide(str(path), 40_000, 2000.0, block_rows=500)
+    serial = vc_spectrogram(str(path), 5, workers=1, columnar=False)
+    parallel = vc_spectrogram(str(path), 5, workers=2, columnar=False, channels='25g')
+    assert serial[0].curves.shape[:1] == (4,) and parallel[1] is None
+    np.testing.assert_allclose(parallel[0].curves, serial[0].curves, rtol=1e-10)
+    assert list(serial[0].summary().columns) == ['X', 'Y', 'Z', 'vc_class']
+    assert all(c is not None for c in serial[0].vc_class)
+    with pytest.raises(ValueError):
+        vc_spectrogram(str(path), 60, workers=1, columnar=False)
+
+    # A channel shorter than one window is left out; the others are still analysed
+    plan_windows = vc_spectrogram_module._plan_windows
+    monkeypatch.setattr(vc_spectrogram_module, '_plan_windows',
+                        lambda reader, seconds: plan_windows(reader, 1e6 if '40g' in reader.name else seconds))
+    partial = vc_spectrogram(str(path), 5, workers=1, columnar=False)
+    assert partial[1] is None
+    np.testing.assert_allclose(partial[0].curves, serial[0].curves, rtol=1e-10)
+
+
+def test_quantile_sketch_envelopes_and_shaded_bands(tmp_path):
+    """Sketch quantiles stay within their relative accuracy; envelopes reach the report as shaded bands."""
+    from benchmarks.synthetic import write_synthetic_ide
+    from vibecheck.vc_plot_sensor_data import build_vc_figure_specs
+    from vibecheck.vc_quantiles import QuantileSketch
+
+    rng = np.random.default_rng(1)
+    values = rng.lognormal(-12, 2, size=(5000, 4, 3))
+    sketch = QuantileSketch((4, 3), relative_accuracy=0.01)
+    for chunk in np.array_split(values, 7):
+        sketch.update(chunk)
+    half = QuantileSketch((4, 3), relative_accuracy=0.01)
+    half.update(values[:2500])
+    other = QuantileSketch((4, 3), relative_accuracy=0.01)
+    other.update(values[2500:])
+    assert np.array_equal(half.merge(other).counts, sketch.counts)
+    for q in (0.1, 0.5, 0.9):
+        exact = np.quantile(values, q, axis=0, method='lower')
+        assert np.all(np.abs(sketch.quantile(q) / exact - 1) <= 0.01 + 1e-12)
+    assert np.isnan(QuantileSketch((2,)).quantile(0.5)).all()
+
+    path = tmp_path / 'survey.IDE'
+    write_synthetic_ide(str(path), 60_000, 2000.0, block_rows=500)
+    frames = analyze_endaq(str(path), use_cache=False, workers=1, columnar=False, envelopes=True)
+    df = frames[0]
+    assert list(df.columns[:4]) == ['X', 'Y', 'Z', 'X L10']
+    assert np.all(df['Z L10'] >= df['Z L50']) and np.all(df['Z L50'] >= df['Z L90'])
+    specs = build_vc_figure_specs([{"name": "25G Sensor", "df": df}])
+    z = [s for s in specs if s["axis"] == "Z"][0]
+    assert z["data"][0]["name"] == "Measured (Z)"
+    assert [t.get("fill") for t in z["data"][1:]] == [None, "tonexty", None]
+    assert [t["name"] for t in z["data"][1:]] == ["L90 (Z)", "L10–L90 (Z)", "L50 (Z)"]
+
+
+def test_comparison_report_overlays_files_from_cache(tmp_path, monkeypatch, client):
+    """Comparisons overlay one trace per file and reuse cached analyses without re-hashing."""
+    import io
+    from benchmarks.synthetic import write_synthetic_ide
+    import vibecheck.vc_cache as vc_cache
+    import vibecheck.vc_columnar as vc_columnar
+    from vibecheck.vc_compare import analyze_files, build_comparison_report, comparison_figure_specs
+
+    cache = vc_cache.AnalysisCache(str(tmp_path / 'cache'))
+    monkeypatch.setattr(vc_cache, '_default_cache', cache)
+    monkeypatch.setattr(vc_columnar, '_default_store', vc_columnar.ColumnarStore(str(tmp_path / 'columnar')))
+    paths = []
+    for i in range(3):
+        paths.append(str(tmp_path / f'site{i}.IDE'))
+        write_synthetic_ide(paths[-1], 20_000, 2000.0, block_rows=500, seed=10 * i)
+
+    html = build_comparison_report(paths[:2], workers=1)
+    assert html is not None and 'Comparison of 2 files' in html
+    assert cache.misses == 2 and cache.hits == 0
+
+    # Adding a file analyses only that file; the others are neither analysed nor re-hashed
+    hashed = []
+    monkeypatch.setattr(vc_cache, 'hash_file', lambda path, *a: hashed.append(path) or 'h' + path)
+    entries = analyze_files(paths, ['a', 'b', 'c'], workers=1)
+    assert cache.hits == 2 and cache.misses == 3 and hashed == [os.path.abspath(paths[2])]
+    specs = comparison_figure_specs(entries)
+    assert [(s["name"], s["axis"]) for s in specs][:3] == [("25G Sensor", "X"), ("25G Sensor", "Y"),
+                                                           ("25G Sensor", "Z")]
+    assert all([t["name"] for t in s["data"]] == ['a', 'b', 'c'] for s in specs)
+    assert specs[0]["data"][0]["line"]["color"] != specs[0]["data"][1]["line"]["color"]
+
+    rv = client.post('/api/compare', data={'files': [(io.BytesIO(b'x'), 'a.IDE')]},
+                     content_type='multipart/form-data')
+    assert rv.status_code == 400
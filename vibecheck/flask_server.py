@@ -5,20 +5,25 @@ import tempfile
 import webbrowser
 import threading
 import time
-from pathlib import Path
-from flask import Flask, request, send_file, jsonify
+import shutil
+import json
+from flask import Flask, g, request, send_file, jsonify, Response, stream_with_context
 from werkzeug.utils import secure_filename
-from .vc_analyzer_endaq import analyze_endaq
-from .vc_plot_sensor_data import create_vc_plots_plotly
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
+# Analysis and plotting modules (endaq, scipy, pandas, plotly) are imported
+# lazily inside the routes so /api/health answers within milliseconds of
+# start-up; prewarm() loads them in the background afterwards.
+from .vc_config import PLOTLYJS_ASSET_ROUTE, PREWARM_DELAY_SECONDS
+from .vc_logging import configure_logging
+from .vc_metrics import HTTP_METRIC, inc, observe, render_prometheus, stage
+from .vc_upload import UploadRequest, upload_source
+
+# Log records are written by a background thread, off the request path
+configure_logging()
 logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
+# Uploads are parsed straight into the buffer the analysis reads from
+app.request_class = UploadRequest
 
 # Constants
 ALLOWED_EXTENSIONS = {'ide', 'IDE'}
@@ -50,10 +55,86 @@ def launch_chrome(url):
         # Fallback to default browser
         webbrowser.open(url)
 
+def _plotly_js_url():
+    """Absolute URL of the shared Plotly.js asset, so saved reports still resolve it."""
+    from .vc_plot_sensor_data import plotly_js_version
+    return f"{request.host_url.rstrip('/')}{PLOTLYJS_ASSET_ROUTE}?v={plotly_js_version()}"
+
+@app.route(PLOTLYJS_ASSET_ROUTE)
+def plotly_js_asset():
+    """Serve the Plotly.js bundle once, with long-lived caching."""
+    from .vc_plot_sensor_data import get_plotly_js, plotly_js_version
+
+    etag = f'"plotly-{plotly_js_version()}"'
+    if request.headers.get('If-None-Match') == etag:
+        return Response(status=304, headers={'ETag': etag})
+    response = Response(get_plotly_js(), mimetype='application/javascript')
+    response.headers['ETag'] = etag
+    response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
+
+_prewarm_started = threading.Event()
+_prewarm_done = threading.Event()
+
+def prewarm():
+    """Import the analysis stack and load Plotly.js so the first report is fast."""
+    start = time.perf_counter()
+    try:
+        from . import vc_analyzer_endaq  # noqa: F401  (endaq, scipy, pandas)
+        from .vc_plot_sensor_data import get_plotly_js
+        get_plotly_js()
+        logger.info(f"Pre-warmed analysis modules in {time.perf_counter() - start:.2f} s")
+    except Exception as e:
+        logger.error(f"Pre-warm failed: {e}")
+    finally:
+        _prewarm_done.set()
+
+def start_prewarm(delay=0.0):
+    """Start :func:`prewarm` once, in a background thread."""
+    if _prewarm_started.is_set():
+        return
+    _prewarm_started.set()
+    timer = threading.Timer(delay, prewarm)
+    timer.daemon = True
+    timer.start()
+
+@app.before_request
+def _start_timer():
+    g.request_start = time.perf_counter()
+
+@app.after_request
+def _record_request(response):
+    """Latency histogram and response counter per endpoint (streams: until the first byte)."""
+    start = g.pop('request_start', None)
+    endpoint = request.endpoint or 'unknown'
+    if start is not None:
+        observe(HTTP_METRIC, time.perf_counter() - start, endpoint=endpoint)
+    inc("vibecheck_http_requests_total", endpoint=endpoint, status=response.status_code)
+    return response
+
+@app.route('/api/metrics')
+def metrics():
+    """Stage timings, peak memory growth per stage and counters in Prometheus text format."""
+    return Response(render_prometheus(), mimetype='text/plain; version=0.0.4')
+
 @app.route('/api/health')
 def health_check():
-    """Health check endpoint."""
-    return jsonify({"status": "healthy"})
+    """Health check endpoint; the first call also starts pre-warming."""
+    start_prewarm()
+    return jsonify({"status": "healthy", "warm": _prewarm_done.is_set()})
+
+@app.route('/api/stats')
+def stats():
+    """Cache statistics of this server process."""
+    from .vc_columnar import get_columnar_store
+    from .vc_fftplans import get_plan_cache
+    from .vc_reports import get_report_store
+
+    return jsonify({
+        "columnar": get_columnar_store().stats(),
+        "fft_plans": get_plan_cache().stats(),
+        "reports": get_report_store().stats(),
+    })
 
 @app.route('/api/analyze', methods=['POST'])
 def analyze():
@@ -69,21 +150,38 @@ def analyze():
         if not allowed_file(file.filename):
             return jsonify({"error": "Invalid file type. Please select an IDE file."}), 400
 
-        # Create a secure temporary directory
-        temp_dir = tempfile.mkdtemp(prefix='vibecheck_')
+        # Optional time window / axes / channels, e.g. start=10&end=70&axes=Z&channels=25g
+        selection = {k: request.form[k] for k in ("start", "end", "axes", "channels")
+                     if request.form.get(k, "").strip()}
+        if selection:
+            from .vc_analyzer_endaq import analysis_selection
+            try:
+                analysis_selection(**selection)
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+
         try:
-            # Save uploaded file
-            file_path = os.path.join(temp_dir, secure_filename(file.filename))
-            file.save(file_path)
-            logger.info(f"File saved to: {file_path}")
-            
-            # Generate HTML report
-            html_path = os.path.join(temp_dir, 'report.html')
-
-            if not create_vc_plots_plotly(file_path, html_path):
+            from .vc_plot_sensor_data import build_vc_report
+
+            # Analyse the upload from its in-memory/spooled buffer and send the
+            # report straight from memory: no temp-dir copy of either
+            name = secure_filename(file.filename)
+            # The report references the Plotly.js bundle served by /assets
+            html = build_vc_report(upload_source(file), name, plotly_js="shared",
+                                   plotly_js_url=_plotly_js_url(), selection=selection, columnar=False,
+                                   remember=False,
+                                   envelopes=request.form.get('envelopes', '').lower() in ('1', 'true', 'on'))
+            if html is None:
                 return jsonify({"error": "Failed to generate report"}), 500
 
-            return send_file(html_path, mimetype='text/html')
+            # Keep a copy under a stable id so the report can be reopened via /view
+            from .vc_reports import get_report_store
+            with stage("report_store"):
+                report_id = get_report_store().put(html)
+            response = Response(html, mimetype='text/html')
+            response.headers['X-Report-Id'] = report_id
+            response.headers['X-Report-Url'] = f"/view/{report_id}/report.html"
+            return response
 
         except Exception as e:
             logger.error(f"Error during processing: {str(e)}")
@@ -95,48 +193,261 @@ def analyze():
         logger.error("Traceback:", exc_info=True)
         return jsonify({"error": str(e)}), 500
 
-@app.route('/view/<path:filename>')
-def view_report(filename):
-    """Serve the HTML report."""
+@app.route('/api/analyze/batch', methods=['POST'])
+def analyze_batch():
+    """Analyze several IDE files, streaming one NDJSON progress line per finished file."""
+    from .vc_batch import collect_ide_files, iter_batch, write_batch_report
+
+    files = [f for f in request.files.getlist('files') if f.filename]
+    if not files:
+        return jsonify({"error": "No files provided"}), 400
+    invalid = [f.filename for f in files if not allowed_file(f.filename)]
+    if invalid:
+        return jsonify({"error": f"Invalid file type: {', '.join(invalid)}"}), 400
+
+    from .vc_reports import get_report_store
+
+    names = [secure_filename(f.filename) for f in files]
+    duplicates = sorted({n for n in names if names.count(n) > 1})
+    if duplicates:
+        return jsonify({"error": f"Duplicate file names: {', '.join(duplicates)}"}), 400
+
+    input_dir = tempfile.mkdtemp(prefix='vibecheck_')
+    for file, name in zip(files, names):
+        file.save(os.path.join(input_dir, name))
     try:
-        # Find the report in the most recent temp directory
-        temp_dirs = sorted(
-            [d for d in Path(tempfile.gettempdir()).glob('vibecheck_*')],
-            key=lambda x: x.stat().st_mtime,
-            reverse=True
-        )
-        
-        if not temp_dirs:
-            return "Report not found", 404
-            
-        report_path = temp_dirs[0] / filename
-        if not report_path.exists():
-            return "Report not found", 404
-            
-        return send_file(str(report_path), mimetype='text/html')
-        
+        paths = collect_ide_files(input_dir)
+    except ValueError as e:
+        shutil.rmtree(input_dir, ignore_errors=True)
+        return jsonify({"error": str(e)}), 400
+
+    store = get_report_store()
+    report_id = store.create()
+    output_dir = store.report_dir(report_id)
+
+    def generate():
+        start = time.time()
+        summaries = []
+        try:
+            for event in iter_batch(paths, output_dir, columnar=False, remember=False):
+                summaries.append(event["summary"])
+                yield json.dumps(event) + "\n"
+            elapsed = time.time() - start
+            write_batch_report(summaries, output_dir, elapsed)
+            yield json.dumps({
+                "complete": True,
+                "total": len(paths),
+                "files_per_sec": len(paths) / elapsed if elapsed > 0 else None,
+                "report_id": report_id,
+                "report": f"/view/{report_id}/batch_report.html",
+            }) + "\n"
+        except Exception as e:
+            logger.error(f"Batch analysis failed: {str(e)}", exc_info=True)
+            yield json.dumps({"complete": True, "error": str(e)}) + "\n"
+        finally:
+            shutil.rmtree(input_dir, ignore_errors=True)
+            store.finalize(report_id)
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+@app.route('/api/compare', methods=['POST'])
+def compare():
+    """Overlay the VC curves of several IDE files in one HTML report."""
+    from .vc_config import MAX_FILES
+
+    files = [f for f in request.files.getlist('files') if f.filename]
+    if len(files) < 2:
+        return jsonify({"error": "At least two files are needed for a comparison"}), 400
+    if len(files) > MAX_FILES:
+        return jsonify({"error": f"Too many files: {len(files)} (maximum is {MAX_FILES})"}), 400
+    invalid = [f.filename for f in files if not allowed_file(f.filename)]
+    if invalid:
+        return jsonify({"error": f"Invalid file type: {', '.join(invalid)}"}), 400
+
+    try:
+        from .vc_compare import build_comparison_report
+        from .vc_reports import get_report_store
+
+        # Previously analysed uploads are served from the analysis cache
+        html = build_comparison_report([upload_source(f) for f in files],
+                                       [secure_filename(f.filename) for f in files],
+                                       plotly_js="shared", plotly_js_url=_plotly_js_url(), columnar=False,
+                                       remember=False)
+        if html is None:
+            return jsonify({"error": "Failed to generate report"}), 500
+        with stage("report_store"):
+            report_id = get_report_store().put(html)
+        response = Response(html, mimetype='text/html')
+        response.headers['X-Report-Id'] = report_id
+        response.headers['X-Report-Url'] = f"/view/{report_id}/report.html"
+        return response
     except Exception as e:
-        logger.error(f"Error serving report: {e}")
-        return str(e), 500
+        logger.error(f"Comparison failed: {str(e)}", exc_info=True)
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/jobs', methods=['POST'])
+def submit_job():
+    """Queue an IDE file for background analysis and return its job id."""
+    from .vc_jobs import QueueFullError, get_job_queue
+
+    if 'file' not in request.files:
+        return jsonify({"error": "No file provided"}), 400
+    file = request.files['file']
+    if file.filename == '':
+        return jsonify({"error": "No file selected"}), 400
+    if not allowed_file(file.filename):
+        return jsonify({"error": "Invalid file type. Please select an IDE file."}), 400
 
-def cleanup_old_reports():
-    """Clean up old report directories."""
+    temp_dir = tempfile.mkdtemp(prefix='vibecheck_')
+    file_path = os.path.join(temp_dir, secure_filename(file.filename))
+    file.save(file_path)
     try:
-        temp_dirs = Path(tempfile.gettempdir()).glob('vibecheck_*')
-        for d in temp_dirs:
-            if (time.time() - d.stat().st_mtime) > 3600:  # 1 hour old
+        job = get_job_queue().submit(file_path, temp_dir, file.filename)
+    except QueueFullError as e:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        response = jsonify({"error": str(e)})
+        response.headers['Retry-After'] = '10'
+        return response, 503
+
+    logger.info("Queued job %s for %s", job.id, file.filename)
+    body = job.to_dict()
+    body["status_url"] = f"/api/jobs/{job.id}"
+    body["result_url"] = f"/api/jobs/{job.id}/result"
+    return jsonify(body), 202
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    """Report a job's status and progress."""
+    from .vc_jobs import get_job_queue
+
+    job = get_job_queue().get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job.to_dict())
+
+@app.route('/api/jobs/<job_id>', methods=['DELETE'])
+@app.route('/api/jobs/<job_id>/cancel', methods=['POST'])
+def cancel_job(job_id):
+    """Cancel a queued or running job."""
+    from .vc_jobs import get_job_queue
+
+    job = get_job_queue().cancel(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job.to_dict())
+
+@app.route('/api/jobs/<job_id>/result')
+def job_result(job_id):
+    """Download the HTML report of a finished job."""
+    from .vc_jobs import DONE, get_job_queue
+
+    job = get_job_queue().get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    if job.status != DONE:
+        return jsonify({"error": f"Job is {job.status}", "status": job.status}), 409
+    return send_file(job.result_path, mimetype='text/html')
+
+@app.route('/api/live', methods=['POST'])
+def start_live():
+    """Start monitoring a recording on the server's disk; updates stream from events_url."""
+    from .vc_live import IDEFollowSource, MonitorLimitError, ReplaySource, get_live_registry
+
+    body = request.get_json(silent=True) or {}
+    path = body.get('path')
+    if not path or not allowed_file(path):
+        return jsonify({"error": "Expected the path of an IDE file"}), 400
+    if not os.path.isfile(path):
+        return jsonify({"error": f"File not found: {path}"}), 404
+
+    channel = body.get('channel')
+    if body.get('replay'):
+        # Replay a finished recording (real time unless a speed is given)
+        try:
+            source = ReplaySource.from_ide(path, channel, speed=body.get('speed', 1.0))
+        except Exception as e:
+            return jsonify({"error": str(e)}), 400
+    else:
+        source = IDEFollowSource(path, channel)
+
+    try:
+        monitor = get_live_registry().start(source, os.path.basename(path))
+    except MonitorLimitError as e:
+        response = jsonify({"error": str(e)})
+        response.headers['Retry-After'] = '10'
+        return response, 503
+    body = monitor.to_dict()
+    body["events_url"] = f"/api/live/{monitor.id}/events"
+    return jsonify(body), 202
+
+@app.route('/api/live', methods=['GET'])
+def list_live():
+    """List live monitors."""
+    from .vc_live import get_live_registry
+
+    return jsonify({"monitors": get_live_registry().list()})
+
+@app.route('/api/live/<monitor_id>', methods=['DELETE'])
+def stop_live(monitor_id):
+    """Stop a live monitor; its event streams end."""
+    from .vc_live import get_live_registry
+
+    monitor = get_live_registry().stop(monitor_id)
+    if monitor is None:
+        return jsonify({"error": "Monitor not found"}), 404
+    return jsonify(monitor.to_dict())
+
+@app.route('/api/live/<monitor_id>/events')
+def live_events(monitor_id):
+    """Server-sent events: one "data:" message per update, then an "end" event."""
+    import queue
+    from .vc_config import LIVE_HEARTBEAT_SECONDS
+    from .vc_live import get_live_registry
+
+    monitor = get_live_registry().get(monitor_id)
+    if monitor is None:
+        return jsonify({"error": "Monitor not found"}), 404
+    events = monitor.subscribe()
+
+    def generate():
+        try:
+            while True:
                 try:
-                    import shutil
-                    shutil.rmtree(d)
-                except:
-                    pass
-    except:
-        pass
+                    event, payload = events.get(timeout=LIVE_HEARTBEAT_SECONDS)
+                except queue.Empty:
+                    yield ": keep-alive\n\n"
+                    continue
+                if event == "end":
+                    yield f"event: end\ndata: {json.dumps(payload)}\n\n"
+                    return
+                yield f"id: {payload['seq']}\ndata: {json.dumps(payload)}\n\n"
+        finally:
+            monitor.unsubscribe(events)
+
+    response = Response(stream_with_context(generate()), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    # The Electron window (a file:// page) reads the stream with EventSource
+    response.headers['Access-Control-Allow-Origin'] = '*'
+    return response
+
+@app.route('/view/<report_id>/<path:filename>')
+def view_report(report_id, filename):
+    """Serve a file of a stored report."""
+    from .vc_reports import get_report_store
+
+    path = get_report_store().path(report_id, filename)
+    if path is None:
+        return "Report not found", 404
+    return send_file(path)
 
 if __name__ == '__main__':
-    # Start cleanup thread
-    cleanup_thread = threading.Thread(target=cleanup_old_reports, daemon=True)
-    cleanup_thread.start()
-    
+    # Evict stale reports now and on a periodic schedule
+    from .vc_reports import get_report_store
+    get_report_store()
+
+    # Load the heavy modules once the server is accepting requests
+    start_prewarm(PREWARM_DELAY_SECONDS)
+
     # Start Flask server
     app.run(port=5001, debug=False) 
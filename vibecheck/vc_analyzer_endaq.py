@@ -1,61 +1,432 @@
+import io
+import logging
+import os
 import endaq
-import traceback
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
-def analyze_endaq(file_path):
+from .vc_cache import get_analysis_cache
+from .vc_config import (
+    ANALYSIS_BAND_HZ,
+    ANALYSIS_BIN_WIDTH,
+    ANALYSIS_DECIMATE,
+    ANALYSIS_FSTART,
+    ANALYSIS_OCTAVE_BINS,
+    COLUMNAR_ENABLED,
+    ENVELOPE_LEVELS,
+    ENVELOPE_SKETCH_ACCURACY,
+    NUM_WORKERS,
+    PLOT_FREQ_RANGE,
+    SPECTROGRAM_WINDOW_SECONDS,
+)
+from .vc_metrics import capture, inc, record, stage
+from .vc_octave import vc_curves_frame, vc_curves_frames
+from .vc_psd import DecimatedReader, IDEChannelReader, channel_psd
+
+logger = logging.getLogger(__name__)
+
+
+def analysis_params(decimate=ANALYSIS_DECIMATE, envelopes=False):
+    """Return the parameters that determine the analysis output (used as cache key)."""
+    params = {
+        "bin_width": ANALYSIS_BIN_WIDTH,
+        "fstart": ANALYSIS_FSTART,
+        "octave_bins": ANALYSIS_OCTAVE_BINS,
+    }
+    if decimate:
+        params["band_hz"] = ANALYSIS_BAND_HZ or PLOT_FREQ_RANGE[1]
+    if envelopes:
+        params["envelopes"] = {
+            "levels": list(ENVELOPE_LEVELS),
+            "window_seconds": SPECTROGRAM_WINDOW_SECONDS,
+            "accuracy": ENVELOPE_SKETCH_ACCURACY,
+        }
+    return params
+
+
+def _parse_offset_us(value):
+    """Seconds (number or numeric string) or an ``endaq`` time string ("1:30") -> microseconds."""
+    if value is None or value == "":
+        return None
     try:
-        print(f"Opening IDE file: {file_path}")
-        # Get the document and channels
-        doc = endaq.ide.get_doc(file_path)
-        print("Successfully loaded IDE document")
+        return float(value) * 1e6
+    except (TypeError, ValueError):
+        pass
+    from endaq.ide.util import parse_time
+    return float(parse_time(value))
+
+
+def _parse_list(value):
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = value.split(",")
+    items = [str(v).strip() for v in value if str(v).strip()]
+    return items or None
+
+
+def analysis_selection(start=None, end=None, axes=None, channels=None):
+    """
+    Normalise a time-window, axis and channel selection.
+
+    Args:
+        start: Start of the window, relative to the start of the recording: seconds,
+            or a time string such as ``"1:30"`` (see ``endaq.ide.util.parse_time``)
+        end: End of the window, as ``start``
+        axes: Axis letters (``["Z"]``, or ``"X,Y"``)
+        channels: Channel ids or name fragments (``[8]``, or ``"25g"``)
+
+    Returns:
+        dict or None: The selection (part of the analysis parameters), or None
+        if everything is selected
+    """
+    selection = {}
+    start_us, end_us = _parse_offset_us(start), _parse_offset_us(end)
+    if start_us is not None and start_us < 0:
+        raise ValueError(f"Start time must not be negative: {start}")
+    if start_us is not None and end_us is not None and end_us <= start_us:
+        raise ValueError(f"End time ({end}) must be after start time ({start})")
+    if start_us is not None:
+        selection["start_us"] = start_us
+    if end_us is not None:
+        selection["end_us"] = end_us
+    axes = _parse_list(axes)
+    if axes:
+        selection["axes"] = sorted({a.upper() for a in axes})
+    channels = _parse_list(channels)
+    if channels:
+        selection["channels"] = channels
+    return selection or None
+
+
+def _match_channel(channel_id, name, selectors):
+    for selector in selectors:
+        if selector.isdigit() and int(selector) == channel_id:
+            return True
+        if not selector.isdigit() and selector.lower() in name.lower():
+            return True
+    return False
+
+
+def _us_to_ns_bound(t_us):
+    return None if t_us is None else int(t_us * 1e3)
+
+
+def _pack_results(frames):
+    """Return results in the historical shape: one DataFrame, or a tuple per channel."""
+    if len(frames) == 1:
+        return frames[0]
+    return tuple(frames)
+
+
+def is_in_memory(file_path):
+    """True if ``file_path`` is the contents of an IDE file rather than its path."""
+    return isinstance(file_path, (bytes, bytearray, memoryview))
+
+
+def open_ide(file_path, parsed=True, **kwargs):
+    """
+    ``endaq.ide.get_doc`` for a path, or for IDE contents already in memory.
+
+    In-memory contents (e.g. an upload) are read through the same
+    ``openFile``/``readData`` calls ``get_doc`` uses, without touching disk.
+    """
+    if not is_in_memory(file_path):
+        return endaq.ide.get_doc(file_path, parsed=parsed, **kwargs)
+    from endaq.ide.files import openFile, readData, validate
+    stream = io.BytesIO(file_path)
+    if not validate(stream):
+        raise ValueError("Could not read a Dataset from upload (not an IDE file?)")
+    doc = openFile(stream)
+    if parsed:
+        readData(doc, **kwargs)
+    return doc
+
+
+def describe_source(file_path):
+    """Human-readable name of an IDE path or in-memory contents, for messages."""
+    if is_in_memory(file_path):
+        return f"<{len(file_path)} bytes in memory>"
+    return str(file_path)
+
+
+class IDEChannelSource:
+    """
+    Picklable handle on one channel of an IDE file.
+
+    ``idelib`` channels cannot be sent to another process, so worker processes
+    receive this instead and parse only the channel they need. ``file_path``
+    may also be the file's contents (see :func:`open_ide`).
+
+    With a ``selection`` (see :func:`analysis_selection`) only the data
+    blocks overlapping the time window are decoded, and the reader returns
+    only the selected samples and axes.
+    """
+
+    def __init__(self, file_path, channel_id, selection=None):
+        self.file_path = file_path
+        self.channel_id = channel_id
+        self.selection = selection or {}
+
+    def open(self):
+        start_us, end_us = self.selection.get("start_us"), self.selection.get("end_us")
+        window = {}
+        if start_us is not None:
+            window["startTime"] = start_us
+        if end_us is not None:
+            window["endTime"] = end_us
+        doc = open_ide(self.file_path, channels=[self.channel_id], **window)
+        return IDEChannelReader(doc.channels[self.channel_id], _us_to_ns_bound(start_us),
+                                _us_to_ns_bound(end_us), self.selection.get("axes"))
+
+    def time_window(self, start_ns, end_ns):
+        """This source restricted to about ``start_ns..end_ns`` (a sample either side may be included)."""
+        selection = dict(self.selection, start_us=(start_ns - 1) / 1e3, end_us=(end_ns + 1) / 1e3)
+        return IDEChannelSource(self.file_path, self.channel_id, selection)
+
+
+def _short_axis_names(vc):
+    # "X (25g)" -> "X"
+    vc.columns = [c.split()[0] for c in vc.columns]
+    return vc
+
+
+def vc_curves_from_psd(psd, params):
+    """Turn a channel PSD into VC curves with the short axis names."""
+    with stage("vc_curves"):
+        return _short_axis_names(vc_curves_frame(psd, params["fstart"], params["octave_bins"]))
 
-        # Get the channels
-        print("Getting acceleration channels...")
-        channels = endaq.ide.get_channels(doc, 'acceleration', subchannels=False)
-        print(f"Found {len(channels)} acceleration channels")
 
-        # Get the data for the 25g and 40g channels
-        print("Processing 25g channel...")
-        pd_25g = endaq.ide.to_pandas(channels[0])
-        
-        skip_40g = False
+def vc_curves_from_psds(psds, params):
+    """:func:`vc_curves_from_psd` for several channels, integrated together per frequency grid."""
+    with stage("vc_curves"):
+        frames = vc_curves_frames(psds, params["fstart"], params["octave_bins"])
+        return [_short_axis_names(vc) for vc in frames]
+
+
+def channel_vc_curves(reader, params):
+    """
+    Run the PSD -> VC-curve pipeline for one channel reader.
+
+    With ``params["band_hz"]`` set, the channel is first decimated so that
+    every VC band reaching below ``band_hz`` is preserved up to its upper
+    edge, and the bands above it are dropped.
+
+    With ``params["envelopes"]`` set, percentile envelope columns across
+    time windows (``"X L10"``, ...) follow the axis columns (see
+    ``vc_spectrogram.channel_envelopes``).
+    """
+    band_hz = params.get("band_hz")
+    if not band_hz:
+        vc = vc_curves_from_psd(channel_psd(reader, params["bin_width"]), params)
+    else:
+        half_band = 2 ** (0.5 / params["octave_bins"])
+        decimated = DecimatedReader(reader, band_hz * half_band ** 2, params["bin_width"])
+        vc = vc_curves_from_psd(channel_psd(decimated, params["bin_width"]), params)
+        vc = vc[vc.index < band_hz * half_band]
+    if params.get("envelopes"):
+        from .vc_spectrogram import channel_envelopes
+        with stage("envelopes"):
+            envelopes = channel_envelopes(reader, params, params["envelopes"]["window_seconds"])
+        if envelopes is not None:
+            # Same band centres; the window grid reaches the native Nyquist frequency
+            envelopes = envelopes.iloc[:len(vc)].set_axis(vc.index)
+            vc = pd.concat([vc, envelopes], axis=1)
+    return vc
+
+
+def _analyze_source(source, params):
+    """Process-pool entry point: open one channel source and analyse it."""
+    # Metrics are returned with the result: a worker process's registry is its own
+    with capture() as metrics:
+        with stage("ide_parse"):
+            reader = source.open()
+        logger.debug("Calculating PSD and VC curves for channel %s", reader.name)
+        frame = channel_vc_curves(reader, params)
+    return frame, metrics
+
+
+def analyze_sources(sources, params, workers=NUM_WORKERS, status_callback=None):
+    """
+    Analyse independent channel sources, in parallel when there are several.
+
+    Args:
+        sources (list): Objects with an ``open()`` method returning a channel reader
+        params (dict): Analysis parameters, see :func:`analysis_params`
+        workers (int): Maximum number of worker processes
+        status_callback (callable): Optional progress callback, called as each
+            channel finishes (see ``vc_utils._default_status_callback``)
+
+    Returns:
+        list[pandas.DataFrame]: VC curves per source, in input order
+    """
+    def report(done):
+        if status_callback:
+            status_callback("progress", f"Analyzed channel {done} of {len(sources)}",
+                            progress=done / len(sources))
+
+    workers = min(workers or 1, len(sources), os.cpu_count() or 1)
+    if workers <= 1:
+        frames = []
+        for source in sources:
+            frame, metrics = _analyze_source(source, params)
+            record(metrics)
+            frames.append(frame)
+            report(len(frames))
+        return frames
+    pool = ProcessPoolExecutor(max_workers=workers)
+    try:
+        futures = [pool.submit(_analyze_source, source, params) for source in sources]
+        for done, future in enumerate(as_completed(futures), start=1):
+            record(future.result()[1])
+            report(done)
+    except BaseException:
+        # A failure or a cancelled job (status_callback raising) returns at once:
+        # pending channels are dropped and running ones are not waited for
+        pool.shutdown(wait=False, cancel_futures=True)
+        raise
+    pool.shutdown()
+    return [future.result()[0] for future in futures]
+
+
+def channel_sources(file_path, columnar=COLUMNAR_ENABLED, selection=None):
+    """
+    One channel source per acceleration channel of an IDE file.
+
+    With ``columnar=True`` (and a path rather than in-memory contents) the
+    channels are read from the file's columnar sidecar, which is created on
+    first use (see ``vc_columnar``); if the sidecar cannot be written or
+    read, the IDE file is parsed directly.
+
+    With a ``selection`` (see :func:`analysis_selection`) the sources read
+    only the selected time window and axes, and channels that are not
+    selected are None, so that the others keep their position. A selection
+    does not create a missing sidecar, which would decode the whole file:
+    the IDE file is then read with the selection pushed down instead.
+    """
+    selection = selection or {}
+    selectors = selection.get("channels")
+
+    def selected(channel_id, name):
+        return selectors is None or _match_channel(channel_id, name, selectors)
+
+    if columnar and not is_in_memory(file_path):
+        from .vc_columnar import get_columnar_store
         try:
-            print("Processing 40g channel...")
-            pd_40g = endaq.ide.to_pandas(channels[1])
-        except IndexError:
-            print("No 40g channel found, skipping...")
-            skip_40g = True
-
-        # Calculate the PSD for the 25g and 40g channels
-        print("Calculating PSD for 25g channel...")
-        psd_25g = endaq.calc.psd.welch(pd_25g, bin_width=0.25)
-        
-        if not skip_40g:
-            print("Calculating PSD for 40g channel...")
-            psd_40g = endaq.calc.psd.welch(pd_40g, bin_width=0.25)
-        else:
-            psd_40g = None
-
-        # Calculate the VC curves for the 25g and 40g channels
-        print("Calculating VC curves for 25g channel...")
-        vc_25g = endaq.calc.psd.vc_curves(psd_25g, fstart=1.0, octave_bins=3)
-        vc_25g.rename(columns=lambda c: c.split()[0], inplace=True)
-
-        if not skip_40g:
-            print("Calculating VC curves for 40g channel...")
-            vc_40g = endaq.calc.psd.vc_curves(psd_40g, fstart=1.0, octave_bins=3)
-            vc_40g.rename(columns=lambda c: c.split()[0], inplace=True)
-        else:
-            vc_40g = None
-
-        print("Analysis complete")
-        # Return the data for the 25g and 40g channels
-        if skip_40g:
-            return vc_25g
-        else:
-            return vc_25g, vc_40g
-            
+            with stage("columnar_open"):
+                sources = get_columnar_store().sources(
+                    file_path, selection.get("axes"), _us_to_ns_bound(selection.get("start_us")),
+                    _us_to_ns_bound(selection.get("end_us")), ingest=not selection)
+            if sources is not None:
+                return [source if selected(source.channel_id, source.channel["name"]) else None
+                        for source in sources]
+        except OSError as e:
+            logger.warning("Columnar sidecar unavailable for %s, parsing the IDE file: %s",
+                           describe_source(file_path), e)
+
+    logger.debug("Opening IDE file: %s", describe_source(file_path))
+    # Only the metadata is needed here; each worker parses its own channel
+    with stage("ide_open"):
+        doc = open_ide(file_path, parsed=False)
+    try:
+        channels = endaq.ide.get_channels(doc, 'acceleration', subchannels=False)
+        return [IDEChannelSource(file_path, ch.id, selection) if selected(ch.id, ch.name) else None
+                for ch in channels]
+    finally:
+        doc.close()
+
+
+def analyze_endaq(file_path, use_cache=True, cache=None, workers=NUM_WORKERS, status_callback=None,
+                  incremental=False, decimate=ANALYSIS_DECIMATE, columnar=COLUMNAR_ENABLED,
+                  start=None, end=None, axes=None, channels=None, envelopes=False, remember=True):
+    """
+    Compute the VC curves of every acceleration channel of an IDE file.
+
+    ``file_path`` is a path, or the file's contents as bytes (e.g. an upload
+    held in memory). In-memory files are analysed in-process, since handing
+    the bytes to worker processes would copy them once per channel.
+
+    With ``incremental=True`` the file is treated as a recording that is
+    still being appended to: only samples added since the previous
+    incremental run are processed (see ``vc_incremental``). Its saved
+    accumulator state takes the place of the analysis cache, which is
+    neither read nor written, and channels are analysed at the native rate:
+    ``decimate`` is ignored, with a warning (the decimation filter state is
+    not carried between runs). In-memory files have no previous run to
+    continue from; for them ``incremental`` is ignored, with a warning, and
+    the whole file is analysed.
+
+    With ``decimate=True`` each channel is downsampled to the band of
+    interest before the PSD (see :func:`channel_vc_curves`).
+
+    With ``columnar=True`` a file on disk is read from its columnar sidecar
+    (see :func:`channel_sources`), so it is parsed only once.
+
+    ``start``/``end``, ``axes`` and ``channels`` restrict the analysis to a
+    time window, some axes and some channels (see :func:`analysis_selection`).
+    The selection is applied by the readers, so data outside it is never
+    decoded. Channels that are not selected are None in the result.
+
+    With ``envelopes=True`` each frame also holds the ``ENVELOPE_LEVELS``
+    percentile envelopes across ``SPECTROGRAM_WINDOW_SECONDS`` windows, as
+    columns ``"<axis> L<level>"`` after the axes (see :func:`channel_vc_curves`).
+
+    Pass ``remember=False`` for temporary copies (uploads): their content
+    hash is then not kept in the cache's path index (see
+    ``AnalysisCache.content_hash``).
+    """
+    selection = analysis_selection(start, end, axes, channels)
+    if incremental and is_in_memory(file_path):
+        logger.warning("Incremental analysis needs a file on disk; analysing all of %s",
+                       describe_source(file_path))
+    elif incremental:
+        if selection or envelopes:
+            raise ValueError("Selections and envelopes cannot be combined with incremental analysis")
+        if decimate:
+            logger.warning("Incremental analysis does not decimate; analysing %s at the native rate",
+                           describe_source(file_path))
+        from .vc_incremental import analyze_incremental
+        return analyze_incremental(file_path, status_callback=status_callback)
+    try:
+        params = analysis_params(decimate, envelopes)
+        if selection:
+            params["selection"] = selection
+        cache_key = None
+        if use_cache:
+            cache = cache or get_analysis_cache()
+            cache_key = cache.key_for(file_path, params, remember)
+            with stage("cache_lookup"):
+                cached = cache.get(cache_key)
+            inc("vibecheck_analysis_cache_total", result="miss" if cached is None else "hit")
+            if cached is not None:
+                logger.debug("Using cached analysis for: %s", describe_source(file_path))
+                return _pack_results(cached)
+
+        all_sources = channel_sources(file_path, columnar, selection)
+        logger.debug("Found %d acceleration channels", len(all_sources))
+        if not all_sources:
+            raise ValueError(f"No acceleration channels found in {describe_source(file_path)}")
+        sources = [source for source in all_sources if source is not None]
+        if not sources:
+            raise ValueError(f"No acceleration channel of {describe_source(file_path)} "
+                             f"matches {selection['channels']}")
+
+        if is_in_memory(file_path):
+            workers = 1
+        if status_callback:
+            status_callback("info", f"Analyzing {len(sources)} acceleration channels", progress=0.0)
+        analysed = iter(analyze_sources(sources, params, workers=workers, status_callback=status_callback))
+        frames = [None if source is None else next(analysed) for source in all_sources]
+        if cache_key is not None:
+            try:
+                cache.put(cache_key, frames)
+            except OSError as e:
+                logger.warning("Failed to cache analysis: %s", e)
+
+        logger.debug("Analysis of %s complete", describe_source(file_path))
+        # One DataFrame per channel: (25g, 40g) on the dual-sensor recorders
+        return _pack_results(frames)
+
     except Exception as e:
-        print(f"Error in analyze_endaq: {str(e)}")
-        print("Traceback:")
-        traceback.print_exc()
-        raise
\ No newline at end of file
+        logger.error("Error in analyze_endaq: %s", e, exc_info=True)
+        raise
@@ -0,0 +1,276 @@
+# vc_batch.py
+# Description: Batch analysis of many IDE files for survey campaigns.
+
+"""
+Batch analysis for VibeCheck Pro.
+
+Analyses a directory or list of ``.IDE`` files in parallel across all cores.
+Each finished file gets a ``<name>_summary.json`` with per-axis peak velocity
+and VC class; files of the same name from different directories are told
+apart by their relative path. The whole run is consolidated into ``batch_summary.json`` and
+``batch_report.html``. Progress is reported as each file completes, through
+the usual ``status_callback(message_type, message, detail, progress)``
+interface, or consumed event by event from :func:`iter_batch`.
+"""
+
+import argparse
+import datetime as dt
+import html
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from .vc_config import COLUMNAR_ENABLED, MAX_FILES, PLOT_FREQ_RANGE, VC_THRESHOLDS
+from .vc_utils import _default_status_callback, validate_files_size
+
+IDE_EXTENSIONS = {'.ide'}
+
+
+def collect_ide_files(inputs):
+    """
+    Expand directories and validate a list of IDE inputs.
+
+    Args:
+        inputs (list[str]): Files and/or directories
+
+    Returns:
+        list[str]: Sorted, de-duplicated IDE file paths
+
+    Raises:
+        ValueError: If nothing is found, ``MAX_FILES`` is exceeded or the
+            files are over the size limits
+    """
+    if isinstance(inputs, (str, os.PathLike)):
+        inputs = [inputs]
+    files = set()
+    for item in inputs:
+        item = os.fspath(item)
+        if os.path.isdir(item):
+            for name in os.listdir(item):
+                path = os.path.join(item, name)
+                if os.path.isfile(path) and os.path.splitext(name)[1].lower() in IDE_EXTENSIONS:
+                    files.add(os.path.abspath(path))
+        elif os.path.isfile(item):
+            files.add(os.path.abspath(item))
+        else:
+            raise ValueError(f"Input not found: {item}")
+    files = sorted(files)
+    if not files:
+        raise ValueError("No IDE files found")
+    if len(files) > MAX_FILES:
+        raise ValueError(f"Too many files: {len(files)} (maximum is {MAX_FILES})")
+    is_valid, result = validate_files_size(files)
+    if not is_valid:
+        raise ValueError(result)
+    return files
+
+
+def summarize_frames(frames, freq_range=PLOT_FREQ_RANGE, thresholds=VC_THRESHOLDS):
+    """
+    Reduce per-channel VC curves to per-axis peak levels and VC classes.
+
+    Args:
+        frames (list[pandas.DataFrame]): VC curves, one per channel
+        freq_range (tuple[float, float]): Band considered for peak and class
+
+    Returns:
+        list[dict]: One entry per sensor with an ``axes`` mapping
+    """
+    from .vc_generate_pdf import classify_vc
+    from .vc_plot_sensor_data import sensor_name
+
+    fmin, fmax = freq_range
+    sensors, peaks = [], []
+    for i, df in enumerate(frames):
+        band = df[(df.index >= fmin) & (df.index <= fmax)]
+        axes = {}
+        if len(band):
+            values = band.to_numpy(dtype=float)
+            idx_peak = np.argmax(values, axis=0)
+            for j, col in enumerate(band.columns):
+                axes[col] = {
+                    "max_velocity_mm_s": float(values[idx_peak[j], j]),
+                    "peak_frequency_hz": float(band.index[idx_peak[j]]),
+                }
+                peaks.append(axes[col])
+        sensors.append({"name": sensor_name(i), "axes": axes})
+    # Classify every axis of every sensor in one pass
+    for info, vc_class in zip(peaks, classify_vc([p["max_velocity_mm_s"] for p in peaks], thresholds)):
+        info["vc_class"] = vc_class
+    return sensors
+
+
+def _analyze_file(file_path, output_dir, columnar=COLUMNAR_ENABLED, name=None, remember=True):
+    """
+    Process-pool entry point: analyse one file and write its summary JSON.
+
+    ``name`` labels the file in the report and names its summary; it
+    defaults to the file name.
+    """
+    from .vc_analyzer_endaq import analyze_endaq
+
+    start = time.perf_counter()
+    name = name or os.path.basename(file_path)
+    summary = {"file": file_path, "name": name}
+    try:
+        # Files are already spread over the cores; keep each analysis in-process
+        raw = analyze_endaq(file_path, workers=1, columnar=columnar, remember=remember)
+        frames = raw if isinstance(raw, tuple) else (raw,)
+        summary["sensors"] = summarize_frames(frames)
+        summary["status"] = "ok"
+    except Exception as e:
+        summary["status"] = "error"
+        summary["error"] = str(e)
+    summary["seconds"] = round(time.perf_counter() - start, 3)
+
+    stem = os.path.splitext(name)[0].replace(os.sep, "_").replace("/", "_")
+    summary["summary_path"] = os.path.join(output_dir, f"{stem}_summary.json")
+    with open(summary["summary_path"], "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2)
+    return summary
+
+
+def iter_batch(files, output_dir, workers=None, columnar=COLUMNAR_ENABLED, remember=True):
+    """
+    Analyse ``files`` in parallel, yielding an event as each one finishes.
+
+    Pass ``columnar=False`` and ``remember=False`` for temporary copies
+    (uploads), whose columnar sidecars and cached path hashes would never be
+    used again. Files are named as in
+    ``vc_compare.comparison_labels``, so same-named recordings from
+    different directories get summaries of their own.
+
+    Yields:
+        dict: ``{"done", "total", "files_per_sec", "summary"}`` per file
+    """
+    from .vc_compare import comparison_labels
+
+    os.makedirs(output_dir, exist_ok=True)
+    workers = min(workers or os.cpu_count() or 1, len(files))
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_analyze_file, path, output_dir, columnar, name, remember)
+                   for path, name in zip(files, comparison_labels(files))]
+        for done, future in enumerate(as_completed(futures), start=1):
+            elapsed = time.perf_counter() - start
+            yield {
+                "done": done,
+                "total": len(files),
+                "files_per_sec": done / elapsed if elapsed > 0 else None,
+                "summary": future.result(),
+            }
+
+
+def write_batch_report(summaries, output_dir, elapsed):
+    """Write ``batch_summary.json`` and ``batch_report.html``; return their paths."""
+    summaries = sorted(summaries, key=lambda s: s["name"])
+    ok = [s for s in summaries if s["status"] == "ok"]
+    report = {
+        "generated": dt.datetime.now().isoformat(timespec="seconds"),
+        "files": len(summaries),
+        "succeeded": len(ok),
+        "failed": len(summaries) - len(ok),
+        "seconds": round(elapsed, 3),
+        "files_per_sec": len(summaries) / elapsed if elapsed > 0 else None,
+        "results": summaries,
+    }
+    json_path = os.path.join(output_dir, "batch_summary.json")
+    with open(json_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    rows = []
+    for s in summaries:
+        if s["status"] != "ok":
+            rows.append(f"<tr class=\"error\"><td>{html.escape(s['name'])}</td>"
+                        f"<td colspan=\"5\">{html.escape(s.get('error', ''))}</td></tr>")
+            continue
+        for sensor in s["sensors"]:
+            for axis, info in sensor["axes"].items():
+                rows.append(
+                    f"<tr><td>{html.escape(s['name'])}</td><td>{html.escape(sensor['name'])}</td>"
+                    f"<td>{axis}</td><td>{info['max_velocity_mm_s']:.4f}</td>"
+                    f"<td>{info['peak_frequency_hz']:.2f}</td><td>{info['vc_class'] or 'None'}</td></tr>"
+                )
+    rate = f"{report['files_per_sec']:.2f}" if report["files_per_sec"] else "n/a"
+    page = f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="utf-8">
+    <title>VibeCheck Pro Batch Report</title>
+    <style>
+        body {{ font-family: Arial, sans-serif; margin: 1rem; background-color: #f5f5f5; }}
+        table {{ border-collapse: collapse; background-color: white; width: 100%; }}
+        th, td {{ border: 1px solid #ddd; padding: 6px 10px; text-align: left; }}
+        th {{ background-color: #333; color: white; }}
+        tr.error td {{ color: #b00020; }}
+    </style>
+</head>
+<body>
+    <h1>Batch Vibration Analysis Report</h1>
+    <p>{report['succeeded']} of {report['files']} files analysed in {elapsed:.1f} s ({rate} files/sec).
+    Peak velocity and VC class over {PLOT_FREQ_RANGE[0]:g}&ndash;{PLOT_FREQ_RANGE[1]:g} Hz.</p>
+    <table>
+        <tr><th>File</th><th>Sensor</th><th>Axis</th><th>Peak (mm/s)</th><th>Peak freq (Hz)</th><th>VC class</th></tr>
+        {''.join(rows)}
+    </table>
+</body>
+</html>"""
+    html_path = os.path.join(output_dir, "batch_report.html")
+    with open(html_path, "w", encoding="utf-8") as f:
+        f.write(page)
+    return json_path, html_path
+
+
+def analyze_batch(inputs, output_dir, workers=None, status_callback=_default_status_callback):
+    """
+    Analyse a directory or list of IDE files and write the batch reports.
+
+    Args:
+        inputs (list[str]): Files and/or directories
+        output_dir (str): Where summaries and the consolidated report go
+        workers (int): Worker processes (default: all cores)
+        status_callback (callable): Progress callback, see ``vc_utils._default_status_callback``
+
+    Returns:
+        dict: Paths of the consolidated report plus per-file summaries
+    """
+    files = collect_ide_files(inputs)
+    status_callback("info", f"Analyzing {len(files)} files", detail=output_dir, progress=0.0)
+    start = time.perf_counter()
+    summaries = []
+    for event in iter_batch(files, output_dir, workers=workers):
+        summary = event["summary"]
+        summaries.append(summary)
+        status_callback(
+            "progress" if summary["status"] == "ok" else "error",
+            f"{summary['name']}: {summary['status']}",
+            detail=f"{event['files_per_sec']:.2f} files/sec",
+            progress=event["done"] / event["total"],
+        )
+    elapsed = time.perf_counter() - start
+    json_path, html_path = write_batch_report(summaries, output_dir, elapsed)
+    status_callback("info", "Batch complete", detail=f"{len(files) / elapsed:.2f} files/sec", progress=1.0)
+    return {"summary": json_path, "report": html_path, "results": summaries}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Analyse many enDAQ .IDE files at once.")
+    parser.add_argument("inputs", nargs="+", help="IDE files and/or directories containing them")
+    parser.add_argument("-o", "--output", default="vibecheck_batch", help="Output directory")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    args = parser.parse_args(argv)
+    try:
+        result = analyze_batch(args.inputs, args.output, workers=args.workers)
+    except ValueError as e:
+        print(str(e), file=sys.stderr)
+        return 1
+    print(f"Batch report generated: {result['report']}")
+    return 0 if all(s["status"] == "ok" for s in result["results"]) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,271 @@
+# vc_cache.py
+# Description: Persistent on-disk cache for VC analysis results.
+
+"""
+Content-addressed cache for the output of ``analyze_endaq``.
+
+Entries are keyed by a SHA-256 of the IDE file contents plus the analysis
+parameters, so re-uploading the same recording (under any name) is a hit.
+Each entry is a single ``.npz`` file holding the VC-curve DataFrames. The
+file modification time doubles as the last-access time, which keeps the LRU
+order persistent across restarts without a separate index file. The content
+hash of a file on disk is remembered by path, size and modification time,
+so looking up an unchanged file does not read it again.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+import numpy as np
+import pandas as pd
+
+from .vc_config import (
+    ANALYSIS_CACHE_DIR,
+    ANALYSIS_CACHE_MAX_BYTES,
+    CHUNK_SIZE,
+)
+
+# Bump when the stored layout or the analysis itself changes meaning
+# 2: PSD and VC curves from the native block-wise Welch engine instead of endaq.calc
+CACHE_FORMAT_VERSION = 2
+
+_ENTRY_SUFFIX = ".npz"
+# Content hashes of files on disk by path, size and modification time
+_HASH_INDEX = "content_hashes.json"
+_HASH_INDEX_MAX_ENTRIES = 4096
+
+
+def default_cache_dir():
+    """Return the configured cache directory, falling back to the user's home."""
+    if ANALYSIS_CACHE_DIR:
+        return ANALYSIS_CACHE_DIR
+    return os.path.join(os.path.expanduser("~"), ".vibecheckpro", "cache")
+
+
+def hash_file(file_path, chunk_size=CHUNK_SIZE):
+    """Return the SHA-256 hex digest of a file's contents (a path or in-memory bytes)."""
+    if isinstance(file_path, (bytes, bytearray, memoryview)):
+        return hashlib.sha256(file_path).hexdigest()
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def make_key(content_hash, params):
+    """Combine a content hash and analysis parameters into a cache key."""
+    payload = json.dumps(
+        {"v": CACHE_FORMAT_VERSION, "content": content_hash, "params": params},
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class AnalysisCache:
+    """
+    Size-bounded LRU cache of VC-curve DataFrames stored on disk.
+
+    Args:
+        cache_dir (str): Directory holding the cache entries
+        max_bytes (int): Total size above which the least recently used
+            entries are evicted
+    """
+
+    def __init__(self, cache_dir=None, max_bytes=ANALYSIS_CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._hashes = None
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def key_for(self, file_path, params, remember=True):
+        """Build the cache key for a file analysed with ``params`` (see :meth:`content_hash`)."""
+        return make_key(self.content_hash(file_path, remember), params)
+
+    def content_hash(self, file_path, remember=True):
+        """
+        :func:`hash_file`, remembered per path, size and modification time.
+
+        A report over many recordings looks all of them up on every run;
+        only files that are new or have changed since are read in full.
+        Temporary copies (upload spool files) pass ``remember=False``: their
+        paths are never seen again, so they are hashed without touching the
+        path index.
+        """
+        if isinstance(file_path, (bytes, bytearray, memoryview)) or not remember:
+            return hash_file(file_path)
+        path = os.path.abspath(file_path)
+        st = os.stat(path)
+        signature = [st.st_size, st.st_mtime_ns]
+        with self._lock:
+            hashes = self._load_hashes()
+            known = hashes.get(path)
+        if known is not None and known[:2] == signature:
+            return known[2]
+        digest = hash_file(path)
+        with self._lock:
+            hashes.pop(path, None)
+            hashes[path] = signature + [digest]
+            # Oldest first: keep the most recently hashed paths
+            for stale in list(hashes)[:max(0, len(hashes) - _HASH_INDEX_MAX_ENTRIES)]:
+                del hashes[stale]
+            self._save_hashes(hashes)
+        return digest
+
+    def _load_hashes(self):
+        if self._hashes is None:
+            try:
+                with open(os.path.join(self.cache_dir, _HASH_INDEX), encoding="utf-8") as f:
+                    self._hashes = dict(json.load(f))
+            except (OSError, ValueError, TypeError):
+                self._hashes = {}
+        return self._hashes
+
+    def _save_hashes(self, hashes):
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(hashes, f)
+            os.replace(tmp_path, os.path.join(self.cache_dir, _HASH_INDEX))
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _entry_path(self, key):
+        return os.path.join(self.cache_dir, key + _ENTRY_SUFFIX)
+
+    def get(self, key):
+        """
+        Look up a cached result.
+
+        Returns:
+            list[pandas.DataFrame] or None: The cached frames, or None on a miss
+        """
+        path = self._entry_path(key)
+        try:
+            frames = _load_frames(path)
+            # Touch the entry so it becomes the most recently used
+            os.utime(path, None)
+        except (OSError, ValueError, KeyError):
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return frames
+
+    def put(self, key, frames):
+        """Store a list of DataFrames under ``key`` and enforce the size bound."""
+        path = self._entry_path(key)
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                _save_frames(f, frames)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self._evict()
+
+    def _entries(self):
+        entries = []
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if entry.name.endswith(_ENTRY_SUFFIX):
+                    try:
+                        st = entry.stat()
+                    except OSError:
+                        continue
+                    entries.append((st.st_mtime, st.st_size, entry.path))
+        return entries
+
+    def _evict(self):
+        """Remove least recently used entries until under ``max_bytes``."""
+        with self._lock:
+            entries = sorted(self._entries())
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                    total -= size
+                except OSError:
+                    pass
+
+    def discard(self, key):
+        """Delete one entry, if present."""
+        try:
+            os.remove(self._entry_path(key))
+        except OSError:
+            pass
+
+    def clear(self):
+        """Delete every cached entry."""
+        with self._lock:
+            for _, _, path in self._entries():
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def stats(self):
+        """Return hit/miss counters and the current on-disk footprint."""
+        entries = self._entries()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(entries),
+            "bytes": sum(size for _, size, _ in entries),
+            "max_bytes": self.max_bytes,
+        }
+
+
+def _save_frames(f, frames):
+    arrays = {"count": np.array(len(frames))}
+    for i, df in enumerate(frames):
+        if df is None:
+            # A channel left out of the analysis (see analyze_endaq's selection)
+            arrays[f"missing_{i}"] = np.array(True)
+            continue
+        arrays[f"index_{i}"] = df.index.to_numpy(dtype=float)
+        arrays[f"values_{i}"] = df.to_numpy(dtype=float)
+        arrays[f"columns_{i}"] = np.array([str(c) for c in df.columns])
+        arrays[f"index_name_{i}"] = np.array(df.index.name or "")
+    np.savez_compressed(f, **arrays)
+
+
+def _load_frames(path):
+    with np.load(path, allow_pickle=False) as data:
+        frames = []
+        for i in range(int(data["count"])):
+            if f"missing_{i}" in data:
+                frames.append(None)
+                continue
+            index_name = str(data[f"index_name_{i}"]) or None
+            frames.append(pd.DataFrame(
+                data[f"values_{i}"],
+                index=pd.Index(data[f"index_{i}"], name=index_name),
+                columns=[str(c) for c in data[f"columns_{i}"]],
+            ))
+    return frames
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_analysis_cache():
+    """Return the process-wide cache, creating it on first use."""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = AnalysisCache()
+        return _default_cache
@@ -0,0 +1,355 @@
+# vc_columnar.py
+# Description: Memory-mapped columnar copies of IDE channel data.
+
+"""
+Columnar sidecars for IDE recordings.
+
+Parsing the EBML container with ``idelib`` and decoding its data blocks
+dominates the analysis of a file that has been analysed before with other
+parameters, re-plotted, or picked up again by a batch job. The first time
+a file is analysed, :meth:`ColumnarStore.ensure` parses it once and
+writes every acceleration channel as plain columns:
+
+* ``ch<id>_t.npy``: sample times in integer nanoseconds (as ``to_pandas``)
+* ``ch<id>_<n>.npy``: one float64 file per axis, the calibrated values
+* ``manifest.json``: channels, columns, sample counts, and the size and
+  modification time of the source file
+
+Later analyses open the columns with ``numpy.load(mmap_mode="r")``: nothing
+is decoded, only the pages actually read are loaded, and a reader may be
+restricted to some axes (the other columns are never opened) and to a time
+range (found by binary search on the time column). The values are the
+ones ``idelib`` decodes, so the results do not change.
+
+Sidecars live in a store directory keyed by the source's absolute path. A
+sidecar is rebuilt when the source's size or modification time differs
+from the manifest, and the least recently used sidecars are deleted once
+the store exceeds ``COLUMNAR_MAX_BYTES``.
+
+(Arrow IPC or Parquet would serve the same purpose but add a dependency;
+``.npy`` files give the same zero-copy memory mapping with numpy alone.)
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+
+import numpy as np
+import pandas as pd
+
+from .vc_config import COLUMNAR_DIR, COLUMNAR_MAX_BYTES
+from .vc_metrics import stage
+from .vc_psd import _sample_rate_from_ns, block_rows_for, select_columns
+
+# Bump when the layout or the meaning of the stored columns changes
+COLUMNAR_FORMAT_VERSION = 1
+
+_MANIFEST = "manifest.json"
+
+
+def default_columnar_dir():
+    """Return the configured sidecar directory, defaulting to next to the analysis cache."""
+    if COLUMNAR_DIR:
+        return COLUMNAR_DIR
+    from .vc_cache import default_cache_dir
+    return os.path.join(default_cache_dir(), "columnar")
+
+
+def source_signature(file_path):
+    """Size and modification time identifying the current contents of a file."""
+    st = os.stat(file_path)
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+class ColumnarChannelReader:
+    """
+    Reader over one channel of a columnar sidecar (see ``vc_psd`` for the interface).
+
+    Args:
+        sidecar_dir (str): Directory of the sidecar
+        channel (dict): The channel's manifest entry
+        columns (list[str]): Axes to read (see ``vc_psd.select_columns``); None for all
+        start_ns (int): Skip samples before this time (nanoseconds); None for the start
+        end_ns (int): Skip samples after this time (nanoseconds); None for the end
+    """
+
+    def __init__(self, sidecar_dir, channel, columns=None, start_ns=None, end_ns=None):
+        self.channel_id = channel["id"]
+        self.name = channel["name"]
+        selected = select_columns(channel["columns"], columns)
+        if not selected:
+            raise ValueError(f"No column of {self.name} matches {columns}")
+        self.columns = [channel["columns"][i] for i in selected]
+
+        def column(suffix):
+            return np.load(os.path.join(sidecar_dir, f"ch{self.channel_id}_{suffix}.npy"), mmap_mode="r")
+        self._t = column("t")
+        self._data = [column(i) for i in selected]
+        # Time-range projection: a view on the selected rows of every column
+        first = 0 if start_ns is None else int(np.searchsorted(self._t, start_ns, side="left"))
+        last = len(self._t) if end_ns is None else int(np.searchsorted(self._t, end_ns, side="right"))
+        last = max(first, last)
+        self._t = self._t[first:last]
+        self._data = [data[first:last] for data in self._data]
+        self.n_samples = last - first
+        self._sample_rate = None
+
+    @property
+    def sample_rate(self):
+        if self._sample_rate is None:
+            self._sample_rate = _sample_rate_from_ns(
+                self.timestamp_ns(0), self.timestamp_ns(self.n_samples - 1), self.n_samples)
+        return self._sample_rate
+
+    def open(self):
+        return self
+
+    def timestamp_ns(self, index):
+        return int(self._t[index])
+
+    def index_after(self, t_ns):
+        """Index of the first sample later than ``t_ns``."""
+        return int(np.searchsorted(self._t, t_ns, side="right"))
+
+    def iter_blocks(self, block_rows=None, start=0, stop=None):
+        """Yield ``(rows, axes)`` float64 arrays covering samples ``start:stop``."""
+        block_rows = block_rows or block_rows_for(len(self.columns))
+        stop = self.n_samples if stop is None else min(stop, self.n_samples)
+        for i in range(start, stop, block_rows):
+            j = min(i + block_rows, stop)
+            if len(self._data) == 1:
+                yield self._data[0][i:j, np.newaxis]
+            else:
+                yield np.stack([data[i:j] for data in self._data], axis=1)
+
+    def to_dataframe(self):
+        index = pd.Index(pd.to_timedelta(np.asarray(self._t), unit="ns"), name="timestamp")
+        return pd.DataFrame(np.stack(self._data, axis=1), index=index, columns=self.columns)
+
+
+class ColumnarChannelSource:
+    """Picklable handle on one channel of a sidecar, for worker processes."""
+
+    def __init__(self, sidecar_dir, channel, columns=None, start_ns=None, end_ns=None):
+        self.sidecar_dir = sidecar_dir
+        self.channel = channel
+        self.columns = columns
+        self.start_ns = start_ns
+        self.end_ns = end_ns
+
+    @property
+    def channel_id(self):
+        return self.channel["id"]
+
+    def open(self):
+        return ColumnarChannelReader(self.sidecar_dir, self.channel, self.columns, self.start_ns, self.end_ns)
+
+    def time_window(self, start_ns, end_ns):
+        """This source restricted to samples between ``start_ns`` and ``end_ns``."""
+        return ColumnarChannelSource(self.sidecar_dir, self.channel, self.columns, start_ns, end_ns)
+
+
+def _write_channel(sidecar_dir, channel, block_rows):
+    """Decode one ``idelib`` channel into column files; return its manifest entry."""
+    session = channel.getSession()
+    n_samples = len(session)
+    columns = [sch.name for sch in channel.subchannels]
+    prefix = os.path.join(sidecar_dir, f"ch{channel.id}_")
+    t_out = np.lib.format.open_memmap(prefix + "t.npy", mode="w+", dtype=np.int64, shape=(n_samples,))
+    outputs = [np.lib.format.open_memmap(f"{prefix}{i}.npy", mode="w+", dtype=np.float64, shape=(n_samples,))
+               for i in range(len(columns))]
+    for i in range(0, n_samples, block_rows):
+        j = min(i + block_rows, n_samples)
+        data = session.arraySlice(i, j)
+        # Microseconds truncated to integer nanoseconds, as to_pandas does
+        t_out[i:j] = (1e3 * data[0]).astype(np.int64)
+        for k, out in enumerate(outputs):
+            out[i:j] = data[k + 1]
+    for out in [t_out] + outputs:
+        out.flush()
+    del t_out, outputs
+    return {"id": channel.id, "name": channel.name, "columns": columns, "n_samples": n_samples}
+
+
+class ColumnarStore:
+    """
+    Directory of columnar sidecars, one per source recording.
+
+    Args:
+        store_dir (str): Directory holding the sidecars
+        max_bytes (int): Total size above which the least recently used
+            sidecars are deleted
+    """
+
+    def __init__(self, store_dir=None, max_bytes=COLUMNAR_MAX_BYTES):
+        self.store_dir = store_dir or default_columnar_dir()
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._ingest_locks = {}
+        os.makedirs(self.store_dir, exist_ok=True)
+
+    def sidecar_dir(self, file_path):
+        key = hashlib.sha256(os.path.abspath(file_path).encode("utf-8")).hexdigest()
+        return os.path.join(self.store_dir, key)
+
+    def load(self, file_path):
+        """
+        Return the manifest of an up-to-date sidecar for ``file_path``.
+
+        Returns:
+            dict or None: The manifest, or None if missing or stale
+        """
+        path = os.path.join(self.sidecar_dir(file_path), _MANIFEST)
+        try:
+            with open(path, encoding="utf-8") as f:
+                manifest = json.load(f)
+            signature = source_signature(file_path)
+        except (OSError, ValueError):
+            return None
+        if manifest.get("version") != COLUMNAR_FORMAT_VERSION or manifest.get("source") != signature:
+            return None
+        # Touch the manifest so the sidecar becomes the most recently used
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+        return manifest
+
+    def ingest(self, file_path, block_rows=None):
+        """
+        Parse ``file_path`` once and write its acceleration channels as a sidecar.
+
+        Returns:
+            dict: The new manifest
+        """
+        import endaq
+        from .vc_analyzer_endaq import open_ide
+
+        signature = source_signature(file_path)
+        final_dir = self.sidecar_dir(file_path)
+        tmp_dir = tempfile.mkdtemp(dir=self.store_dir, prefix=".ingest_")
+        try:
+            with stage("columnar_ingest"):
+                doc = open_ide(file_path)
+                try:
+                    channels = endaq.ide.get_channels(doc, 'acceleration', subchannels=False)
+                    entries = [_write_channel(tmp_dir, ch, block_rows or block_rows_for(len(ch.subchannels)))
+                               for ch in channels]
+                finally:
+                    doc.close()
+            manifest = {
+                "version": COLUMNAR_FORMAT_VERSION,
+                "source": signature,
+                "path": os.path.abspath(file_path),
+                "channels": entries,
+            }
+            with open(os.path.join(tmp_dir, _MANIFEST), "w", encoding="utf-8") as f:
+                json.dump(manifest, f, indent=1)
+            with self._lock:
+                shutil.rmtree(final_dir, ignore_errors=True)
+                os.replace(tmp_dir, final_dir)
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+        self._evict(keep=final_dir)
+        return manifest
+
+    def ensure(self, file_path):
+        """Return the manifest for ``file_path``, ingesting the file if needed."""
+        manifest = self.load(file_path)
+        if manifest is not None:
+            with self._lock:
+                self.hits += 1
+            return manifest
+        # One ingest per file at a time; concurrent callers wait and reuse it
+        with self._lock:
+            lock = self._ingest_locks.setdefault(os.path.abspath(file_path), threading.Lock())
+        with lock:
+            manifest = self.load(file_path)
+            if manifest is None:
+                with self._lock:
+                    self.misses += 1
+                manifest = self.ingest(file_path)
+            return manifest
+
+    def sources(self, file_path, columns=None, start_ns=None, end_ns=None, ingest=True):
+        """
+        Channel sources reading ``file_path`` from its sidecar.
+
+        Args:
+            ingest (bool): Create the sidecar if it is missing or stale;
+                otherwise return None in that case
+
+        Returns:
+            list[ColumnarChannelSource]: One per acceleration channel
+        """
+        if ingest:
+            manifest = self.ensure(file_path)
+        else:
+            manifest = self.load(file_path)
+            if manifest is None:
+                return None
+            with self._lock:
+                self.hits += 1
+        sidecar_dir = self.sidecar_dir(file_path)
+        return [ColumnarChannelSource(sidecar_dir, channel, columns, start_ns, end_ns)
+                for channel in manifest["channels"]]
+
+    def discard(self, file_path):
+        with self._lock:
+            shutil.rmtree(self.sidecar_dir(file_path), ignore_errors=True)
+
+    def _entries(self):
+        entries = []
+        with os.scandir(self.store_dir) as it:
+            for entry in it:
+                if not entry.is_dir() or entry.name.startswith("."):
+                    continue
+                try:
+                    used = os.stat(os.path.join(entry.path, _MANIFEST)).st_mtime
+                    size = sum(f.stat().st_size for f in os.scandir(entry.path))
+                except OSError:
+                    continue
+                entries.append((used, size, entry.path))
+        return entries
+
+    def _evict(self, keep=None):
+        """Delete least recently used sidecars until under ``max_bytes``."""
+        with self._lock:
+            entries = sorted(self._entries())
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                if path == keep:
+                    continue
+                shutil.rmtree(path, ignore_errors=True)
+                total -= size
+
+    def stats(self):
+        entries = self._entries()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(entries),
+            "bytes": sum(size for _, size, _ in entries),
+            "max_bytes": self.max_bytes,
+        }
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def get_columnar_store():
+    """Return the process-wide sidecar store, creating it on first use."""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = ColumnarStore()
+        return _default_store
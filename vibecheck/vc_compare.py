@@ -0,0 +1,219 @@
+# vc_compare.py
+# Description: Comparison report overlaying the VC curves of several recordings.
+
+"""
+Multi-file comparison reports.
+
+``create_vc_plots_plotly`` draws one recording per report. A comparison
+report overlays the VC curves of many recordings (before/after, location A
+vs. B) with one figure per sensor per axis and one trace per file, on a
+y-range shared by all files of a sensor.
+
+Every file goes through ``analyze_endaq`` with the analysis cache, so a
+file that has been analysed before is read back from the cache. The cache
+remembers the content hash of each file by path, size and modification
+time (see ``AnalysisCache.content_hash``), so unchanged files are not even
+read again: adding a file to a comparison costs that file's analysis only.
+
+Traces are drawn as plain lines (no spline smoothing) and without the
+per-figure peak annotations, which keeps many-file figures responsive. A
+VC curve has a few dozen bands, so the traces need no downsampling.
+"""
+
+import argparse
+import logging
+import os
+import sys
+
+import numpy as np
+
+from .vc_config import COLUMNAR_ENABLED, NUM_WORKERS, REPORT_PLOTLYJS_MODE, VC_THRESHOLDS
+from .vc_metrics import stage
+
+logger = logging.getLogger(__name__)
+
+# Line styles cycled once the colours run out
+_DASHES = ("solid", "dash", "dot", "dashdot")
+
+
+def comparison_labels(sources):
+    """
+    Legend labels for files: their names, with enough of the path to tell
+    apart files of the same name.
+    """
+    names = [os.path.basename(p) for p in sources]
+    if len(set(names)) == len(names):
+        return names
+    root = os.path.commonpath([os.path.abspath(p) for p in sources])
+    return [os.path.relpath(os.path.abspath(p), root) for p in sources]
+
+
+def analyze_files(sources, labels, workers=NUM_WORKERS, status_callback=None, selection=None,
+                  columnar=COLUMNAR_ENABLED, remember=True):
+    """
+    VC curves of every file of a comparison, from the analysis cache where possible.
+
+    Args:
+        sources (list): Paths, or file contents as bytes
+        labels (list[str]): Name of each file in the report
+        columnar (bool): Read files through columnar sidecars; off for
+            temporary copies (uploads), whose sidecars would never be reused
+        remember (bool): Keep the files' content hashes in the cache's path
+            index; off for temporary copies too
+
+    Returns:
+        list[dict]: ``{"label": ..., "frames": ...}`` per file analysed;
+        files that fail are logged and left out
+    """
+    from .vc_analyzer_endaq import analyze_endaq
+    from .vc_cache import get_analysis_cache
+
+    cache = get_analysis_cache()
+    hits = cache.hits
+    entries = []
+    for k, (source, label) in enumerate(zip(sources, labels)):
+        try:
+            raw = analyze_endaq(source, workers=workers, columnar=columnar, remember=remember,
+                                **(selection or {}))
+        except Exception as e:
+            logger.error("Failed to analyse %s: %s", label, e)
+        else:
+            entries.append({"label": label, "frames": raw if isinstance(raw, tuple) else (raw,)})
+        if status_callback:
+            status_callback("progress", f"Analyzed {k + 1} of {len(sources)} files",
+                            progress=(k + 1) / len(sources))
+    logger.info("Comparison of %d files: %d from the analysis cache", len(sources), cache.hits - hits)
+    return entries
+
+
+def comparison_figure_specs(entries):
+    """
+    One figure spec per sensor per axis, with one trace per file.
+
+    Args:
+        entries (list[dict]): As returned by :func:`analyze_files`
+
+    Returns:
+        list[dict]: Figure specs for ``render_report_html``
+    """
+    import plotly.colors
+
+    from .vc_plot_sensor_data import sensor_name, vc_figure_spec
+
+    palette = plotly.colors.qualitative.Dark24
+    specs = []
+    n_sensors = max((len(entry["frames"]) for entry in entries), default=0)
+    for i in range(n_sensors):
+        frames = [(k, entry["label"], entry["frames"][i]) for k, entry in enumerate(entries)
+                  if i < len(entry["frames"]) and entry["frames"][i] is not None and not entry["frames"][i].empty]
+        if not frames:
+            continue
+        # One y-range per sensor, shared by all files and axes
+        positives = [v for v in VC_THRESHOLDS.values() if v > 0]
+        for _, _, df in frames:
+            values = df[[ax for ax in ("X", "Y", "Z") if ax in df.columns]].to_numpy(dtype=float)
+            positives.extend(values[values > 0])
+        y_range_log = [np.log10(max(min(positives) * 0.5, 1e-4)), np.log10(max(positives) * 1.1)]
+
+        name = sensor_name(i)
+        for ax in ("X", "Y", "Z"):
+            traces = []
+            for k, label, df in frames:
+                if ax not in df.columns:
+                    continue
+                traces.append(dict(
+                    type="scatter", x=df.index.to_numpy(dtype=float), y=df[ax].to_numpy(dtype=float),
+                    mode="lines", name=label,
+                    line=dict(color=palette[k % len(palette)], width=1.5,
+                              dash=_DASHES[(k // len(palette)) % len(_DASHES)]),
+                    hoverinfo="x+y+name",
+                ))
+            if not traces:
+                continue
+            spec = vc_figure_spec(name, ax, np.array([]), np.array([]), y_range_log)
+            spec["data"] = traces
+            spec["layout"]["title"]["text"] = f"VC Curve Comparison – {name} – {ax}-Axis"
+            # A vertical legend fits many files
+            spec["layout"]["legend"] = dict(font=dict(size=12))
+            specs.append(spec)
+    return specs
+
+
+def build_comparison_report(sources, labels=None, status_callback=None, plotly_js=REPORT_PLOTLYJS_MODE,
+                            plotly_js_url=None, html_out=None, selection=None,
+                            workers=NUM_WORKERS, columnar=COLUMNAR_ENABLED, remember=True):
+    """
+    Analyse several IDE files and return the comparison report as an HTML string.
+
+    ``sources`` are paths or file contents as bytes (then ``labels`` are
+    required); ``plotly_js``, ``plotly_js_url``, ``html_out``, ``selection``
+    ``columnar`` and ``remember`` are as for ``build_vc_report``.
+    Returns None if no figure could be generated.
+    """
+    from .vc_plot_sensor_data import render_report_html
+    from .vc_utils import scaled_status_callback
+
+    if labels is None:
+        labels = comparison_labels(sources)
+    with stage("analyze"):
+        entries = analyze_files(sources, labels, workers, scaled_status_callback(status_callback, 0.0, 0.9),
+                                selection, columnar, remember)
+    with stage("figure_build"):
+        specs = comparison_figure_specs(entries)
+    if not specs:
+        logger.error("No figures were generated for the comparison.")
+        return None
+    if status_callback:
+        status_callback("progress", "Writing HTML report", progress=0.95)
+    with stage("html_render"):
+        return render_report_html(specs, f"Comparison of {len(entries)} files", plotly_js, plotly_js_url,
+                                  html_out)
+
+
+def create_comparison_report(inputs, html_out, status_callback=None, plotly_js=REPORT_PLOTLYJS_MODE,
+                             workers=NUM_WORKERS):
+    """
+    Write a comparison report of IDE files and/or directories of them.
+
+    If ``html_out`` is a directory the report is written inside it.
+
+    Raises:
+        ValueError: If the inputs are invalid (see ``vc_batch.collect_ide_files``)
+
+    Returns:
+        bool: True if the report was written
+    """
+    from .vc_batch import collect_ide_files
+    from .vc_plot_sensor_data import safe_write_file
+
+    files = collect_ide_files(inputs)
+    if os.path.isdir(html_out):
+        html_out = os.path.join(html_out, "vc_comparison.html")
+    html = build_comparison_report(files, status_callback=status_callback, plotly_js=plotly_js,
+                                   html_out=html_out, workers=workers)
+    if html is None:
+        return False
+    with stage("html_write"):
+        if not safe_write_file(html_out, html):
+            logger.error("Failed to write HTML report to %s", html_out)
+            return False
+    logger.info("Comparison report saved to: %s", html_out)
+    return True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Overlay the VC curves of several enDAQ .IDE files.")
+    parser.add_argument("inputs", nargs="+", help="IDE files and/or directories containing them")
+    parser.add_argument("-o", "--output", default="vc_comparison.html", help="Output HTML path or directory")
+    parser.add_argument("-j", "--workers", type=int, default=NUM_WORKERS, help="Worker processes per file")
+    args = parser.parse_args(argv)
+    try:
+        written = create_comparison_report(args.inputs, args.output, workers=args.workers)
+    except ValueError as e:
+        print(str(e), file=sys.stderr)
+        return 1
+    return 0 if written else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
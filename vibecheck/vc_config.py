@@ -30,6 +30,83 @@ DEFAULT_WINDOW_SIZE = 1.0
 # Default overlap between windows (as a percentage)
 DEFAULT_WINDOW_OVERLAP = 0.5
 
+# Parameters passed to endaq when computing the PSD and VC curves
+ANALYSIS_BIN_WIDTH = 0.25  # Welch frequency resolution (Hz)
+ANALYSIS_FSTART = 1.0  # First third-octave band centre (Hz)
+ANALYSIS_OCTAVE_BINS = 3  # Bands per octave for the VC curves
+
+# Optionally low-pass filter and downsample each channel before the PSD so its
+# Nyquist frequency just clears the band of interest; FFT sizes and memory
+# shrink by the decimation factor and VC bands above the band are dropped
+ANALYSIS_DECIMATE = False
+# Highest VC band centre kept when decimating (Hz; None = top of PLOT_FREQ_RANGE)
+ANALYSIS_BAND_HZ = None
+# Stop-band attenuation of the anti-aliasing filter (dB)
+DECIMATION_ATTENUATION_DB = 100.0
+
+# --- Spectrogram Settings ---
+# Length of the windows of the VC spectrogram (seconds); each window gets its
+# own VC curves and class (see vc_spectrogram)
+SPECTROGRAM_WINDOW_SECONDS = 10.0
+
+# --- Envelope Settings ---
+# Percentile envelopes of the VC curves across spectrogram windows: LN is the
+# level exceeded in N % of the windows (L10 near the top, L90 near the bottom)
+ENVELOPE_LEVELS = (10, 50, 90)
+
+# Relative accuracy of the streaming quantile sketches behind the envelopes
+ENVELOPE_SKETCH_ACCURACY = 0.01
+
+# --- Analysis Cache Settings ---
+# Directory for cached analysis results (None = ~/.vibecheckpro/cache)
+ANALYSIS_CACHE_DIR = None
+
+# Upper bound on the total size of the cache; least recently used
+# results are evicted first once this is exceeded
+ANALYSIS_CACHE_MAX_BYTES = 512 * 1024 * 1024  # 512MB
+
+# --- Columnar Sidecar Settings ---
+# Parse each IDE file once into memory-mapped columns that later analyses read
+COLUMNAR_ENABLED = True
+
+# Directory for the sidecars (None = "columnar" inside the analysis cache directory)
+COLUMNAR_DIR = None
+
+# Upper bound on the total size of the sidecars; least recently used
+# sidecars are deleted first once this is exceeded
+COLUMNAR_MAX_BYTES = 8 * 1024 * 1024 * 1024  # 8GB
+
+# --- Incremental Analysis Settings ---
+# Directory for saved Welch accumulator state (None = "incremental" inside
+# the analysis cache directory)
+INCREMENTAL_STATE_DIR = None
+
+# On re-analysis, parsing restarts this many seconds before the last
+# processed sample so the data block holding the next sample is included
+INCREMENTAL_REPARSE_MARGIN_S = 10.0
+
+# --- Live Monitor Settings ---
+# Length of the sliding window behind each live PSD (seconds)
+LIVE_WINDOW_SECONDS = 60.0
+
+# Minimum time between published live updates (seconds)
+LIVE_UPDATE_INTERVAL = 1.0
+
+# How often a recording being written is checked for new data (seconds)
+LIVE_POLL_SECONDS = 2.0
+
+# Duration of the sample blocks fed to the monitor when replaying (seconds)
+LIVE_BLOCK_SECONDS = 0.5
+
+# Keep-alive comment interval on idle event streams (seconds)
+LIVE_HEARTBEAT_SECONDS = 15.0
+
+# Updates buffered per event-stream client; slow clients drop the oldest
+LIVE_SUBSCRIBER_QUEUE = 8
+
+# Maximum number of monitors running at once
+LIVE_MAX_MONITORS = 4
+
 # --- Plot Settings ---
 # Default figure size for plots (width, height in inches)
 DEFAULT_FIGURE_SIZE = (12, 8)
@@ -37,6 +114,30 @@ DEFAULT_FIGURE_SIZE = (12, 8)
 # Default DPI (dots per inch) for plots
 DEFAULT_DPI = 300
 
+# How reports load Plotly.js: "inline" (self-contained), "shared" (served once
+# by the Flask app at PLOTLYJS_ASSET_ROUTE) or "sidecar" (file next to the report)
+REPORT_PLOTLYJS_MODE = "inline"
+PLOTLYJS_ASSET_ROUTE = "/assets/plotly.min.js"
+PLOTLYJS_SIDECAR_NAME = "plotly.min.js"
+
+# PNG snapshots of each figure (used by the PDF report) are rendered in the
+# background into this directory under the system temp dir
+SNAPSHOTS_ENABLED = True
+TEMP_PLOT_DIR_NAME = "VibeCheckPro_snapshots"
+SNAPSHOT_HEIGHT_PX = 600
+# Figures rendered concurrently by the persistent Kaleido server
+SNAPSHOT_RENDER_TABS = 4
+# Reports whose snapshots are kept; older ones are forgotten and their PNGs deleted
+SNAPSHOT_MAX_BATCHES = 32
+
+# PDF reports: page size (inches, landscape letter) and how long to wait for
+# the background PNG snapshots before drawing the figures with matplotlib
+PDF_PAGE_SIZE = (11, 8.5)
+PDF_SNAPSHOT_TIMEOUT = 60.0
+
+# Frequency range shown on the VC-curve plots and used for VC classification (Hz)
+PLOT_FREQ_RANGE = (1.0, 100.0)
+
 # Default color palette for plots
 DEFAULT_COLORS = [
     '#1f77b4',  # Blue
@@ -63,6 +164,9 @@ DEFAULT_LOG_LEVEL = "INFO"
 # Default log format
 DEFAULT_LOG_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
 
+# Server log file, appended to by the background log writer (None: stderr only)
+LOG_FILE = None
+
 # --- Error Handling Settings ---
 # Maximum number of retries for failed operations
 MAX_RETRIES = 3
@@ -74,9 +178,56 @@ RETRY_DELAY = 1.0
 # Number of worker threads for parallel processing
 NUM_WORKERS = 4
 
+# Seconds after server start before the analysis modules are imported in the
+# background (the first /api/health request starts it sooner)
+PREWARM_DELAY_SECONDS = 1.0
+
+# Welch windows/FFT plans and decimation filters kept in the process-wide
+# plan cache (one entry per segment length or filter design)
+FFT_PLAN_CACHE_SIZE = 32
+
+# Per-stage timing and memory instrumentation served at /api/metrics
+METRICS_ENABLED = True
+
+# Upper bounds (seconds) of the latency histogram buckets
+METRICS_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
 # Chunk size for processing large files
 CHUNK_SIZE = 1024 * 1024  # 1MB chunks
 
+# --- Upload Settings ---
+# Uploads up to this size are parsed straight into memory and analysed from
+# there; larger ones are written once to a spool file that the IDE reader
+# opens in place (no second copy to a report directory)
+UPLOAD_MEMORY_MAX_BYTES = 64 * 1024 * 1024  # 64MB
+
+# Directory for spooled uploads (None = system temp dir)
+UPLOAD_SPOOL_DIR = None
+
+# --- Report Store Settings ---
+# Directory for generated reports, one sub-directory per report id
+# (None = VibeCheckPro_reports under the system temp dir)
+REPORT_STORE_DIR = None
+
+# Reports not viewed for this long are removed (in seconds)
+REPORT_RETENTION_SECONDS = 3600
+
+# Least recently viewed reports are removed above this total size
+REPORT_STORE_MAX_BYTES = 1024 * 1024 * 1024  # 1GB
+
+# How often the background eviction runs (in seconds)
+REPORT_EVICTION_INTERVAL = 300
+
+# --- Job Queue Settings ---
+# Worker threads processing asynchronous /api/jobs analyses
+JOB_WORKERS = 2
+
+# Maximum number of jobs waiting to run; further submissions are rejected
+JOB_QUEUE_MAX_DEPTH = 16
+
+# How long finished jobs and their reports are kept (in seconds)
+JOB_RETENTION_SECONDS = 3600
+
 # --- Unit Conversion ---
 UMS_TO_MM_S = 1e-3  # Conversion factor from um/s to mm/s
 Y_UNIT = "Velocity (mm/s RMS)"  # Y-axis unit label for plots
@@ -0,0 +1,149 @@
+# vc_fftplans.py
+# Description: Process-wide cache of Welch windows, FFT plans and filter designs.
+
+"""
+Spectral set-up shared across analyses.
+
+Every channel of every file used to rebuild its Welch window and let the
+FFT library plan the same transform length again, and every decimated
+channel re-designed the same anti-aliasing filter. The recordings in a
+survey come from a handful of logger models, so the same few segment
+lengths recur across requests, batch files and live monitors.
+
+:class:`PlanCache` keeps the most recently used set-ups in an LRU keyed by
+what determines them:
+
+* Welch plans by ``(segment length, window)``: the window, its power sum
+  and a warmed ``scipy.fft`` plan (pocketfft caches plans per length; the
+  warm-up transform is paid once here, not in the first segment batch).
+  The sample rate is deliberately not part of the key: it only scales the
+  frequency axis and PSD, and the mean rate measured from each file's
+  timestamps differs slightly between otherwise identical recordings.
+* Decimation filters by ``(sample rate, pass band, factor, attenuation)``,
+  with the rate rounded to six significant digits.
+
+Hits, misses and the build time saved are reported by :meth:`PlanCache.stats`
+(served at ``/api/stats``). The cache is per process: batch worker
+processes each keep their own while they work through their files.
+"""
+
+import collections
+import threading
+import time
+
+import numpy as np
+import scipy.fft
+import scipy.signal
+
+from .vc_config import FFT_PLAN_CACHE_SIZE
+
+
+class WelchPlan:
+    """Window and FFT set-up for one Welch segment length."""
+
+    __slots__ = ("nperseg", "window_name", "window", "window_power")
+
+    def __init__(self, nperseg, window="hann"):
+        self.nperseg = nperseg
+        self.window_name = window
+        self.window = scipy.signal.get_window(window, nperseg)
+        self.window.flags.writeable = False
+        self.window_power = float((self.window ** 2).sum())
+        # Have pocketfft build (and cache) its plan for this length now
+        scipy.fft.rfft(np.zeros(nperseg))
+
+
+class PlanCache:
+    """
+    Bounded LRU of spectral set-ups with hit/miss accounting.
+
+    Args:
+        max_entries (int): Set-ups kept before the least recently used is dropped
+    """
+
+    def __init__(self, max_entries=FFT_PLAN_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = collections.OrderedDict()
+        self._build_seconds = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.build_seconds = 0.0
+        self.saved_seconds = 0.0
+
+    def get(self, key, build):
+        """Return the entry for ``key``, calling ``build()`` to create it on a miss."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                # A hit saves what building this entry cost
+                self.saved_seconds += self._build_seconds[key]
+                return self._entries[key]
+        start = time.perf_counter()
+        entry = build()
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.misses += 1
+            self.build_seconds += elapsed
+            if key not in self._entries:
+                self._entries[key] = entry
+                self._build_seconds[key] = elapsed
+                while len(self._entries) > self.max_entries:
+                    old, _ = self._entries.popitem(last=False)
+                    del self._build_seconds[old]
+                    self.evictions += 1
+            return self._entries[key]
+
+    def welch_plan(self, nperseg, window="hann"):
+        """Cached :class:`WelchPlan` for a segment length and window."""
+        return self.get(("welch", int(nperseg), window), lambda: WelchPlan(int(nperseg), window))
+
+    def decimation_taps(self, sample_rate, band_hz, q, attenuation_db):
+        """Cached FIR taps (read-only) of the anti-aliasing filter for decimating by ``q``."""
+        # Mean rates measured from timestamps differ in the last digits between
+        # recordings of the same logger; that does not change the design
+        sample_rate = float(f"{sample_rate:.6g}")
+
+        def build():
+            # Pass band up to band_hz; stop band from where aliases reach it
+            width = (sample_rate / q - 2 * band_hz) / (sample_rate / 2)
+            numtaps, beta = scipy.signal.kaiserord(attenuation_db, width)
+            numtaps |= 1  # odd, for an integer delay
+            taps = scipy.signal.firwin(numtaps, sample_rate / q / 2, window=("kaiser", beta), fs=sample_rate)
+            taps.flags.writeable = False
+            return taps
+        return self.get(("decimation", float(sample_rate), float(band_hz), int(q), float(attenuation_db)), build)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._build_seconds.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else None,
+                "build_seconds": self.build_seconds,
+                "saved_seconds": self.saved_seconds,
+            }
+
+
+_plan_cache = None
+_plan_cache_lock = threading.Lock()
+
+
+def get_plan_cache():
+    """Return the process-wide plan cache."""
+    global _plan_cache
+    with _plan_cache_lock:
+        if _plan_cache is None:
+            _plan_cache = PlanCache()
+        return _plan_cache
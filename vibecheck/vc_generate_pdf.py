@@ -1,12 +1,72 @@
 """PDF generation utilities for VibeCheck Pro.
 
-This module exposes helper functions used when building PDF reports.
-Only the pieces required by the test suite are implemented here.
+Builds printable reports from the VC-curve analysis. Every axis of every
+sensor is classified in a single vectorized pass (:func:`classify_vc`), and
+pages are assembled from the PNG snapshots rendered in the background by
+``vc_snapshots``. When a snapshot is missing (e.g. Kaleido is unavailable),
+the figure is drawn with matplotlib instead. Several files are reported in
+parallel by :func:`generate_pdf_reports`.
 """
 
-from typing import Dict, Iterable, Optional
+import argparse
+import datetime as dt
+import functools
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Iterable, List, Optional, Sequence
+
 import numpy as np
 
+from .vc_config import (
+    COLOR_PALETTE,
+    DEFAULT_REPORT_AUTHOR,
+    DEFAULT_REPORT_SUBJECT,
+    DEFAULT_REPORT_TITLE,
+    NUM_WORKERS,
+    PDF_PAGE_SIZE,
+    PDF_SNAPSHOT_TIMEOUT,
+    PLOT_FREQ_RANGE,
+    SNAPSHOTS_ENABLED,
+    VC_THRESHOLDS,
+    Y_UNIT,
+)
+from .vc_utils import _default_status_callback, scaled_status_callback
+
+
+@functools.lru_cache(maxsize=8)
+def _threshold_table(items: tuple) -> tuple:
+    """Level names (plus a trailing ``None``) and limits, sorted by limit."""
+    levels = sorted(items, key=lambda x: x[1])
+    names = np.array([name for name, _ in levels] + [None], dtype=object)
+    limits = np.array([limit for _, limit in levels], dtype=float)
+    return names, limits
+
+
+def classify_vc(peaks: Sequence[float], thresholds: Dict[str, float] = VC_THRESHOLDS) -> np.ndarray:
+    """Return the lowest VC level each peak level satisfies.
+
+    A single ``searchsorted`` against the sorted thresholds classifies all
+    peaks at once: the first limit at or above the peak is the lowest level
+    passed.
+
+    Parameters
+    ----------
+    peaks : Sequence[float]
+        Maximum vibration level of each axis.
+    thresholds : Dict[str, float]
+        Mapping of VC level names to threshold values.
+
+    Returns
+    -------
+    numpy.ndarray
+        Object array of level names, ``None`` where no level is satisfied
+        (including NaN peaks).
+    """
+    names, limits = _threshold_table(tuple(thresholds.items()))
+    return names[np.searchsorted(limits, np.asarray(peaks, dtype=float), side="left")]
+
 
 def _lowest_vc_passed(values: Iterable[float], thresholds: Dict[str, float]) -> Optional[str]:
     """Return the lowest VC key that all values satisfy.
@@ -24,8 +84,287 @@ def _lowest_vc_passed(values: Iterable[float], thresholds: Dict[str, float]) ->
         The name of the lowest VC level that all values are below,
         or ``None`` if none are satisfied.
     """
-    arr = np.asarray(list(values), dtype=float)
-    for level, limit in sorted(thresholds.items(), key=lambda x: x[1]):
-        if np.all(arr <= limit):
-            return level
-    return None
+    if not hasattr(values, "__len__"):
+        values = list(values)
+    arr = np.asarray(values, dtype=float)
+    peak = arr.max() if arr.size else -np.inf
+    return classify_vc([peak], thresholds)[0]
+
+
+def _draw_vc_curve(ax, spec: dict) -> None:
+    """Matplotlib fallback for a figure whose PNG snapshot is unavailable."""
+    trace = spec["data"][0]
+    freqs, vel = np.asarray(trace["x"]), np.asarray(trace["y"])
+    ax.plot(freqs, vel, color=COLOR_PALETTE.get(spec["axis"], "#1f77b4"), linewidth=1.5,
+            label=f"Measured ({spec['axis']})")
+    for name, limit in VC_THRESHOLDS.items():
+        color = COLOR_PALETTE.get(name, "grey")
+        ax.axhline(limit, color=color, linestyle="--", linewidth=1)
+        ax.annotate(f"{name} ({limit:.3f} mm/s)", (PLOT_FREQ_RANGE[1], limit), ha="right", va="top",
+                    fontsize=7, color=color)
+    ax.set_yscale("log")
+    ax.set_xlim(*PLOT_FREQ_RANGE)
+    ax.set_ylim(*(10 ** np.asarray(spec["layout"]["yaxis"]["range"])))
+    ax.set_xlabel("Frequency (Hz)")
+    ax.set_ylabel(Y_UNIT)
+    ax.set_title(f"VC Curve – {spec['name']} – {spec['axis']}-Axis")
+    ax.grid(True, which="both", color="lightgray", linewidth=0.5)
+    ax.legend(loc="upper left", fontsize=8)
+
+
+def _summary_page(title: str, sensors: List[dict]):
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=PDF_PAGE_SIZE)
+    fig.text(0.5, 0.94, f"Vibration Analysis Report – {title}", ha="center", fontsize=18)
+    fig.text(0.5, 0.90, f"Generated {dt.datetime.now():%Y-%m-%d %H:%M}. Peak velocity and VC class over "
+             f"{PLOT_FREQ_RANGE[0]:g}–{PLOT_FREQ_RANGE[1]:g} Hz.", ha="center", fontsize=10)
+    rows = [
+        [sensor["name"], axis, f"{info['max_velocity_mm_s']:.4f}", f"{info['peak_frequency_hz']:.2f}",
+         info["vc_class"] or "None"]
+        for sensor in sensors for axis, info in sensor["axes"].items()
+    ]
+    ax = fig.add_axes([0.1, 0.1, 0.8, 0.75])
+    ax.axis("off")
+    if rows:
+        table = ax.table(cellText=rows, loc="upper center", cellLoc="center",
+                         colLabels=["Sensor", "Axis", "Peak (mm/s)", "Peak freq (Hz)", "VC class"])
+        table.scale(1, 1.5)
+    return fig
+
+
+def _figure_page(spec: dict, png_path: Optional[str] = None):
+    from matplotlib.figure import Figure
+    import matplotlib.image
+
+    fig = Figure(figsize=PDF_PAGE_SIZE)
+    ax = fig.add_axes([0.03, 0.03, 0.94, 0.94] if png_path else [0.1, 0.1, 0.85, 0.8])
+    if png_path:
+        ax.imshow(matplotlib.image.imread(png_path))
+        ax.axis("off")
+    else:
+        _draw_vc_curve(ax, spec)
+    return fig
+
+
+def write_pdf_report(frames: Sequence, pdf_out: str, title: str,
+                     snapshots: Optional[Dict[tuple, str]] = None) -> str:
+    """Assemble a PDF report from VC-curve DataFrames.
+
+    Parameters
+    ----------
+    frames : Sequence[pandas.DataFrame]
+        VC curves, one per sensor, as returned by ``analyze_endaq``.
+    pdf_out : str
+        Output PDF path.
+    title : str
+        Report title, usually the IDE file name.
+    snapshots : Dict[tuple, str], optional
+        PNG snapshot path per ``(sensor name, axis)``; other figures are
+        drawn with matplotlib.
+
+    Returns
+    -------
+    str
+        The path of the written PDF.
+    """
+    from matplotlib.backends.backend_pdf import PdfPages
+    from .vc_batch import summarize_frames
+    from .vc_plot_sensor_data import build_vc_figure_specs, sensor_name
+
+    snapshots = snapshots or {}
+    specs = build_vc_figure_specs([{"name": sensor_name(i), "df": df} for i, df in enumerate(frames)])
+    metadata = {"Title": f"{DEFAULT_REPORT_TITLE} – {title}", "Author": DEFAULT_REPORT_AUTHOR,
+                "Subject": DEFAULT_REPORT_SUBJECT}
+    os.makedirs(os.path.dirname(os.path.abspath(pdf_out)), exist_ok=True)
+    with PdfPages(pdf_out, metadata=metadata) as pdf:
+        pdf.savefig(_summary_page(title, summarize_frames(frames)))
+        for spec in specs:
+            pdf.savefig(_figure_page(spec, snapshots.get((spec["name"], spec["axis"]))))
+    return pdf_out
+
+
+def _batch_snapshots(batch, timeout: float) -> Dict[tuple, str]:
+    """PNG path per ``(sensor name, axis)`` of a batch, once it is rendered."""
+    existing = set(batch.wait(timeout) or ())
+    return {
+        (spec["name"], spec["axis"]): path
+        for spec, path in zip(batch.specs, batch.paths) if path in existing
+    }
+
+
+def _wait_for_snapshots(ide_path: str, frames: Sequence, timeout: float, renderer=None) -> Dict[tuple, str]:
+    """PNG snapshots of ``ide_path``, rendering them now if no report has queued them."""
+    from .vc_plot_sensor_data import build_vc_figure_specs, sensor_name
+    from .vc_snapshots import get_snapshot_renderer
+
+    renderer = renderer or get_snapshot_renderer()
+    batch = renderer.batch_for(ide_path)
+    if batch is None:
+        specs = build_vc_figure_specs([{"name": sensor_name(i), "df": df} for i, df in enumerate(frames)])
+        batch = renderer.submit(specs, ide_path)
+    return _batch_snapshots(batch, timeout)
+
+
+def _rendered_snapshots(ide_path: str, timeout: float) -> Optional[Dict[tuple, str]]:
+    """Snapshots this process has already queued for ``ide_path``, if any."""
+    from .vc_snapshots import peek_snapshot_renderer
+
+    renderer = peek_snapshot_renderer()
+    batch = renderer.batch_for(ide_path) if renderer else None
+    return (_batch_snapshots(batch, timeout) or None) if batch else None
+
+
+def generate_pdf_report(ide_path: str, pdf_out: str, status_callback=None, workers: int = NUM_WORKERS,
+                        snapshot_timeout: float = PDF_SNAPSHOT_TIMEOUT,
+                        snapshots: Optional[Dict[tuple, str]] = None, renderer=None) -> str:
+    """Analyse an IDE file and write its PDF report.
+
+    Parameters
+    ----------
+    ide_path : str
+        Recording to analyse (served from the analysis cache when possible).
+    pdf_out : str
+        Output PDF path, or a directory to place ``<name>_vc_report.pdf`` in.
+    status_callback : callable, optional
+        Progress callback, see ``vc_utils._default_status_callback``.
+    workers : int
+        Worker processes for the per-channel analysis.
+    snapshot_timeout : float
+        Seconds to wait for the PNG snapshots before falling back to
+        matplotlib figures.
+    snapshots : Dict[tuple, str], optional
+        PNG snapshots rendered elsewhere; when given, nothing is rendered.
+    renderer : vc_snapshots.SnapshotRenderer, optional
+        Renderer for missing snapshots (default: the process-wide one).
+
+    Returns
+    -------
+    str
+        The path of the written PDF.
+    """
+    from .vc_analyzer_endaq import analyze_endaq
+
+    if os.path.isdir(pdf_out):
+        pdf_out = os.path.join(pdf_out, f"{os.path.splitext(os.path.basename(ide_path))[0]}_vc_report.pdf")
+    raw = analyze_endaq(ide_path, workers=workers,
+                        status_callback=scaled_status_callback(status_callback, 0.0, 0.7))
+    frames = [df for df in (raw if isinstance(raw, tuple) else (raw,)) if df is not None]
+    if status_callback:
+        status_callback("progress", "Collecting figure snapshots", progress=0.7)
+    if snapshots is None and SNAPSHOTS_ENABLED:
+        snapshots = _wait_for_snapshots(ide_path, frames, snapshot_timeout, renderer)
+    if status_callback:
+        status_callback("progress", "Writing PDF report", progress=0.9)
+    write_pdf_report(frames, pdf_out, os.path.basename(ide_path), snapshots)
+    if status_callback:
+        status_callback("progress", "Report complete", progress=1.0)
+    return pdf_out
+
+
+# Snapshot renderer of a generate_pdf_reports worker process, see _init_pdf_worker
+_worker_renderer = None
+
+
+def _init_pdf_worker():
+    """
+    Process-pool initializer: one snapshot renderer per worker, reused for
+    every file the worker reports on.
+
+    Pool workers never run ``atexit`` hooks, so the renderer (and its
+    Kaleido browser) is shut down by a multiprocessing finalizer instead,
+    which runs when the worker exits.
+    """
+    from multiprocessing.util import Finalize
+    from .vc_snapshots import SnapshotRenderer
+
+    global _worker_renderer
+    if SNAPSHOTS_ENABLED:
+        _worker_renderer = SnapshotRenderer()
+        Finalize(_worker_renderer, _worker_renderer.shutdown, exitpriority=10)
+
+
+def _generate_pdf_file(ide_path: str, output_dir: str, snapshots: Optional[Dict[tuple, str]] = None) -> dict:
+    """Process-pool entry point: write one file's PDF report.
+
+    ``snapshots`` are the PNGs the parent process already has. Otherwise the
+    worker's renderer (see :func:`_init_pdf_worker`) renders them, and they
+    are deleted once the PDF is written.
+    """
+    start = time.perf_counter()
+    result = {"file": ide_path, "name": os.path.basename(ide_path)}
+    renderer = _worker_renderer if snapshots is None else None
+    try:
+        # Files are already spread over the cores; keep each analysis in-process
+        result["pdf"] = generate_pdf_report(ide_path, output_dir, workers=1,
+                                            snapshots=snapshots, renderer=renderer)
+        result["status"] = "ok"
+    except Exception as e:
+        result["status"] = "error"
+        result["error"] = str(e)
+    finally:
+        if renderer is not None:
+            renderer.release(ide_path)
+    result["seconds"] = round(time.perf_counter() - start, 3)
+    return result
+
+
+def generate_pdf_reports(inputs, output_dir: str, workers: Optional[int] = None,
+                         status_callback=_default_status_callback) -> List[dict]:
+    """Write one PDF report per IDE file, several files at a time.
+
+    Parameters
+    ----------
+    inputs : list[str]
+        IDE files and/or directories containing them.
+    output_dir : str
+        Directory the PDFs are written to.
+    workers : int, optional
+        Worker processes (default: all cores).
+    status_callback : callable
+        Progress callback, called as each file finishes.
+
+    Returns
+    -------
+    List[dict]
+        Per-file results (``pdf`` path or ``error``), in input order.
+    """
+    from .vc_batch import collect_ide_files
+
+    files = collect_ide_files(inputs)
+    os.makedirs(output_dir, exist_ok=True)
+    workers = min(workers or os.cpu_count() or 1, len(files))
+    status_callback("info", f"Generating {len(files)} PDF reports", detail=output_dir, progress=0.0)
+    results = {}
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_pdf_worker) as pool:
+        futures = {
+            pool.submit(_generate_pdf_file, path, output_dir,
+                        _rendered_snapshots(path, PDF_SNAPSHOT_TIMEOUT) if SNAPSHOTS_ENABLED else None): path
+            for path in files
+        }
+        for done, future in enumerate(as_completed(futures), start=1):
+            result = future.result()
+            results[futures[future]] = result
+            status_callback("progress" if result["status"] == "ok" else "error",
+                            f"{result['name']}: {result['status']}", progress=done / len(files))
+    return [results[path] for path in files]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate PDF VC reports from enDAQ .IDE files.")
+    parser.add_argument("inputs", nargs="+", help="IDE files and/or directories containing them")
+    parser.add_argument("-o", "--output", default="vibecheck_pdf", help="Output directory")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    args = parser.parse_args(argv)
+    try:
+        results = generate_pdf_reports(args.inputs, args.output, workers=args.workers)
+    except ValueError as e:
+        print(str(e), file=sys.stderr)
+        return 1
+    for result in results:
+        print(f"{result['name']}: {result.get('pdf') or result.get('error')}")
+    return 0 if all(r["status"] == "ok" for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
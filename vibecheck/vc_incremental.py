@@ -0,0 +1,276 @@
+# vc_incremental.py
+# Description: Incremental re-analysis of IDE files that are still being written.
+
+"""
+Incremental VC analysis for growing recordings.
+
+During long surveys the logger keeps appending to the same ``.IDE`` file
+and the file is re-analysed every few minutes. Instead of recomputing the
+PSD over the whole recording each time, the Welch accumulator state of
+every channel (segment periodogram sums and counts, plus the unprocessed
+tail) is saved after each run together with the time of the last sample.
+The next run parses the file from just before that time, feeds only the
+newly appended samples into the restored accumulators, and rebuilds the
+PSD and VC curves, so the cost follows the amount of new data.
+
+The result equals a full streaming analysis of the grown file: the mean
+sample rate is re-derived from the first and last sample times over all
+samples, and if it moves the Welch segment length the channel is simply
+re-analysed from scratch. State is discarded when the file no longer
+starts with the bytes it had when the state was saved (i.e. it was
+replaced rather than appended to).
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+import numpy as np
+
+from .vc_config import CHUNK_SIZE, INCREMENTAL_REPARSE_MARGIN_S, INCREMENTAL_STATE_DIR
+from .vc_psd import WelchAccumulator, _sample_rate_from_ns
+
+# Bump when the saved state layout or its meaning changes
+STATE_FORMAT_VERSION = 1
+
+
+def default_state_dir():
+    """Return the configured state directory, defaulting to next to the analysis cache."""
+    if INCREMENTAL_STATE_DIR:
+        return INCREMENTAL_STATE_DIR
+    from .vc_cache import default_cache_dir
+    return os.path.join(default_cache_dir(), "incremental")
+
+
+def _prefix_hash(file_path, length):
+    """SHA-256 of the first ``length`` bytes of a file."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        remaining = length
+        while remaining > 0:
+            chunk = f.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            digest.update(chunk)
+            remaining -= len(chunk)
+    return digest.hexdigest()
+
+
+def update_channel(reader, bin_width, state=None):
+    """
+    Accumulate a channel's Welch PSD, resuming from ``state`` if given.
+
+    While the channel is still shorter than one Welch segment (a recording
+    that has just started), the PSD is computed by ``endaq`` from the
+    samples held by the accumulator, as ``vc_psd.channel_psd`` does for
+    short channels; the state is saved all the same.
+
+    Args:
+        reader: Channel reader (see ``vc_psd``) that also provides
+            ``timestamp_ns()`` and ``index_after()``. When resuming it must
+            cover at least the samples after ``state["t_last_ns"]``.
+        bin_width (float): Frequency resolution in Hz
+        state (dict): State returned by a previous call, or None
+
+    Returns:
+        tuple or None: ``(psd DataFrame, new state)``, or None if the channel
+        must be re-analysed from the start (the segment length changed)
+    """
+    if state is not None:
+        acc = WelchAccumulator.from_state(state["welch"])
+        start = reader.index_after(state["t_last_ns"]) if reader.n_samples else 0
+        t_first_ns = state["t_first_ns"]
+        n_total = acc.samples_seen + reader.n_samples - start
+    else:
+        acc = None
+        start = 0
+        t_first_ns = reader.timestamp_ns(0)
+        n_total = reader.n_samples
+    t_last_ns = reader.timestamp_ns(reader.n_samples - 1) if start < reader.n_samples else state["t_last_ns"]
+
+    sample_rate = _sample_rate_from_ns(t_first_ns, t_last_ns, n_total)
+    if acc is None:
+        acc = WelchAccumulator(sample_rate, bin_width, len(reader.columns))
+    elif not acc.set_sample_rate(sample_rate):
+        return None
+    for block in reader.iter_blocks(start=start):
+        acc.update(block)
+
+    new_state = {
+        "t_first_ns": int(t_first_ns),
+        "t_last_ns": int(t_last_ns),
+        "columns": list(reader.columns),
+        "welch": acc.get_state(),
+    }
+    if acc.segment_count == 0:
+        return _short_channel_psd(acc, reader.columns, bin_width), new_state
+    return acc.to_dataframe(reader.columns), new_state
+
+
+def _short_channel_psd(acc, columns, bin_width):
+    """PSD of a channel shorter than one segment; every sample is still pending in ``acc``."""
+    import endaq
+    from .vc_psd import ArrayChannelReader
+
+    df = ArrayChannelReader(acc.get_state()["pending"], acc.sample_rate, columns).to_dataframe()
+    return endaq.calc.psd.welch(df, bin_width=bin_width)
+
+
+class IncrementalStateStore:
+    """
+    Saved per-channel accumulator state, one ``.npz`` file per recording.
+
+    Args:
+        state_dir (str): Directory holding the state files
+    """
+
+    def __init__(self, state_dir=None):
+        self.state_dir = state_dir or default_state_dir()
+        self._lock = threading.Lock()
+        os.makedirs(self.state_dir, exist_ok=True)
+
+    def _path(self, file_path):
+        key = hashlib.sha256(os.path.abspath(file_path).encode("utf-8")).hexdigest()
+        return os.path.join(self.state_dir, key + ".npz")
+
+    def load(self, file_path, params):
+        """
+        Channel states saved for ``file_path``, or ``{}`` if there are none or
+        they no longer apply (different parameters, file replaced or truncated).
+        """
+        try:
+            with np.load(self._path(file_path), allow_pickle=False) as data:
+                meta = json.loads(str(data["meta"]))
+                arrays = {name: data[name] for name in data.files if name != "meta"}
+        except (OSError, ValueError, KeyError):
+            return {}
+        if meta.get("version") != STATE_FORMAT_VERSION or meta.get("params") != params:
+            return {}
+        try:
+            if (os.path.getsize(file_path) < meta["size"]
+                    or _prefix_hash(file_path, meta["prefix_bytes"]) != meta["prefix_hash"]):
+                return {}
+        except OSError:
+            return {}
+
+        states = {}
+        for key, channel in meta["channels"].items():
+            welch = dict(channel["welch"])
+            welch["segment_sum"] = arrays[f"segment_sum_{key}"]
+            welch["pending"] = arrays[f"pending_{key}"]
+            states[int(key)] = dict(channel, welch=welch)
+        return states
+
+    def save(self, file_path, params, states):
+        """Save channel states (``{channel_id: state}``) for ``file_path``."""
+        size = os.path.getsize(file_path)
+        prefix_bytes = min(size, CHUNK_SIZE)
+        meta = {
+            "version": STATE_FORMAT_VERSION,
+            "params": params,
+            "size": size,
+            "prefix_bytes": prefix_bytes,
+            "prefix_hash": _prefix_hash(file_path, prefix_bytes),
+            "channels": {},
+        }
+        arrays = {}
+        for channel_id, state in states.items():
+            welch = dict(state["welch"])
+            arrays[f"segment_sum_{channel_id}"] = welch.pop("segment_sum")
+            arrays[f"pending_{channel_id}"] = welch.pop("pending")
+            meta["channels"][str(channel_id)] = dict(state, welch=welch)
+        arrays["meta"] = np.array(json.dumps(meta))
+
+        with self._lock:
+            fd, tmp_path = tempfile.mkstemp(dir=self.state_dir, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    np.savez(f, **arrays)
+                os.replace(tmp_path, self._path(file_path))
+            except Exception:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+
+    def clear(self, file_path):
+        try:
+            os.remove(self._path(file_path))
+        except OSError:
+            pass
+
+
+def _analyze_channel(file_path, channel_id, bin_width, state):
+    from .vc_analyzer_endaq import open_ide
+    from .vc_psd import IDEChannelReader
+
+    kwargs = {}
+    if state is not None:
+        # Only parse the data recorded since the last run (plus a margin, so
+        # the block holding the next sample is not skipped)
+        kwargs["startTime"] = max(0.0, state["t_last_ns"] / 1e3 - INCREMENTAL_REPARSE_MARGIN_S * 1e6)
+    doc = open_ide(file_path, channels=[channel_id], **kwargs)
+    try:
+        return update_channel(IDEChannelReader(doc.channels[channel_id]), bin_width, state)
+    finally:
+        doc.close()
+
+
+def analyze_incremental(file_path, params=None, store=None, status_callback=None):
+    """
+    Analyse an IDE file, processing only the samples added since the last call.
+
+    Args:
+        file_path (str): Recording that may have grown since the last run
+        params (dict): Analysis parameters (default ``analysis_params(decimate=False)``)
+        store (IncrementalStateStore): Where accumulator state is kept
+        status_callback (callable): Optional progress callback
+
+    Returns:
+        pandas.DataFrame or tuple: VC curves, shaped like ``analyze_endaq`` output
+    """
+    import endaq
+    from .vc_analyzer_endaq import _pack_results, analysis_params, open_ide, vc_curves_from_psds
+
+    # Saved accumulator state is at the native sample rate: no decimation
+    params = params or analysis_params(decimate=False)
+    store = store or get_incremental_store()
+    saved = store.load(file_path, params)
+
+    doc = open_ide(file_path, parsed=False)
+    try:
+        channel_ids = [ch.id for ch in endaq.ide.get_channels(doc, 'acceleration', subchannels=False)]
+    finally:
+        doc.close()
+    if not channel_ids:
+        raise ValueError(f"No acceleration channels found in {file_path}")
+
+    psds, states = [], {}
+    for done, channel_id in enumerate(channel_ids, start=1):
+        result = None
+        if channel_id in saved:
+            result = _analyze_channel(file_path, channel_id, params["bin_width"], saved[channel_id])
+        if result is None:
+            result = _analyze_channel(file_path, channel_id, params["bin_width"], None)
+        psd, states[channel_id] = result
+        psds.append(psd)
+        if status_callback:
+            status_callback("progress", f"Analyzed channel {done} of {len(channel_ids)}",
+                            progress=done / len(channel_ids))
+
+    store.save(file_path, params, states)
+    return _pack_results(vc_curves_from_psds(psds, params))
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def get_incremental_store():
+    """Return the process-wide state store, creating it on first use."""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = IncrementalStateStore()
+        return _default_store
@@ -0,0 +1,218 @@
+# vc_jobs.py
+# Description: Background job queue for report generation.
+
+"""
+Asynchronous analysis jobs for the Flask backend.
+
+``/api/analyze`` runs the analysis inside the request thread. Jobs submitted
+here are instead processed by a small pool of worker threads; the client polls
+for status and progress, may cancel, and downloads the report when done. The
+queue has a fixed depth so a burst of uploads is rejected (backpressure)
+rather than piling up unbounded work; a cancelled job leaves the queue at
+once and no longer counts towards it.
+"""
+
+import collections
+import functools
+import os
+import shutil
+import threading
+import time
+import uuid
+
+from .vc_config import JOB_QUEUE_MAX_DEPTH, JOB_RETENTION_SECONDS, JOB_WORKERS
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+FINISHED_STATES = {DONE, FAILED, CANCELLED}
+
+
+class JobCancelled(Exception):
+    """Raised from a job's status callback once cancellation is requested."""
+
+
+class QueueFullError(Exception):
+    """Raised when the job queue is at ``JOB_QUEUE_MAX_DEPTH``."""
+
+
+class Job:
+    """
+    One report-generation job.
+
+    Args:
+        ide_path (str): Uploaded IDE file to analyse
+        work_dir (str): Directory owned by the job; removed when the job expires
+        filename (str): Original upload name, for display
+    """
+
+    def __init__(self, ide_path, work_dir, filename):
+        self.id = uuid.uuid4().hex
+        self.ide_path = ide_path
+        self.work_dir = work_dir
+        self.filename = filename
+        self.result_path = os.path.join(work_dir, "report.html")
+        self.status = QUEUED
+        self.progress = 0.0
+        self.message = "Queued"
+        self.error = None
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self._cancel = threading.Event()
+
+    @property
+    def cancel_requested(self):
+        return self._cancel.is_set()
+
+    def status_callback(self, message_type, message, detail=None, progress=None):
+        """Progress hook passed down to the analysis (``_default_status_callback`` signature)."""
+        if self._cancel.is_set():
+            raise JobCancelled(self.id)
+        self.message = message if detail is None else f"{message} ({detail})"
+        if progress is not None:
+            self.progress = max(self.progress, min(float(progress), 1.0))
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "filename": self.filename,
+            "status": self.status,
+            "progress": round(self.progress, 3),
+            "message": self.message,
+            "error": self.error,
+            "created": self.created,
+            "started": self.started,
+            "finished": self.finished,
+        }
+
+
+class JobQueue:
+    """
+    Bounded queue of jobs processed by background worker threads.
+
+    Args:
+        runner (callable): ``runner(ide_path, html_out, status_callback) -> bool``
+        workers (int): Number of worker threads
+        max_depth (int): Maximum number of queued (not yet running) jobs
+        retention (float): Seconds a finished job and its files are kept
+    """
+
+    def __init__(self, runner, workers=JOB_WORKERS, max_depth=JOB_QUEUE_MAX_DEPTH,
+                 retention=JOB_RETENTION_SECONDS):
+        self.runner = runner
+        self.retention = retention
+        self.max_depth = max_depth
+        self._pending = collections.deque()
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._ready = threading.Condition(self._lock)
+        self._threads = []
+        for i in range(workers):
+            thread = threading.Thread(target=self._worker, name=f"vibecheck-job-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, ide_path, work_dir, filename):
+        """
+        Queue a new job.
+
+        Raises:
+            QueueFullError: If the queue is at capacity
+        """
+        self.prune()
+        job = Job(ide_path, work_dir, filename)
+        with self._ready:
+            if len(self._pending) >= self.max_depth:
+                raise QueueFullError("Job queue is full, try again later")
+            self._jobs[job.id] = job
+            self._pending.append(job)
+            self._ready.notify()
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id):
+        """Request cancellation; queued jobs are cancelled and dequeued immediately."""
+        with self._ready:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            job._cancel.set()
+            if job.status == QUEUED:
+                self._pending.remove(job)
+                self._finish(job, CANCELLED, "Cancelled")
+        return job
+
+    def depth(self):
+        with self._lock:
+            return len(self._pending)
+
+    def prune(self):
+        """Drop finished jobs older than ``retention`` and delete their files."""
+        now = time.time()
+        with self._lock:
+            expired = [job for job in self._jobs.values()
+                       if job.finished and now - job.finished > self.retention]
+            for job in expired:
+                del self._jobs[job.id]
+        for job in expired:
+            shutil.rmtree(job.work_dir, ignore_errors=True)
+
+    def _finish(self, job, status, message, error=None):
+        job.status = status
+        job.message = message
+        job.error = error
+        job.finished = time.time()
+        if status == DONE:
+            job.progress = 1.0
+
+    def _worker(self):
+        while True:
+            with self._ready:
+                while not self._pending:
+                    self._ready.wait()
+                # Taken off the queue and marked running together, so cancel() sees one or the other
+                job = self._pending.popleft()
+                job.status = RUNNING
+                job.started = time.time()
+                job.message = "Running"
+            self._run(job)
+
+    def _run(self, job):
+        try:
+            ok = self.runner(job.ide_path, job.result_path, job.status_callback)
+        except JobCancelled:
+            ok = False
+        except Exception as e:
+            self._finish(job, FAILED, "Failed", error=str(e))
+            return
+        if job.cancel_requested:
+            self._finish(job, CANCELLED, "Cancelled")
+        elif ok:
+            self._finish(job, DONE, "Complete")
+        else:
+            self._finish(job, FAILED, "Failed", error="Failed to generate report")
+
+
+_job_queue = None
+_job_queue_lock = threading.Lock()
+
+
+def get_job_queue():
+    """Return the process-wide job queue, starting its workers on first use."""
+    global _job_queue
+    with _job_queue_lock:
+        if _job_queue is None:
+            from .vc_plot_sensor_data import create_vc_plots_plotly
+            # Results are downloaded from this server, which also serves Plotly.js.
+            # Job inputs are temporary copies: a columnar sidecar or a remembered
+            # path hash would never be reused
+            _job_queue = JobQueue(functools.partial(create_vc_plots_plotly, plotly_js="shared", columnar=False,
+                                                    remember=False))
+        return _job_queue
@@ -0,0 +1,382 @@
+# vc_live.py
+# Description: Live VC monitoring of recordings in progress.
+
+"""
+Live streaming VC monitor.
+
+A :class:`LiveMonitor` consumes samples from a source as they arrive and
+keeps a sliding-window PSD (:class:`vc_psd.SlidingWelchAccumulator`), so
+memory stays bounded however long the survey runs. At most every
+``LIVE_UPDATE_INTERVAL`` seconds it turns the window into third-octave VC
+curves plus per-axis peak and VC class, and publishes the result to its
+subscribers; the Flask app relays these as server-sent events.
+
+Sources yield ``(rows, axes)`` sample blocks:
+
+* :class:`IDEFollowSource` follows a ``.IDE`` file the logger is still
+  writing, re-parsing only the data recorded since the last poll;
+* :class:`ReplaySource` plays back any channel reader (a finished IDE file,
+  in-memory or synthetic data) at real-time or accelerated speed, which is
+  handy for testing the UI.
+"""
+
+import queue
+import threading
+import time
+import uuid
+
+import numpy as np
+
+from .vc_config import (
+    LIVE_BLOCK_SECONDS,
+    LIVE_MAX_MONITORS,
+    LIVE_POLL_SECONDS,
+    LIVE_SUBSCRIBER_QUEUE,
+    LIVE_UPDATE_INTERVAL,
+    LIVE_WINDOW_SECONDS,
+)
+
+STARTING = "starting"
+RUNNING = "running"
+STOPPED = "stopped"
+FAILED = "failed"
+
+
+class MonitorLimitError(Exception):
+    """Raised when ``LIVE_MAX_MONITORS`` monitors are already running."""
+
+
+def _first_acceleration_channel(file_path):
+    import endaq
+    from .vc_analyzer_endaq import open_ide
+
+    doc = open_ide(file_path, parsed=False)
+    try:
+        channels = endaq.ide.get_channels(doc, 'acceleration', subchannels=False)
+    finally:
+        doc.close()
+    if not channels:
+        raise ValueError(f"No acceleration channels found in {file_path}")
+    return channels[0].id
+
+
+class ReplaySource:
+    """
+    Play back a channel reader block by block.
+
+    Args:
+        reader: Channel reader (see ``vc_psd``)
+        speed (float): Playback speed relative to real time; None for as
+            fast as possible
+        block_seconds (float): Duration of data per block
+        doc: Open IDE dataset backing ``reader``, closed once playback ends
+    """
+
+    def __init__(self, reader, speed=1.0, block_seconds=LIVE_BLOCK_SECONDS, doc=None):
+        self.reader = reader
+        self.speed = speed
+        self.block_seconds = block_seconds
+        self.doc = doc
+        self._stop = threading.Event()
+
+    @classmethod
+    def from_ide(cls, file_path, channel_id=None, speed=1.0, block_seconds=LIVE_BLOCK_SECONDS):
+        """Replay an acceleration channel (default: the first) of a finished recording."""
+        from .vc_analyzer_endaq import open_ide
+        from .vc_psd import IDEChannelReader
+
+        if channel_id is None:
+            channel_id = _first_acceleration_channel(file_path)
+        doc = open_ide(file_path, channels=[channel_id])
+        return cls(IDEChannelReader(doc.channels[channel_id]), speed, block_seconds, doc)
+
+    def open(self):
+        self.columns = list(self.reader.columns)
+        self.sample_rate = self.reader.sample_rate
+
+    def blocks(self):
+        rows = max(1, int(self.block_seconds * self.sample_rate))
+        start = time.perf_counter()
+        played = 0
+        try:
+            for block in self.reader.iter_blocks(rows):
+                if self._stop.is_set():
+                    return
+                yield block
+                played += len(block)
+                if self.speed:
+                    # Sleep until the wall clock catches up with the data
+                    ahead = played / (self.sample_rate * self.speed) - (time.perf_counter() - start)
+                    if ahead > 0 and self._stop.wait(ahead):
+                        return
+        finally:
+            if self.doc is not None:
+                self.doc.close()
+
+    def stop(self):
+        self._stop.set()
+
+
+class IDEFollowSource:
+    """
+    Follow an IDE file that is still being written.
+
+    Every ``poll_interval`` seconds the channel is parsed from shortly before
+    the last sample already delivered, and only later samples are yielded.
+
+    Args:
+        file_path (str): Recording being written
+        channel_id (int): Acceleration channel; defaults to the first one
+        poll_interval (float): Seconds between polls for new data
+        idle_timeout (float): Stop after this long without new data (None: never)
+    """
+
+    def __init__(self, file_path, channel_id=None, poll_interval=LIVE_POLL_SECONDS, idle_timeout=None):
+        self.file_path = file_path
+        self.channel_id = channel_id
+        self.poll_interval = poll_interval
+        self.idle_timeout = idle_timeout
+        self._stop = threading.Event()
+
+    def _open_reader(self, start_ns=None):
+        from .vc_analyzer_endaq import open_ide
+        from .vc_config import INCREMENTAL_REPARSE_MARGIN_S
+        from .vc_psd import IDEChannelReader
+
+        kwargs = {}
+        if start_ns is not None:
+            kwargs["startTime"] = max(0.0, start_ns / 1e3 - INCREMENTAL_REPARSE_MARGIN_S * 1e6)
+        doc = open_ide(self.file_path, channels=[self.channel_id], **kwargs)
+        return doc, IDEChannelReader(doc.channels[self.channel_id])
+
+    def open(self):
+        if self.channel_id is None:
+            self.channel_id = _first_acceleration_channel(self.file_path)
+        doc, reader = self._open_reader()
+        try:
+            self.columns = list(reader.columns)
+            self.sample_rate = reader.sample_rate
+        finally:
+            doc.close()
+
+    def blocks(self):
+        t_last_ns = None
+        idle_since = time.monotonic()
+        while not self._stop.is_set():
+            doc, reader = self._open_reader(t_last_ns)
+            try:
+                start = 0
+                if t_last_ns is not None and reader.n_samples:
+                    start = reader.index_after(t_last_ns)
+                if start < reader.n_samples:
+                    for block in reader.iter_blocks(start=start):
+                        if self._stop.is_set():
+                            return
+                        yield block
+                    t_last_ns = reader.timestamp_ns(reader.n_samples - 1)
+                    idle_since = time.monotonic()
+            finally:
+                doc.close()
+            if self.idle_timeout is not None and time.monotonic() - idle_since > self.idle_timeout:
+                return
+            self._stop.wait(self.poll_interval)
+
+    def stop(self):
+        self._stop.set()
+
+
+class LiveMonitor:
+    """
+    Sliding-window VC analysis of a live source, published to subscribers.
+
+    Args:
+        source: :class:`IDEFollowSource`, :class:`ReplaySource` or similar
+        name (str): Display name (e.g. the file name)
+        window_seconds (float): Length of data behind each PSD
+        update_interval (float): Minimum seconds between published updates
+        params (dict): Analysis parameters (default ``analysis_params(decimate=False)``)
+    """
+
+    def __init__(self, source, name="", window_seconds=LIVE_WINDOW_SECONDS,
+                 update_interval=LIVE_UPDATE_INTERVAL, params=None):
+        self.id = uuid.uuid4().hex
+        self.source = source
+        self.name = name
+        self.window_seconds = window_seconds
+        self.update_interval = update_interval
+        self.params = params
+        self.status = STARTING
+        self.error = None
+        self.latest = None
+        self.updates = 0
+        self.latency_total = 0.0
+        self.cpu_total = 0.0
+        self._seq = 0
+        self._subscribers = []
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name=f"vibecheck-live-{self.id[:8]}", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.source.stop()
+
+    def join(self, timeout=None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    @property
+    def finished(self):
+        return self.status in (STOPPED, FAILED)
+
+    def subscribe(self):
+        """Queue receiving every event from now on, starting with the latest update."""
+        q = queue.Queue(maxsize=LIVE_SUBSCRIBER_QUEUE)
+        with self._lock:
+            if self.latest is not None:
+                q.put_nowait(("update", self.latest))
+            if self.finished:
+                q.put_nowait(("end", self.to_dict()))
+            else:
+                self._subscribers.append(q)
+        return q
+
+    def unsubscribe(self, q):
+        with self._lock:
+            if q in self._subscribers:
+                self._subscribers.remove(q)
+
+    def _publish(self, event, payload):
+        with self._lock:
+            subscribers = list(self._subscribers)
+            if event == "end":
+                self._subscribers.clear()
+        for q in subscribers:
+            # Slow clients lose the oldest updates rather than stalling the monitor
+            while True:
+                try:
+                    q.put_nowait((event, payload))
+                    break
+                except queue.Full:
+                    try:
+                        q.get_nowait()
+                    except queue.Empty:
+                        pass
+
+    def _run(self):
+        from .vc_analyzer_endaq import analysis_params
+        from .vc_psd import SlidingWelchAccumulator
+
+        try:
+            params = self.params or analysis_params(decimate=False)
+            self.source.open()
+            acc = SlidingWelchAccumulator.for_window(
+                self.source.sample_rate, params["bin_width"], len(self.source.columns), self.window_seconds)
+            self.status = RUNNING
+            last_update = 0.0
+            for block in self.source.blocks():
+                start, cpu_start = time.perf_counter(), time.process_time()
+                acc.update(block)
+                if acc.segment_count and start - last_update >= self.update_interval:
+                    self.latest = self.snapshot(acc, params)
+                    self._publish("update", self.latest)
+                    last_update = start
+                    self.updates += 1
+                    self.latency_total += time.perf_counter() - start
+                    self.cpu_total += time.process_time() - cpu_start
+            self.status = STOPPED
+        except Exception as e:
+            self.status = FAILED
+            self.error = str(e)
+        self._publish("end", self.to_dict())
+
+    def snapshot(self, acc, params):
+        """VC curves, peaks and classes for the accumulator's current window."""
+        from .vc_analyzer_endaq import vc_curves_from_psd
+        from .vc_batch import summarize_frames
+        from .vc_generate_pdf import classify_vc
+
+        vc = vc_curves_from_psd(acc.to_dataframe(self.source.columns), params)
+        axes = summarize_frames([vc])[0]["axes"]
+        peaks = [info["max_velocity_mm_s"] for info in axes.values()]
+        # Worst axis decides the site's class (as vc_generate_pdf._lowest_vc_passed);
+        # None means it exceeds VC-A
+        overall = classify_vc([np.max(peaks)])[0] if peaks else None
+        first, stop = acc.window_samples()
+        self._seq += 1
+        return {
+            "seq": self._seq,
+            "time_s": acc.samples_seen / acc.sample_rate,
+            "window_s": (stop - first) / acc.sample_rate,
+            "segments": acc.segment_count,
+            "frequencies": vc.index.to_numpy(dtype=float).tolist(),
+            "curves": {col: np.asarray(vc[col], dtype=float).tolist() for col in vc.columns},
+            "axes": axes,
+            "vc_class": overall,
+        }
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "name": self.name,
+            "status": self.status,
+            "error": self.error,
+            "updates": self.updates,
+            "mean_latency_ms": 1e3 * self.latency_total / self.updates if self.updates else None,
+            "mean_cpu_ms": 1e3 * self.cpu_total / self.updates if self.updates else None,
+        }
+
+
+class LiveMonitorRegistry:
+    """Running monitors by id, with a cap on how many run at once."""
+
+    def __init__(self, max_monitors=LIVE_MAX_MONITORS):
+        self.max_monitors = max_monitors
+        self._monitors = {}
+        self._lock = threading.Lock()
+
+    def start(self, source, name=""):
+        """
+        Start monitoring ``source``.
+
+        Raises:
+            MonitorLimitError: If ``max_monitors`` are already running
+        """
+        with self._lock:
+            for monitor_id in [m.id for m in self._monitors.values() if m.finished]:
+                del self._monitors[monitor_id]
+            if len(self._monitors) >= self.max_monitors:
+                raise MonitorLimitError(f"At most {self.max_monitors} live monitors can run at once")
+            monitor = LiveMonitor(source, name)
+            self._monitors[monitor.id] = monitor
+        return monitor.start()
+
+    def get(self, monitor_id):
+        with self._lock:
+            return self._monitors.get(monitor_id)
+
+    def stop(self, monitor_id):
+        monitor = self.get(monitor_id)
+        if monitor is not None:
+            monitor.stop()
+        return monitor
+
+    def list(self):
+        with self._lock:
+            return [m.to_dict() for m in self._monitors.values()]
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_live_registry():
+    """Return the process-wide monitor registry."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = LiveMonitorRegistry()
+        return _registry
@@ -0,0 +1,203 @@
+# vc_logging.py
+# Description: Queue-based background logging with persistent file handles.
+
+"""
+Logging that stays off the request path.
+
+Every handler that does I/O (console, server log file, the temporary error
+log) sits behind a :class:`logging.handlers.QueueListener`. Application
+threads only run the level check and put the record on an in-memory queue;
+a background thread formats it and writes it through a file handle that is
+opened once and kept open.
+
+Records are queued unformatted, so ``logger.debug("psd %s", frame)`` costs
+a level check when DEBUG is off and never renders ``frame`` on the calling
+thread when it is on. (Arguments are therefore rendered slightly later, on
+the listener thread; do not log objects that are mutated straight after.)
+Exception tracebacks are rendered before queueing, while they are current.
+
+:func:`configure_logging` installs this on the root logger for the server
+and the CLIs; :class:`AsyncFileLog` is a self-contained logger writing to
+one file, used for the temporary error log in ``vc_utils``.
+"""
+
+import atexit
+import itertools
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+
+from .vc_config import DEFAULT_LOG_FORMAT, DEFAULT_LOG_LEVEL, LOG_FILE
+
+_plain = logging.Formatter()
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that leaves message formatting to the listener thread.
+
+    The stock handler merges ``msg % args`` (and renders the traceback) in
+    the calling thread before queueing; here only the traceback is.
+    """
+
+    def prepare(self, record):
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = _plain.formatException(record.exc_info)
+            # Tracebacks keep every frame's locals alive until written
+            record.exc_info = None
+        return record
+
+
+class _Flush:
+    """Queue marker: the listener sets ``done`` once everything before it is handled."""
+
+    def __init__(self):
+        self.done = threading.Event()
+
+
+class AsyncListener(logging.handlers.QueueListener):
+    """QueueListener whose handlers can be flushed and closed from other threads."""
+
+    def __init__(self, log_queue, *handlers):
+        super().__init__(log_queue, *handlers, respect_handler_level=True)
+
+    def handle(self, record):
+        if isinstance(record, _Flush):
+            for handler in self.handlers:
+                handler.flush()
+            record.done.set()
+            return
+        super().handle(record)
+
+    def flush(self, timeout=5.0):
+        """Block until every record queued so far has been written."""
+        if self._thread is None:
+            for handler in self.handlers:
+                handler.flush()
+            return True
+        marker = _Flush()
+        self.queue.put_nowait(marker)
+        return marker.done.wait(timeout)
+
+    def close(self):
+        """Drain the queue, stop the thread and close the handlers."""
+        if self._thread is not None:
+            self.stop()
+        for handler in self.handlers:
+            handler.close()
+
+
+def start_listener(*handlers):
+    """
+    Start a background listener for ``handlers``.
+
+    Returns:
+        tuple: ``(queue_handler, listener)``; attach ``queue_handler`` to a logger
+    """
+    log_queue = queue.SimpleQueue()
+    listener = AsyncListener(log_queue, *handlers)
+    listener.start()
+    return DeferredQueueHandler(log_queue), listener
+
+
+class AsyncFileLog:
+    """
+    A private logger writing to one file through a background listener.
+
+    The file is opened once, in ``mode``, and written by the listener thread
+    until :meth:`close`. The logger does not propagate to the root logger.
+
+    Args:
+        path (str): File to write
+        formatter (logging.Formatter): Formatter for the records
+        mode (str): ``"a"`` to append, ``"w"`` to truncate
+    """
+
+    _ids = itertools.count()
+
+    def __init__(self, path, formatter, mode="a"):
+        self.path = path
+        file_handler = logging.FileHandler(path, mode=mode, encoding="utf-8")
+        file_handler.setFormatter(formatter)
+        handler, self._listener = start_listener(file_handler)
+        self.logger = logging.getLogger(f"vibecheck.filelog.{next(self._ids)}")
+        self.logger.propagate = False
+        self.logger.setLevel(logging.DEBUG)
+        self.logger.addHandler(handler)
+        self._handler = handler
+
+    def log(self, level, message, *args, **kwargs):
+        self.logger.log(level, message, *args, **kwargs)
+
+    def flush(self):
+        """Wait until everything logged so far is on disk."""
+        return self._listener.flush()
+
+    def close(self):
+        self.logger.removeHandler(self._handler)
+        self._listener.close()
+
+
+_root_listener = None
+_root_handler = None
+_root_lock = threading.Lock()
+
+
+def configure_logging(level=DEFAULT_LOG_LEVEL, fmt=DEFAULT_LOG_FORMAT, log_file=LOG_FILE, force=False):
+    """
+    Route the root logger through a background listener (like ``logging.basicConfig``).
+
+    Records go to stderr and, with ``log_file``, to that file (appended,
+    kept open). Does nothing if the root logger already has handlers,
+    unless ``force`` is set.
+
+    Args:
+        level (str or int): Root log level
+        fmt (str): Record format
+        log_file (str): Optional persistent log file
+        force (bool): Replace existing root handlers
+    """
+    global _root_listener, _root_handler
+    root = logging.getLogger()
+    with _root_lock:
+        if root.handlers and not force:
+            return
+        _shutdown_root()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+            handler.close()
+
+        formatter = logging.Formatter(fmt)
+        handlers = [logging.StreamHandler(sys.stderr)]
+        if log_file:
+            handlers.append(logging.FileHandler(log_file, mode="a", encoding="utf-8"))
+        for handler in handlers:
+            handler.setFormatter(formatter)
+        _root_handler, _root_listener = start_listener(*handlers)
+        root.addHandler(_root_handler)
+        root.setLevel(level)
+
+
+def flush_logging():
+    """Wait until every record logged through :func:`configure_logging` is written."""
+    listener = _root_listener
+    if listener is not None:
+        listener.flush()
+
+
+def _shutdown_root():
+    global _root_listener, _root_handler
+    if _root_listener is not None:
+        logging.getLogger().removeHandler(_root_handler)
+        _root_listener.close()
+        _root_listener = _root_handler = None
+
+
+@atexit.register
+def _shutdown():
+    # Write out whatever is still queued before the interpreter exits
+    with _root_lock:
+        _shutdown_root()
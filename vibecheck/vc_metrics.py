@@ -0,0 +1,272 @@
+# vc_metrics.py
+# Description: Per-stage timers, counters and a Prometheus text exporter.
+
+"""
+Lightweight instrumentation for the analysis and report pipeline.
+
+Code wraps each stage in ``with stage("welch"):``; the duration goes into a
+latency histogram per stage, and how far the stage raised the process's
+peak resident memory (``ru_maxrss``) into a per-stage high-water mark. A
+stage that allocates and frees a large buffer is caught by the peak even
+though its memory is gone by the end of the stage; a stage that stays below
+an earlier peak reports zero. Counters track events such
+as cache hits and HTTP responses. :func:`render_prometheus` renders
+everything in the Prometheus text exposition format for ``/api/metrics``.
+
+With ``METRICS_ENABLED`` off, :func:`stage` returns a shared no-op context
+manager and :func:`observe`/:func:`inc` return immediately.
+
+Channel analyses may run in worker processes, whose metrics would otherwise
+be lost (or, after a fork, double counted). Workers therefore run inside
+:func:`capture`, which diverts their observations into a list that is
+returned with the result and replayed into the parent's registry with
+:func:`record`.
+"""
+
+import contextlib
+import math
+import os
+import threading
+import time
+
+from .vc_config import METRICS_ENABLED, METRICS_LATENCY_BUCKETS
+
+_NOOP = contextlib.nullcontext()
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+STAGE_METRIC = "vibecheck_stage_duration_seconds"
+HTTP_METRIC = "vibecheck_http_request_duration_seconds"
+RSS_METRIC = "vibecheck_stage_peak_rss_increase_bytes"
+
+_HELP = {
+    STAGE_METRIC: ("histogram", "Time spent in each analysis and report stage."),
+    HTTP_METRIC: ("histogram", "HTTP request latency until the response is returned."),
+    RSS_METRIC: ("gauge", "Largest increase of the process's peak resident memory during a stage."),
+    "vibecheck_process_max_rss_bytes": ("gauge", "Peak resident memory of the server process."),
+    "vibecheck_http_requests_total": ("counter", "HTTP responses by endpoint and status."),
+    "vibecheck_analysis_cache_total": ("counter", "Analysis cache lookups by result."),
+}
+
+
+def current_rss():
+    """Resident memory of this process in bytes, or None where unavailable."""
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _max_rss():
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak if os.uname().sysname == "Darwin" else peak * 1024
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram."""
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """
+    Thread-safe store of histograms, counters and high-water gauges.
+
+    Args:
+        enabled (bool): Record anything at all
+        buckets (tuple[float]): Upper bounds of the latency buckets in seconds
+    """
+
+    def __init__(self, enabled=METRICS_ENABLED, buckets=METRICS_LATENCY_BUCKETS):
+        self.enabled = enabled
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._histograms = {}
+        self._counters = {}
+        self._gauges = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def stage(self, name):
+        """Context manager timing one stage (no-op when disabled)."""
+        if not self.enabled:
+            return _NOOP
+        return _StageTimer(self, name)
+
+    def observe(self, metric, seconds, **labels):
+        """Add one duration to the histogram ``metric`` with the given labels."""
+        if not self.enabled:
+            return
+        captured = getattr(self._local, "captured", None)
+        if captured is not None:
+            captured.append(("observe", metric, seconds, labels))
+            return
+        key = (metric, tuple(sorted(labels.items())))
+        with self._lock:
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = Histogram(self.buckets)
+            hist.observe(seconds)
+
+    def high_water(self, metric, value, **labels):
+        """Raise the gauge ``metric`` to ``value`` if that is higher."""
+        if not self.enabled or value is None:
+            return
+        captured = getattr(self._local, "captured", None)
+        if captured is not None:
+            captured.append(("high_water", metric, value, labels))
+            return
+        key = (metric, tuple(sorted(labels.items())))
+        with self._lock:
+            self._gauges[key] = max(self._gauges.get(key, value), value)
+
+    def inc(self, metric, amount=1, **labels):
+        """Increment a counter."""
+        if not self.enabled:
+            return
+        captured = getattr(self._local, "captured", None)
+        if captured is not None:
+            captured.append(("inc", metric, amount, labels))
+            return
+        key = (metric, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    @contextlib.contextmanager
+    def capture(self):
+        """Collect this thread's observations in a list instead of recording them."""
+        previous = getattr(self._local, "captured", None)
+        self._local.captured = captured = []
+        try:
+            yield captured
+        finally:
+            self._local.captured = previous
+
+    def record(self, captured):
+        """Record observations returned by :meth:`capture` (e.g. from a worker process)."""
+        methods = {"observe": self.observe, "high_water": self.high_water, "inc": self.inc}
+        for kind, metric, value, labels in captured or ():
+            methods[kind](metric, value, **labels)
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+            self._gauges.clear()
+
+    def render_prometheus(self):
+        """All metrics in the Prometheus text exposition format."""
+        with self._lock:
+            histograms = {k: (list(h.counts), h.sum, h.count) for k, h in self._histograms.items()}
+            counters = dict(self._counters)
+            gauges = dict(self._gauges)
+        max_rss = _max_rss()
+        if max_rss is not None:
+            gauges[("vibecheck_process_max_rss_bytes", ())] = max_rss
+
+        lines = []
+        seen = set()
+
+        def header(metric):
+            if metric not in seen:
+                seen.add(metric)
+                kind, text = _HELP.get(metric, ("untyped", metric))
+                lines.append(f"# HELP {metric} {text}")
+                lines.append(f"# TYPE {metric} {kind}")
+
+        for (metric, labels), (counts, total, count) in sorted(histograms.items()):
+            header(metric)
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                le = "+Inf" if math.isinf(bound) else f"{bound:g}"
+                lines.append(f"{metric}_bucket{_labels(labels + (('le', le),))} {cumulative}")
+            lines.append(f"{metric}_sum{_labels(labels)} {total:.6f}")
+            lines.append(f"{metric}_count{_labels(labels)} {count}")
+        for (metric, labels), value in sorted(counters.items()):
+            header(metric)
+            lines.append(f"{metric}{_labels(labels)} {value}")
+        for (metric, labels), value in sorted(gauges.items()):
+            header(metric)
+            lines.append(f"{metric}{_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+
+class _StageTimer:
+    __slots__ = ("registry", "name", "start", "start_peak")
+
+    def __init__(self, registry, name):
+        self.registry = registry
+        self.name = name
+
+    def __enter__(self):
+        self.start_peak = _max_rss()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.registry.observe(STAGE_METRIC, time.perf_counter() - self.start, stage=self.name)
+        if self.start_peak is not None:
+            self.registry.high_water(RSS_METRIC, _max_rss() - self.start_peak, stage=self.name)
+        return False
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(pairs):
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+_registry = MetricsRegistry()
+
+
+def get_metrics():
+    """Return the process-wide metrics registry."""
+    return _registry
+
+
+def stage(name):
+    """Time a stage in the process-wide registry: ``with stage("welch"): ...``."""
+    return _registry.stage(name)
+
+
+def observe(metric, seconds, **labels):
+    _registry.observe(metric, seconds, **labels)
+
+
+def inc(metric, amount=1, **labels):
+    _registry.inc(metric, amount, **labels)
+
+
+def capture():
+    return _registry.capture()
+
+
+def record(captured):
+    _registry.record(captured)
+
+
+def render_prometheus():
+    return _registry.render_prometheus()
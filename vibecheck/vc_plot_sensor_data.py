@@ -1,31 +1,40 @@
 import os
 import argparse
+import base64
+import functools
 import sys
+import time
 import numpy as np
 import pandas as pd
-import tempfile
 import logging
 import shutil
+import uuid
 from pathlib import Path
 import json
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
 # -----------------------------------------------------------------------------
 # Imports – ensure your local helper + config modules are available
 # -----------------------------------------------------------------------------
 try:
-    from .vc_analyzer_endaq import analyze_endaq
+    from .vc_utils import scaled_status_callback
     from .vc_config import (
         VC_THRESHOLDS,
         COLOR_PALETTE,
         DEFAULT_DPI,          # dots‑per‑inch for pixel conversion
+        PLOT_FREQ_RANGE,
+        PLOTLYJS_ASSET_ROUTE,
+        PLOTLYJS_SIDECAR_NAME,
+        REPORT_PLOTLYJS_MODE,
+        SNAPSHOTS_ENABLED,
+        COLUMNAR_ENABLED,
     )
+    from .vc_snapshots import get_snapshot_renderer
+    from .vc_metrics import STAGE_METRIC, observe, stage
     import plotly
     import plotly.graph_objects as go
-    import plotly
+    import plotly.offline
 except ImportError as e:
     logger.error(f"❌ Import error: {e}")
     logger.error("Make sure vc_analyzer_endaq.py, vc_config.py, and the 'plotly' + 'kaleido' libs are installed.")
@@ -89,6 +98,14 @@ def safe_write_file(filepath: str, content: str) -> bool:
                 pass
         return False
 
+SENSOR_NAMES = ("25G Sensor", "40G Sensor")
+
+def sensor_name(index: int) -> str:
+    """Display name for the analyzer's ``index``-th acceleration channel."""
+    if index < len(SENSOR_NAMES):
+        return SENSOR_NAMES[index]
+    return f"Sensor {index + 1}"
+
 # Figure sizing – 10 in wide (good for US‑letter / A4 print margins)
 TARGET_WIDTH_IN = 10.0
 DPI = DEFAULT_DPI if "DEFAULT_DPI" in globals() else 96
@@ -102,57 +119,143 @@ LABEL_X_POS = 99          # place labels inside 1‑100 Hz plot range
 # Core plotting routine
 # -----------------------------------------------------------------------------
 
-def create_vc_plots_plotly(ide_path: str, html_out: str) -> bool:
-    """
-    Analyze an enDAQ .IDE file and generate interactive VC‑curve plots.
-    Returns True if successful, False otherwise.
+@functools.lru_cache(maxsize=1)
+def vc_threshold_template() -> dict:
     """
-    if not os.path.exists(ide_path):
-        logger.error(f"IDE file not found: {ide_path}")
-        return False
-
-    # If output path is a directory, place report inside it
-    if os.path.isdir(html_out):
-        html_out = os.path.join(
-            html_out,
-            f"{os.path.splitext(os.path.basename(ide_path))[0]}_vc_plots.html",
-        )
-
-    # ── 1. Extract sensor data ────────────────────────────────────────────────
-    try:
-        raw = analyze_endaq(ide_path)
-        logger.info(f"Analyzer output type: {type(raw)}")
-        if isinstance(raw, tuple):
-            for i, df in enumerate(raw):
-                logger.info(f"Sensor {i} DataFrame shape: {getattr(df, 'shape', None)}")
-                logger.info(f"Sensor {i} DataFrame head:\n{getattr(df, 'head', lambda: None)()}")
-        elif raw is not None:
-            logger.info(f"Single DataFrame shape: {getattr(raw, 'shape', None)}")
-            logger.info(f"Single DataFrame head:\n{getattr(raw, 'head', lambda: None)()}")
-    except Exception as exc:
-        logger.error(f"❌ Failed to analyse {ide_path}: {exc}")
-        return False
+    Layout shapes and annotations for the VC threshold lines.
 
-    sensors: list[dict] = []
-    if isinstance(raw, tuple):  # expected (25 G, 40 G)
-        if raw and raw[0] is not None:
-            sensors.append({"name": "25G Sensor", "df": raw[0]})
-        if len(raw) > 1 and raw[1] is not None:
-            sensors.append({"name": "40G Sensor", "df": raw[1]})
-    elif raw is not None:
-        sensors.append({"name": "25G Sensor", "df": raw})
+    They are identical on every figure, so compact reports emit them once
+    and each figure's layout is merged with them in the browser.
+    """
+    shapes, annotations = [], []
+    for vc_name, vc_val in VC_THRESHOLDS.items():
+        shapes.append(dict(
+            type="line", xref="x domain", x0=0, x1=1, yref="y", y0=vc_val, y1=vc_val,
+            line=dict(dash="dash", color=get_color(vc_name, "grey"), width=1.5),
+        ))
+        annotations.append(dict(
+            x=LABEL_X_POS,
+            y=float(np.log10(vc_val)),
+            xref="x",
+            yref="y",
+            text=f"{vc_name} ({vc_val:.3f} mm/s)",
+            showarrow=False,
+            xanchor="right",
+            yanchor="top",
+            yshift=-LABEL_YSHIFT_PX,
+            font=dict(size=10, color=get_color(vc_name, "#444")),
+            bgcolor="rgba(255,255,255,0)",
+            align="right",
+        ))
+    return {"shapes": shapes, "annotations": annotations}
+
+def envelope_columns(df, ax: str) -> dict:
+    """Percentile envelope columns of axis ``ax`` (``"X L10"``, ...) by exceedance level."""
+    prefix = f"{ax} L"
+    return {float(c[len(prefix):]): c for c in df.columns if c.startswith(prefix)}
+
+def envelope_traces(ax: str, freqs: np.ndarray, envelopes: dict) -> list:
+    """
+    Shaded band between the outermost envelope levels and lines for the others.
 
-    if not sensors:
-        logger.error("No usable sensor data found.")
-        return False
+    ``envelopes`` maps exceedance levels (``10`` for L10) to curves.
+    """
+    color = get_color(ax, "#1f77b4")
+    levels = sorted(envelopes)
+    freqs = np.asarray(freqs, dtype=float)
+    traces = []
+    if len(levels) >= 2:
+        lo, hi = levels[-1], levels[0]
+        # The upper edge fills down to the trace before it
+        traces.append(dict(type="scatter", x=freqs, y=np.asarray(envelopes[lo], dtype=float), mode="lines",
+                           line=dict(color=color, width=0), showlegend=False, hoverinfo="x+y",
+                           name=f"L{lo:g} ({ax})"))
+        traces.append(dict(type="scatter", x=freqs, y=np.asarray(envelopes[hi], dtype=float), mode="lines",
+                           line=dict(color=color, width=0), fill="tonexty", fillcolor=color + "33",
+                           hoverinfo="x+y", name=f"L{hi:g}–L{lo:g} ({ax})"))
+        levels = levels[1:-1]
+    for level in levels:
+        traces.append(dict(type="scatter", x=freqs, y=np.asarray(envelopes[level], dtype=float), mode="lines",
+                           line=dict(color=color, width=1, dash="dot"), hoverinfo="x+y",
+                           name=f"L{level:g} ({ax})"))
+    return traces
+
+def vc_figure_spec(name: str, ax: str, freqs: np.ndarray, vel_mm_s: np.ndarray, y_range_log: list,
+                   envelopes: dict = None) -> dict:
+    """
+    Plain-dict figure for one sensor axis, without the shared VC threshold
+    layout. Arrays stay numpy so they can be encoded as binary. Optional
+    percentile ``envelopes`` (see :func:`envelope_traces`) are drawn behind
+    the measured curve, which stays the first trace.
+    """
+    annotations = []
+    if vel_mm_s.size:
+        idx_peak = int(np.argmax(vel_mm_s))
+        peak_freq, peak_val = float(freqs[idx_peak]), float(vel_mm_s[idx_peak])
+        annotations.append(dict(
+            x=peak_freq,
+            y=peak_val,
+            text=f"Peak: {peak_val:.3f} mm/s @ {peak_freq:.2f} Hz",
+            showarrow=True,
+            arrowhead=2,
+            arrowsize=1,
+            arrowwidth=1.5,
+            ax=0,
+            ay=-40,
+            font=dict(size=10),
+            bordercolor="black",
+            borderwidth=0.5,
+            borderpad=2,
+            bgcolor="rgba(255,255,255,0.1)",
+        ))
+    grid = dict(showgrid=True, gridwidth=1, gridcolor="LightGray", tickfont=dict(size=18))
+    return {
+        "name": name,
+        "axis": ax,
+        "data": [dict(
+            type="scatter",
+            x=np.asarray(freqs, dtype=float),
+            y=np.asarray(vel_mm_s, dtype=float),
+            mode="lines",
+            name=f"Measured ({ax})",
+            line=dict(color=get_color(ax, "#1f77b4"), width=2, shape="spline", smoothing=0.7),
+            hoverinfo="x+y",
+        )] + (envelope_traces(ax, freqs, envelopes) if envelopes else []),
+        "layout": dict(
+            title=dict(text=f"VC Curve – {name} – {ax}-Axis", x=0.5, font=dict(size=24)),
+            width=FIGURE_WIDTH_PX,
+            xaxis=dict(title=dict(text="Frequency (Hz)"), range=list(PLOT_FREQ_RANGE),
+                       tickmode="linear", dtick=10, **grid),
+            yaxis=dict(title=dict(text="RMS Velocity (mm/s) – Log Scale"), type="log",
+                       range=[float(v) for v in y_range_log], **grid),
+            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+            plot_bgcolor="white",
+            margin=dict(l=50, r=10, b=80, t=100, pad=4),
+            font=dict(size=20),
+            annotations=annotations,
+        ),
+    }
+
+def spec_to_figure(spec: dict) -> "go.Figure":
+    """Expand a figure spec (plus the shared VC layout) into a ``go.Figure``."""
+    template = vc_threshold_template()
+    layout = dict(spec["layout"])
+    layout["shapes"] = template["shapes"] + list(layout.get("shapes", []))
+    layout["annotations"] = template["annotations"] + list(layout.get("annotations", []))
+    return go.Figure(data=spec["data"], layout=layout)
+
+def build_vc_figure_specs(sensors: list[dict], status_callback=None) -> list[dict]:
+    """
+    Build one figure spec per sensor per axis from VC-curve DataFrames.
 
-    # ── 2. Build Plotly figures ───────────────────────────────────────────────
-    figs: list[go.Figure] = []
+    ``sensors`` is a list of ``{"name": ..., "df": ...}`` dicts.
+    """
+    specs: list[dict] = []
 
     for s in sensors:
         name, df = s["name"], s["df"]
         if df is None or df.empty:
-            logger.warning(f"Skipping empty dataframe for {name}")
+            logger.warning("Skipping empty dataframe for %s", name)
             continue
 
         positives = [v for v in VC_THRESHOLDS.values() if v > 0]
@@ -160,8 +263,10 @@ def create_vc_plots_plotly(ide_path: str, html_out: str) -> bool:
             cols = [c for c in df.columns if c.startswith(ax)]
             if cols:
                 positives.extend(df[cols[0]].to_numpy())
+            for col in envelope_columns(df, ax).values():
+                positives.extend(v for v in df[col].to_numpy() if v > 0)
         if not positives:
-            logger.warning(f"No positive values found for {name}")
+            logger.warning("No positive values found for %s", name)
             continue
         ymin = max(min(positives) * 0.5, 1e-4)
         ymax = max(positives) * 1.1
@@ -174,109 +279,117 @@ def create_vc_plots_plotly(ide_path: str, html_out: str) -> bool:
             freqs = df.index.to_numpy()
             vel_mm_s = df[cols[0]].to_numpy()
             if len(freqs) == 0 or len(vel_mm_s) == 0:
-                logger.warning(f"No data points for {name} - {ax}")
+                logger.warning("No data points for %s - %s", name, ax)
                 continue
-            fig = go.Figure()
-            fig.add_trace(
-                go.Scatter(
-                    x=freqs,
-                    y=vel_mm_s,
-                    mode="lines",
-                    name=f"Measured ({ax})",
-                    line=dict(color=get_color(ax, "#1f77b4"), width=2, shape="spline", smoothing=0.7),
-                    hoverinfo="x+y",
-                )
-            )
-            for vc_name, vc_val in VC_THRESHOLDS.items():
-                fig.add_hline(y=vc_val, line_dash="dash", line_color=get_color(vc_name, "grey"), line_width=1.5)
-                fig.add_annotation(
-                    x=LABEL_X_POS,
-                    y=np.log10(vc_val),
-                    xref="x",
-                    yref="y",
-                    text=f"{vc_name} ({vc_val:.3f} mm/s)",
-                    showarrow=False,
-                    xanchor="right",
-                    yanchor="top",
-                    yshift=-LABEL_YSHIFT_PX,
-                    font=dict(size=10, color=get_color(vc_name, "#444")),
-                    bgcolor="rgba(255,255,255,0)",
-                    align="right",
-                )
-            if vel_mm_s.size:
-                idx_peak = int(np.argmax(vel_mm_s))
-                peak_freq, peak_val = freqs[idx_peak], vel_mm_s[idx_peak]
-                fig.add_annotation(
-                    x=peak_freq,
-                    y=peak_val,
-                    text=f"Peak: {peak_val:.3f} mm/s @ {peak_freq:.2f} Hz",
-                    showarrow=True,
-                    arrowhead=2,
-                    arrowsize=1,
-                    arrowwidth=1.5,
-                    ax=0,
-                    ay=-40,
-                    font=dict(size=10),
-                    bordercolor="black",
-                    borderwidth=0.5,
-                    borderpad=2,
-                    bgcolor="rgba(255,255,255,0.1)",
-                )
-            fig.update_layout(
-                title_text=f"VC Curve – {name} – {ax}-Axis",
-                title_x=0.5,
-                width=FIGURE_WIDTH_PX,
-                xaxis_title="Frequency (Hz)",
-                yaxis_title="RMS Velocity (mm/s) – Log Scale",
-                xaxis=dict(range=[1, 100], tickmode="linear", dtick=10),
-                yaxis=dict(type="log", range=y_range_log),
-                legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
-                plot_bgcolor="white",
-                margin=dict(l=50, r=10, b=80, t=100, pad=4),
-                font=dict(size=20),
-                title_font=dict(size=24),
-            )
-            fig.update_xaxes(showgrid=True, gridwidth=1, gridcolor="LightGray", tickfont=dict(size=18))
-            fig.update_yaxes(showgrid=True, gridwidth=1, gridcolor="LightGray", tickfont=dict(size=18))
-            figs.append(fig)
-
-            logger.info(f"✓ Generated figure: {name} – {ax}")
-
-            # Save a PNG snapshot for PDF reports
-            try:
-                img_dir = os.path.join(tempfile.gettempdir(), TEMP_PLOT_DIR_NAME)
-                os.makedirs(img_dir, exist_ok=True)
-                stem = os.path.splitext(os.path.basename(ide_path))[0]
-                safe_name = name.replace(" ", "_")
-                png_path = os.path.join(img_dir, f"{stem}_{safe_name}_{ax}.png")
-                fig.write_image(png_path, width=FIGURE_WIDTH_PX, height=600)
-            except Exception as e:
-                logger.warning(f"Failed to write PNG for {name}-{ax}: {e}")
-
-    if not figs:
-        logger.error("No figures were generated. Check sensor data and processing.")
-        return False
+            envelopes = {level: df[col].to_numpy() for level, col in envelope_columns(df, ax).items()}
+            specs.append(vc_figure_spec(name, ax, freqs, vel_mm_s, y_range_log, envelopes))
+
+            logger.debug("Generated figure: %s – %s", name, ax)
+            if status_callback:
+                status_callback("progress", f"Generated figure: {name} – {ax}",
+                                progress=len(specs) / (3 * len(sensors)))
+
+    return specs
+
+def build_vc_figures(sensors: list[dict], status_callback=None) -> list:
+    """Build one ``go.Figure`` per sensor per axis (see :func:`build_vc_figure_specs`)."""
+    return [spec_to_figure(spec) for spec in build_vc_figure_specs(sensors, status_callback)]
+
+def _encode_json(obj):
+    """``json.dumps`` default: numpy arrays become base64 typed arrays."""
+    if isinstance(obj, np.ndarray):
+        arr = np.ascontiguousarray(obj, dtype="<f8")
+        return {"dtype": "f8", "bdata": base64.b64encode(arr.tobytes()).decode("ascii")}
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def encode_figure_spec(spec: dict) -> str:
+    """Serialize a figure spec's data and layout compactly."""
+    return json.dumps({"data": spec["data"], "layout": spec["layout"]},
+                      default=_encode_json, separators=(",", ":"))
+
+# Decodes base64 typed arrays and merges the shared VC layout before plotting
+_REPORT_JS = """
+var VC_DTYPES = {f8: Float64Array, f4: Float32Array, i4: Int32Array, u1: Uint8Array};
+function vcDecode(v) {
+    if (v && typeof v === 'object' && !ArrayBuffer.isView(v)) {
+        if (typeof v.bdata === 'string' && VC_DTYPES[v.dtype]) {
+            var bin = atob(v.bdata), bytes = new Uint8Array(bin.length);
+            for (var i = 0; i < bin.length; i++) bytes[i] = bin.charCodeAt(i);
+            return new VC_DTYPES[v.dtype](bytes.buffer);
+        }
+        for (var k in v) v[k] = vcDecode(v[k]);
+    }
+    return v;
+}
+function vcPlot(id, fig) {
+    fig = vcDecode(fig);
+    fig.layout.shapes = VC_TEMPLATE.shapes.concat(fig.layout.shapes || []);
+    fig.layout.annotations = VC_TEMPLATE.annotations.concat(fig.layout.annotations || []);
+    Plotly.newPlot(id, fig.data, fig.layout);
+}
+"""
+
+@functools.lru_cache(maxsize=1)
+def get_plotly_js() -> str:
+    """Return the Plotly.js bundle; it is generated once per process."""
+    return plotly.offline.get_plotlyjs()
+
+def plotly_js_version() -> str:
+    """Version of the bundled Plotly.js, used to cache-bust shared assets."""
+    return plotly.offline.get_plotlyjs_version()
+
+def plotly_js_tag(mode: str = REPORT_PLOTLYJS_MODE, url: str = None, html_out: str = None) -> str:
+    """
+    Return the ``<script>`` tag that loads Plotly.js for a report.
 
-    # ── 3. Write HTML report ───────────────────────────────────────────────────
-    try:
-        # Get the embedded Plotly JS
-        plotly_js = go.Figure().to_html(include_plotlyjs=True, full_html=False)
-        plotly_js = plotly_js.split('<script type="text/javascript">')[1].split('</script>')[0]
-
-        # Generate HTML parts for each figure
-        parts = []
-        for i, fig in enumerate(figs):
-            fig_json = json.dumps(fig.to_dict(), cls=plotly.utils.PlotlyJSONEncoder)
-            parts.append(f"""
+    Modes:
+        ``"inline"``  – embed the bundle (self-contained, several MB)
+        ``"shared"``  – reference ``url`` (e.g. the Flask ``/assets`` route)
+        ``"sidecar"`` – write ``plotly.min.js`` next to ``html_out`` once and
+        reference it relatively (offline exports)
+    """
+    if mode == "inline":
+        return f'<script type="text/javascript">{get_plotly_js()}</script>'
+    if mode == "shared":
+        url = url or f"{PLOTLYJS_ASSET_ROUTE}?v={plotly_js_version()}"
+        return f'<script type="text/javascript" src="{url}"></script>'
+    if mode == "sidecar":
+        if not html_out:
+            raise ValueError("sidecar mode needs the report output path")
+        sidecar = os.path.join(os.path.dirname(os.path.abspath(html_out)), PLOTLYJS_SIDECAR_NAME)
+        js = get_plotly_js()
+        if not os.path.exists(sidecar) or os.path.getsize(sidecar) != len(js.encode("utf-8")):
+            if not safe_write_file(sidecar, js):
+                raise OSError(f"Failed to write {sidecar}")
+        return f'<script type="text/javascript" src="{PLOTLYJS_SIDECAR_NAME}?v={plotly_js_version()}"></script>'
+    raise ValueError(f"Unknown Plotly.js mode: {mode}")
+
+def render_report_html(specs: list, title: str, plotly_js: str = REPORT_PLOTLYJS_MODE,
+                       plotly_js_url: str = None, html_out: str = None) -> str:
+    """
+    Render figure specs into the report HTML, loading Plotly.js per ``plotly_js`` mode.
+    The VC threshold layout is written once and arrays are sent as base64.
+    """
+    tag = plotly_js_tag(plotly_js, url=plotly_js_url, html_out=html_out)
+    template_json = json.dumps(vc_threshold_template(), separators=(",", ":"))
+
+    # Generate HTML parts for each figure
+    parts = []
+    serialize_seconds = 0.0
+    for i, spec in enumerate(specs):
+        start = time.perf_counter()
+        encoded = encode_figure_spec(spec)
+        serialize_seconds += time.perf_counter() - start
+        parts.append(f"""
             <div id="plot{i}" style="width:100%;height:600px;"></div>
-            <script type="text/javascript">
-                var plot{i} = {fig_json};
-                Plotly.newPlot('plot{i}', plot{i}.data, plot{i}.layout);
-            </script>
+            <script type="text/javascript">vcPlot('plot{i}', {encoded});</script>
             """)
+    observe(STAGE_METRIC, serialize_seconds, stage="json_serialize")
 
-        # Combine everything into the final HTML
-        html = f"""
+    # Combine everything into the final HTML
+    html = f"""
 <!DOCTYPE html>
 <html lang="en">
 <head>
@@ -308,42 +421,171 @@ def create_vc_plots_plotly(ide_path: str, html_out: str) -> bool:
             box-shadow: 0 2px 5px rgba(0,0,0,0.1);
         }}
     </style>
+    {tag}
     <script type="text/javascript">
-        {plotly_js}
-
+        var VC_TEMPLATE = {template_json};
+        {_REPORT_JS}
     </script>
 </head>
 <body>
     <div class="container">
-    <h1>Vibration Analysis Report – {os.path.basename(ide_path)}</h1>
+    <h1>Vibration Analysis Report – {title}</h1>
     {''.join(parts)}
     </div>
 </body>
 </html>"""
 
-        # Safely write the file
-        if not safe_write_file(html_out, html):
-            logger.error(f"Failed to write HTML report to {html_out}")
-            return False
+    return html
 
-        logger.info(f"HTML Report saved to: {html_out}")
-        return True
+def build_vc_report(ide_source, name: str, status_callback=None, plotly_js: str = REPORT_PLOTLYJS_MODE,
+                    plotly_js_url: str = None, html_out: str = None, selection: dict = None,
+                    envelopes: bool = False, columnar: bool = COLUMNAR_ENABLED, remember: bool = True):
+    """
+    Analyze an IDE file and return the VC‑curve report as an HTML string.
+
+    ``ide_source`` is a path or the file's contents as bytes (an upload held
+    in memory); ``name`` is the file name shown in the report and used for
+    the PNG snapshots. ``html_out`` is only needed for the ``"sidecar"``
+    Plotly.js mode. ``selection`` holds ``analyze_endaq``'s ``start``,
+    ``end``, ``axes`` and ``channels`` arguments. With ``envelopes`` the
+    percentile envelopes across time windows are drawn as shaded bands.
+    ``columnar`` and ``remember`` are passed on to ``analyze_endaq``;
+    callers reading a one-off temporary copy (uploads) turn both off, since
+    its sidecar and its cached path hash would never be used again.
+    Returns None if the report could not be generated.
+    """
+    def report(message, progress):
+        if status_callback:
+            status_callback("progress", message, progress=progress)
+
+    # ── 1. Extract sensor data ────────────────────────────────────────────────
+    from .vc_analyzer_endaq import analyze_endaq  # loads endaq/scipy on first use
+    try:
+        with stage("analyze"):
+            raw = analyze_endaq(ide_source, status_callback=scaled_status_callback(status_callback, 0.0, 0.8),
+                                envelopes=envelopes, columnar=columnar, remember=remember,
+                                **(selection or {}))
+        # Rendering DataFrames is costly: only when someone is reading DEBUG
+        if logger.isEnabledFor(logging.DEBUG):
+            for i, df in enumerate(raw if isinstance(raw, tuple) else (raw,)):
+                logger.debug("Sensor %d DataFrame shape: %s\n%s", i, getattr(df, 'shape', None),
+                             getattr(df, 'head', lambda: None)())
+    except Exception as exc:
+        logger.error(f"❌ Failed to analyse {name}: {exc}")
+        return None
 
+    sensors: list[dict] = []
+    frames = raw if isinstance(raw, tuple) else (raw,)  # expected (25 G, 40 G, ...)
+    for i, df in enumerate(frames):
+        if df is not None:
+            sensors.append({"name": sensor_name(i), "df": df})
+
+    if not sensors:
+        logger.error("No usable sensor data found.")
+        return None
+
+    # ── 2. Build Plotly figures ───────────────────────────────────────────────
+    with stage("figure_build"):
+        specs = build_vc_figure_specs(sensors, scaled_status_callback(status_callback, 0.8, 0.95))
+
+    if not specs:
+        logger.error("No figures were generated. Check sensor data and processing.")
+        return None
+
+    # PNG snapshots for the PDF path render in the background (whole recordings only)
+    if SNAPSHOTS_ENABLED and not selection:
+        in_memory = isinstance(ide_source, (bytes, bytearray, memoryview))
+        if in_memory:
+            # An upload's name is not a path: key its batch by this report alone
+            get_snapshot_renderer().submit(specs, name, key=f"upload:{uuid.uuid4().hex}")
+        else:
+            get_snapshot_renderer().submit(specs, ide_source)
+
+    # ── 3. Render HTML report ─────────────────────────────────────────────────
+    report("Writing HTML report", 0.95)
+    try:
+        with stage("html_render"):
+            return render_report_html(specs, name, plotly_js, plotly_js_url, html_out)
     except Exception as e:
         logger.error(f"Failed to generate HTML report: {e}")
+        return None
+
+def create_vc_plots_plotly(ide_path: str, html_out: str, status_callback=None,
+                           plotly_js: str = REPORT_PLOTLYJS_MODE, plotly_js_url: str = None,
+                           selection: dict = None, envelopes: bool = False,
+                           columnar: bool = COLUMNAR_ENABLED, remember: bool = True) -> bool:
+    """
+    Analyze an enDAQ .IDE file and generate interactive VC‑curve plots.
+    ``status_callback`` (see ``vc_utils._default_status_callback``) receives
+    progress updates; if it raises, the report is abandoned. ``plotly_js``
+    selects how the report loads Plotly.js (see :func:`plotly_js_tag`).
+    ``selection`` restricts the analysis, ``envelopes`` adds percentile
+    bands, and ``columnar`` and ``remember`` are for temporary copies (see
+    :func:`build_vc_report`).
+    Returns True if successful, False otherwise.
+    """
+    if not os.path.exists(ide_path):
+        logger.error(f"IDE file not found: {ide_path}")
         return False
 
+    # If output path is a directory, place report inside it
+    if os.path.isdir(html_out):
+        html_out = os.path.join(
+            html_out,
+            f"{os.path.splitext(os.path.basename(ide_path))[0]}_vc_plots.html",
+        )
+
+    html = build_vc_report(ide_path, os.path.basename(ide_path), status_callback, plotly_js,
+                           plotly_js_url, html_out, selection, envelopes, columnar, remember)
+    if html is None:
+        return False
+
+    # Safely write the file
+    with stage("html_write"):
+        written = safe_write_file(html_out, html)
+    if not written:
+        logger.error(f"Failed to write HTML report to {html_out}")
+        return False
+
+    logger.info(f"HTML Report saved to: {html_out}")
+    if status_callback:
+        status_callback("progress", "Report complete", progress=1.0)
+    return True
+
 # -----------------------------------------------------------------------------
 # CLI wrapper
 # -----------------------------------------------------------------------------
 
 if __name__ == "__main__":
+    from .vc_logging import configure_logging
+    configure_logging()
     parser = argparse.ArgumentParser(description="Generate VC‑curve plots from an enDAQ .IDE file.")
-    parser.add_argument("ide_file", help="Path to the .IDE input file")
-    parser.add_argument("-o", "--output", help="Output HTML path (default: next to IDE)")
+    parser.add_argument("ide_file", nargs="+",
+                        help="Path to the .IDE input file (several files or a directory run a batch)")
+    parser.add_argument("-o", "--output", help="Output HTML path, or output directory for a batch (default: next to IDE)")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="Worker processes for batch runs")
+    parser.add_argument("--start", help="Analyse from this time: seconds from the start of the recording, or MM:SS")
+    parser.add_argument("--end", help="Analyse up to this time (as --start)")
+    parser.add_argument("--axes", help="Axes to analyse, e.g. Z or X,Y (default: all)")
+    parser.add_argument("--channels", help="Channels to analyse, by id or name, e.g. 25g (default: all)")
+    parser.add_argument("--envelopes", action="store_true",
+                        help="Shade the L10–L90 percentile band across time windows")
     args = parser.parse_args()
-
-    if not os.path.isfile(args.ide_file):
+    selection = {k: v for k, v in (("start", args.start), ("end", args.end), ("axes", args.axes),
+                                   ("channels", args.channels)) if v}
+
+    # Several inputs or a directory: hand over to the batch runner
+    if len(args.ide_file) > 1 or os.path.isdir(args.ide_file[0]):
+        if selection:
+            parser.error("--start, --end, --axes and --channels apply to a single file")
+        from .vc_batch import main as batch_main
+        batch_args = list(args.ide_file) + ["-o", args.output or "vibecheck_batch"]
+        if args.workers:
+            batch_args += ["-j", str(args.workers)]
+        sys.exit(batch_main(batch_args))
+
+    ide_file = args.ide_file[0]
+    if not os.path.isfile(ide_file):
         print("IDE file not found", file=sys.stderr)
         sys.exit(1)
 
@@ -351,10 +593,17 @@ if __name__ == "__main__":
     if args.output:
         html_out = args.output
     else:
-        html_out = os.path.splitext(args.ide_file)[0] + "_report.html"
+        html_out = os.path.splitext(ide_file)[0] + "_report.html"
 
     # Generate report
-    if create_vc_plots_plotly(args.ide_file, html_out):
+    if selection:
+        from .vc_analyzer_endaq import analysis_selection
+        try:
+            analysis_selection(**selection)
+        except ValueError as e:
+            parser.error(str(e))
+
+    if create_vc_plots_plotly(ide_file, html_out, selection=selection, envelopes=args.envelopes):
         print(f"Report generated successfully: {html_out}")
         sys.exit(0)
     else:
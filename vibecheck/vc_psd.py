@@ -0,0 +1,602 @@
+# vc_psd.py
+# Description: Block-based PSD computation for large recordings.
+
+"""
+Streaming Welch PSD for VibeCheck Pro.
+
+``endaq.calc.psd.welch`` needs the whole channel as a DataFrame, which for
+multi-hour recordings means gigabytes of timestamps and samples in memory.
+The :class:`WelchAccumulator` here consumes a channel in fixed-size blocks
+and keeps only the running sum of segment periodograms plus the unprocessed
+tail, so memory is bounded by one Welch segment plus one block regardless of
+recording length. With the same parameters (Hann window, 50 % overlap,
+constant detrend, density scaling) it reproduces ``scipy.signal.welch``,
+and therefore ``endaq.calc.psd.welch``, to floating-point rounding.
+
+Channel data is accessed through small reader objects exposing
+``columns``, ``n_samples``, ``sample_rate``, ``iter_blocks()`` and
+``to_dataframe()``, so the same code path serves IDE files and in-memory
+arrays.
+"""
+
+import collections
+import time
+
+import numpy as np
+import pandas as pd
+import scipy.fft
+import scipy.signal
+
+from .vc_config import CHUNK_SIZE, DECIMATION_ATTENUATION_DB, MAX_DATA_POINTS
+from .vc_fftplans import get_plan_cache
+from .vc_metrics import STAGE_METRIC, observe, stage
+
+# Working memory budget for one batch of windowed segments and their FFTs
+SEGMENT_BATCH_BYTES = 8 * CHUNK_SIZE
+
+
+def block_rows_for(n_columns, chunk_bytes=CHUNK_SIZE):
+    """Number of float64 rows (timestamp + axes) that fit in one chunk."""
+    return max(1, chunk_bytes // (8 * (n_columns + 1)))
+
+
+def _us_to_ns(t_us):
+    """Microsecond sample time as the integer nanoseconds ``to_pandas`` would use."""
+    return int(np.int64(1e3 * t_us))
+
+
+def _sample_rate_from_ns(first_ns, last_ns, n_samples):
+    """Sample rate matching ``endaq.calc.utils.sample_spacing`` on a nanosecond index."""
+    if n_samples < 2:
+        raise ValueError("Channel has too few samples for a PSD")
+    dt = pd.Timedelta(int(last_ns - first_ns), unit="ns") / (n_samples - 1)
+    return 1.0 / (dt / np.timedelta64(1, "s"))
+
+
+def _adjust_index_after(reader, index, t_ns):
+    """Move an approximate index to the first sample later than ``t_ns``."""
+    index = min(max(index, 0), reader.n_samples)
+    while index < reader.n_samples and reader.timestamp_ns(index) <= t_ns:
+        index += 1
+    while index > 0 and reader.timestamp_ns(index - 1) > t_ns:
+        index -= 1
+    return index
+
+
+def _bisect_index_after(reader, t_ns):
+    """Index of the first sample later than ``t_ns``, by binary search on ``timestamp_ns``."""
+    lo, hi = 0, reader.n_samples
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if reader.timestamp_ns(mid) <= t_ns:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+
+def select_columns(columns, wanted):
+    """
+    Resolve a column selection against a channel's column names.
+
+    Args:
+        columns (list[str]): Column names, e.g. ``["X (25g)", "Y (25g)", "Z (25g)"]``
+        wanted (list[str]): Full names or axis letters (``"Z"``); None for all
+
+    Returns:
+        list[int]: Indices of the selected columns, in channel order
+    """
+    if wanted is None:
+        return list(range(len(columns)))
+    wanted = {w.upper() for w in wanted}
+    return [i for i, c in enumerate(columns) if c.upper() in wanted or c.split()[0].upper() in wanted]
+
+
+class IDEChannelReader:
+    """
+    Reader over an ``idelib`` channel that decodes samples block by block.
+
+    Args:
+        channel: An acceleration channel from ``endaq.ide.get_channels``
+        start_ns (int): Skip samples before this time (nanoseconds); None for the start
+        end_ns (int): Skip samples after this time (nanoseconds); None for the end
+        columns (list[str]): Axes to return (see :func:`select_columns`); None for all.
+            Samples of all axes are interleaved in the file, so every axis is
+            still decoded.
+    """
+
+    def __init__(self, channel, start_ns=None, end_ns=None, columns=None):
+        self.channel = channel
+        self.session = channel.getSession()
+        self.name = channel.name
+        if hasattr(channel, "subchannels"):
+            all_columns = [sch.name for sch in channel.subchannels]
+        else:
+            all_columns = [channel.name]
+        self._axes = select_columns(all_columns, columns)
+        if not self._axes:
+            raise ValueError(f"No column of {self.name} matches {columns}")
+        self.columns = [all_columns[i] for i in self._axes]
+        self._first = 0
+        self.n_samples = len(self.session)
+        if start_ns is not None or end_ns is not None:
+            first = 0 if start_ns is None else self.index_after(start_ns - 1)
+            last = self.n_samples if end_ns is None else self.index_after(end_ns)
+            self._first, self.n_samples = first, max(0, last - first)
+        self._sample_rate = None
+
+    @property
+    def sample_rate(self):
+        """Mean sample rate (Hz), computed the same way as ``endaq.calc.utils.sample_spacing``."""
+        if self._sample_rate is None:
+            self._sample_rate = _sample_rate_from_ns(
+                self.timestamp_ns(0), self.timestamp_ns(self.n_samples - 1), self.n_samples)
+        return self._sample_rate
+
+    def timestamp_ns(self, index):
+        """Time of sample ``index`` in integer nanoseconds."""
+        # to_pandas truncates the microsecond times to integer nanoseconds
+        i = self._first + index
+        return _us_to_ns(self.session.arraySlice(i, i + 1)[0, 0])
+
+    def index_after(self, t_ns):
+        """Index of the first sample later than ``t_ns``."""
+        try:
+            index = self.session.getRangeIndices(t_ns / 1e3, None)[0] - self._first
+        except IndexError:
+            # idelib fails for times in the last block of a partly read session
+            return _bisect_index_after(self, t_ns)
+        return _adjust_index_after(self, index, t_ns)
+
+    def iter_blocks(self, block_rows=None, start=0, stop=None):
+        """Yield ``(rows, axes)`` float64 arrays covering samples ``start:stop``."""
+        block_rows = block_rows or block_rows_for(len(self.columns))
+        stop = self.n_samples if stop is None else min(stop, self.n_samples)
+        rows = [i + 1 for i in self._axes]
+        for i in range(start + self._first, stop + self._first, block_rows):
+            data = self.session.arraySlice(i, min(i + block_rows, stop + self._first))
+            yield data[rows].T
+
+    def to_dataframe(self):
+        """Load the channel (or its selected range and axes) as a DataFrame (in-memory path)."""
+        import endaq
+        df = endaq.ide.to_pandas(self.channel)
+        if self._first or self.n_samples < len(df):
+            df = df.iloc[self._first:self._first + self.n_samples]
+        if len(self.columns) < df.shape[1]:
+            df = df[self.columns]
+        return df
+
+
+class ArrayChannelReader:
+    """
+    Reader over samples already held in memory.
+
+    Args:
+        data (numpy.ndarray): Samples with shape ``(n_samples, n_axes)``
+        sample_rate (float): Sample rate in Hz
+        columns (list[str]): Axis names, e.g. ``["X (25g)", "Y (25g)", "Z (25g)"]``
+        name (str): Channel name
+    """
+
+    def __init__(self, data, sample_rate, columns, name="Array"):
+        self.data = np.asarray(data, dtype=float)
+        if self.data.ndim == 1:
+            self.data = self.data[:, np.newaxis]
+        self.columns = list(columns)
+        self.name = name
+        self.n_samples = len(self.data)
+        self._ns_per_sample = 1e9 / float(sample_rate)
+        # Report the rate implied by the nanosecond index, as endaq would see it
+        last_ns = int(np.round((self.n_samples - 1) * self._ns_per_sample))
+        self.sample_rate = _sample_rate_from_ns(0, last_ns, self.n_samples)
+
+    def open(self):
+        """In-memory readers are their own channel source."""
+        return self
+
+    def timestamp_ns(self, index):
+        return int(np.round(index * self._ns_per_sample))
+
+    def index_after(self, t_ns):
+        return _adjust_index_after(self, int(t_ns / self._ns_per_sample), t_ns)
+
+    def iter_blocks(self, block_rows=None, start=0, stop=None):
+        block_rows = block_rows or block_rows_for(len(self.columns))
+        stop = self.n_samples if stop is None else min(stop, self.n_samples)
+        for i in range(start, stop, block_rows):
+            yield self.data[i:min(i + block_rows, stop)]
+
+    def to_dataframe(self):
+        t_ns = np.round(np.arange(self.n_samples) * self._ns_per_sample).astype("int64")
+        t = pd.to_timedelta(t_ns, unit="ns")
+        return pd.DataFrame(self.data, index=pd.Index(t, name="timestamp"), columns=self.columns)
+
+
+def segment_power(segments, window):
+    """Periodograms (unscaled) of ``(..., nperseg)`` segments: detrended, windowed, one batched FFT."""
+    x = segments - segments.mean(axis=-1, keepdims=True)
+    x *= window
+    spec = scipy.fft.rfft(x, axis=-1)
+    return spec.real ** 2 + spec.imag ** 2
+
+
+def welch_density(mean_power, sample_rate, window_power, nperseg, axis=0):
+    """
+    Scale mean segment periodograms to a one-sided PSD (density), as ``scipy.signal.welch``.
+
+    Args:
+        mean_power (numpy.ndarray): Mean of :func:`segment_power` over the segments
+        axis (int): Frequency axis of ``mean_power``
+    """
+    psd = np.moveaxis(mean_power * (1.0 / (sample_rate * window_power)), axis, 0)
+    if nperseg % 2:
+        psd[1:] *= 2
+    else:
+        psd[1:-1] *= 2
+    return np.moveaxis(psd, 0, axis)
+
+
+class WelchAccumulator:
+    """
+    Incremental Welch PSD estimate with bounded memory.
+
+    Args:
+        sample_rate (float): Sample rate in Hz
+        bin_width (float): Desired frequency resolution in Hz
+        n_axes (int): Number of axes (columns) in each block
+        window (str): Window name understood by ``scipy.signal.get_window``
+    """
+
+    def __init__(self, sample_rate, bin_width, n_axes, window="hann"):
+        self.sample_rate = float(sample_rate)
+        self.bin_width = bin_width
+        self.window_name = window
+        self.nperseg = int(self.sample_rate / bin_width)
+        if self.nperseg < 2:
+            raise ValueError("bin_width is too coarse for the sample rate")
+        self.step = self.nperseg - self.nperseg // 2
+        self.n_axes = n_axes
+        # Window and FFT plan are shared by all accumulators with this segment length
+        plan = get_plan_cache().welch_plan(self.nperseg, window)
+        self.window = plan.window
+        self.window_power = plan.window_power
+        self.freqs = np.fft.rfftfreq(self.nperseg, 1.0 / self.sample_rate)
+        self.segment_sum = np.zeros((len(self.freqs), n_axes))
+        self.segment_count = 0
+        self.samples_seen = 0
+        self._pending = []
+        self._pending_rows = 0
+        # Complex FFT output dominates: 16 bytes per bin per axis per segment
+        self._batch = max(1, SEGMENT_BATCH_BYTES // (16 * n_axes * self.nperseg))
+
+    def update(self, block):
+        """Consume a ``(rows, axes)`` block of samples."""
+        block = np.asarray(block, dtype=float)
+        if block.ndim == 1:
+            block = block[:, np.newaxis]
+        if not len(block):
+            return
+        self.samples_seen += len(block)
+        self._pending.append(block)
+        self._pending_rows += len(block)
+        if self._pending_rows < self.nperseg:
+            return
+
+        buf = np.concatenate(self._pending, axis=0) if len(self._pending) > 1 else self._pending[0]
+        n_seg = (len(buf) - self.nperseg) // self.step + 1
+        segments = np.lib.stride_tricks.sliding_window_view(buf, self.nperseg, axis=0)[::self.step]
+        for i in range(0, n_seg, self._batch):
+            self._add_segments(segments[i:i + self._batch])
+
+        tail = buf[n_seg * self.step:]
+        # Copy so the (possibly large) concatenated buffer can be released
+        self._pending = [tail.copy()] if len(tail) else []
+        self._pending_rows = len(tail)
+
+    def _segment_power(self, segments):
+        return segment_power(segments, self.window)
+
+    def _add_segments(self, segments):
+        # segments: (n_seg, axes, nperseg)
+        self.segment_sum += self._segment_power(segments).sum(axis=0).T
+        self.segment_count += len(segments)
+
+    def psd(self):
+        """Return the averaged one-sided PSD (density scaling) as an array."""
+        if self.segment_count == 0:
+            raise ValueError("Not enough samples for a single Welch segment")
+        return welch_density(self.segment_sum / self.segment_count, self.sample_rate, self.window_power,
+                             self.nperseg)
+
+    def set_sample_rate(self, sample_rate):
+        """
+        Adopt a refined mean sample rate, e.g. after more samples were appended.
+
+        The rate only enters the PSD scaling and frequencies, unless it moves
+        the segment length; then the accumulated segments no longer apply.
+
+        Returns:
+            bool: False (and nothing changed) if the segment length would differ
+        """
+        sample_rate = float(sample_rate)
+        if int(sample_rate / self.bin_width) != self.nperseg:
+            return False
+        self.sample_rate = sample_rate
+        self.freqs = np.fft.rfftfreq(self.nperseg, 1.0 / sample_rate)
+        return True
+
+    def get_state(self):
+        """Everything needed to resume accumulation later (see :meth:`from_state`)."""
+        if self._pending:
+            pending = np.concatenate(self._pending, axis=0)
+        else:
+            pending = np.empty((0, self.n_axes))
+        return {
+            "sample_rate": self.sample_rate,
+            "bin_width": self.bin_width,
+            "window": self.window_name,
+            "segment_sum": self.segment_sum.copy(),
+            "segment_count": self.segment_count,
+            "samples_seen": self.samples_seen,
+            "pending": pending,
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        """Recreate an accumulator from :meth:`get_state` output."""
+        segment_sum = np.array(state["segment_sum"], dtype=float)
+        acc = cls(state["sample_rate"], state["bin_width"], segment_sum.shape[1], state["window"])
+        acc.segment_sum = segment_sum
+        acc.segment_count = int(state["segment_count"])
+        acc.samples_seen = int(state["samples_seen"])
+        pending = np.asarray(state["pending"], dtype=float)
+        acc._pending = [pending] if len(pending) else []
+        acc._pending_rows = len(pending)
+        return acc
+
+    def to_dataframe(self, columns):
+        """Return the PSD in the same layout as ``endaq.calc.psd.welch``."""
+        return pd.DataFrame(
+            self.psd(),
+            index=pd.Series(self.freqs, name="frequency (Hz)"),
+            columns=columns,
+        )
+
+
+class SlidingWelchAccumulator(WelchAccumulator):
+    """
+    Welch PSD over only the most recent ``max_segments`` segments.
+
+    Each segment's periodogram is kept in a ring buffer so the oldest can be
+    subtracted as new ones arrive; memory is bounded by the window length.
+
+    Args:
+        sample_rate (float): Sample rate in Hz
+        bin_width (float): Desired frequency resolution in Hz
+        n_axes (int): Number of axes (columns) in each block
+        max_segments (int): Segments in the sliding window
+    """
+
+    def __init__(self, sample_rate, bin_width, n_axes, max_segments, window="hann"):
+        super().__init__(sample_rate, bin_width, n_axes, window)
+        self.max_segments = max(1, int(max_segments))
+        self.total_segments = 0
+        self._ring = collections.deque()
+        self._since_resum = 0
+
+    @classmethod
+    def for_window(cls, sample_rate, bin_width, n_axes, window_seconds, window="hann"):
+        """Accumulator whose segments span about ``window_seconds`` of data."""
+        acc = cls(sample_rate, bin_width, n_axes, 1, window)
+        segments = (window_seconds * acc.sample_rate - acc.nperseg) // acc.step + 1
+        acc.max_segments = max(1, int(segments))
+        return acc
+
+    def _add_segments(self, segments):
+        for power in self._segment_power(segments):
+            power = power.T
+            self._ring.append(power)
+            self.segment_sum += power
+            self.total_segments += 1
+            if len(self._ring) > self.max_segments:
+                self.segment_sum -= self._ring.popleft()
+                self._since_resum += 1
+        # Re-sum now and then so add/subtract rounding cannot accumulate
+        if self._since_resum >= self.max_segments:
+            self.segment_sum = np.sum(self._ring, axis=0)
+            self._since_resum = 0
+        self.segment_count = len(self._ring)
+
+    def window_samples(self):
+        """``(start, stop)`` sample indices covered by the current window."""
+        first = self.total_segments - len(self._ring)
+        return first * self.step, (self.total_segments - 1) * self.step + self.nperseg
+
+
+def decimation_factor(sample_rate, band_hz, bin_width=None, guard=1.25):
+    """
+    Largest integer factor keeping ``band_hz`` clear of aliasing.
+
+    After decimation by ``q`` anything above ``sample_rate / q - band_hz``
+    folds into the band, so the output rate must exceed ``2 * band_hz``;
+    ``guard`` leaves a transition band of ``2 * (guard - 1) * band_hz``
+    for the anti-aliasing filter. With ``bin_width``, ``q`` also divides the
+    Welch segment length, so the decimated PSD has the same frequency grid.
+    """
+    q = max(1, int(sample_rate // (2 * guard * band_hz)))
+    if bin_width:
+        nperseg = int(sample_rate / bin_width)
+        while nperseg % q:
+            q -= 1
+    return q
+
+
+class Decimator:
+    """
+    Streaming anti-aliased polyphase decimation.
+
+    A Kaiser-window FIR low-pass passes ``0..band_hz`` and attenuates
+    everything that would alias into it by ``attenuation_db``; only every
+    ``q``-th output is computed (``scipy.signal.upfirdn``). The output is
+    aligned with the input (filter delay removed, zero padding at both
+    ends), so output sample ``j`` corresponds to input sample ``j * q``.
+
+    Args:
+        sample_rate (float): Input sample rate in Hz
+        band_hz (float): Highest frequency that must be preserved
+        n_axes (int): Number of axes (columns) in each block
+        q (int): Decimation factor (default :func:`decimation_factor`)
+        attenuation_db (float): Stop-band attenuation of the filter
+    """
+
+    def __init__(self, sample_rate, band_hz, n_axes, q=None, attenuation_db=DECIMATION_ATTENUATION_DB):
+        self.q = q or decimation_factor(sample_rate, band_hz)
+        self.sample_rate = sample_rate / self.q
+        self.n_axes = n_axes
+        if self.q > 1:
+            self.taps = get_plan_cache().decimation_taps(sample_rate, band_hz, self.q, attenuation_db)
+        else:
+            self.taps = np.ones(1)
+        self.delay = (len(self.taps) - 1) // 2
+        # Buffer start (absolute input index) is kept congruent to the delay
+        # modulo q, so upfirdn's outputs land on multiples of q
+        self._start = self.delay % self.q - (self.q if self.delay % self.q else 0)
+        self._buf = np.zeros((-self._start, n_axes))
+        self._next = 0
+        self.samples_in = 0
+
+    def _emit(self, last_output):
+        """Outputs ``self._next .. last_output`` from the buffered input."""
+        if last_output < self._next:
+            return np.empty((0, self.n_axes))
+        y = scipy.signal.upfirdn(self.taps, self._buf, 1, self.q, axis=0)
+        first = (self._next * self.q + self.delay - self._start) // self.q
+        out = y[first:first + last_output - self._next + 1]
+        self._next = last_output + 1
+        # Keep only the history the next output needs
+        keep_from = self._next * self.q - self.delay
+        keep_from -= (keep_from - self._start) % self.q
+        if keep_from > self._start:
+            self._buf = self._buf[keep_from - self._start:].copy()
+            self._start = keep_from
+        return out
+
+    def process(self, block):
+        """Consume a ``(rows, axes)`` block; return the outputs now complete."""
+        block = np.asarray(block, dtype=float)
+        if block.ndim == 1:
+            block = block[:, np.newaxis]
+        if self.q == 1:
+            self.samples_in += len(block)
+            return block
+        self._buf = np.concatenate([self._buf, block], axis=0)
+        self.samples_in += len(block)
+        # Output j needs input up to j * q + delay
+        return self._emit((self.samples_in - 1 - self.delay) // self.q)
+
+    def flush(self):
+        """Return the remaining outputs, treating the input as zero past its end."""
+        if self.q == 1 or not self.samples_in:
+            return np.empty((0, self.n_axes))
+        self._buf = np.concatenate([self._buf, np.zeros((self.delay + self.q, self.n_axes))], axis=0)
+        return self._emit((self.samples_in - 1) // self.q)
+
+    def output_length(self, n_samples):
+        """Number of outputs produced for ``n_samples`` of input."""
+        return -(-n_samples // self.q)
+
+
+class DecimatedReader:
+    """
+    Channel reader yielding another reader's samples decimated to a band.
+
+    Args:
+        reader: Channel reader (see module docstring)
+        band_hz (float): Highest frequency that must be preserved
+        bin_width (float): Welch resolution the output will be analysed at,
+            so the factor keeps the PSD frequency grid unchanged
+    """
+
+    def __init__(self, reader, band_hz, bin_width=None, attenuation_db=DECIMATION_ATTENUATION_DB):
+        self.reader = reader
+        self.band_hz = band_hz
+        self.attenuation_db = attenuation_db
+        self.columns = reader.columns
+        self.name = reader.name
+        self.q = decimation_factor(reader.sample_rate, band_hz, bin_width)
+        self.sample_rate = reader.sample_rate / self.q
+        self.n_samples = -(-reader.n_samples // self.q)
+
+    def open(self):
+        return self
+
+    def iter_blocks(self, block_rows=None):
+        """Yield decimated ``(rows, axes)`` blocks of the whole channel."""
+        decimator = Decimator(self.reader.sample_rate, self.band_hz, len(self.columns), self.q,
+                              self.attenuation_db)
+        for block in self.reader.iter_blocks(block_rows):
+            out = decimator.process(block)
+            if len(out):
+                yield out
+        out = decimator.flush()
+        if len(out):
+            yield out
+
+    def to_dataframe(self):
+        data = np.concatenate(list(self.iter_blocks()), axis=0)
+        t = pd.to_timedelta(np.arange(len(data)) / self.sample_rate, unit="s")
+        return pd.DataFrame(data, index=pd.Index(t, name="timestamp"), columns=self.columns)
+
+
+def welch_streaming(reader, bin_width, block_rows=None):
+    """
+    Compute a Welch PSD by streaming a channel reader block by block.
+
+    Args:
+        reader: Channel reader (see module docstring)
+        bin_width (float): Frequency resolution in Hz
+        block_rows (int): Samples decoded per block; defaults from ``CHUNK_SIZE``
+
+    Returns:
+        pandas.DataFrame: PSD indexed by frequency, one column per axis
+    """
+    acc = WelchAccumulator(reader.sample_rate, bin_width, len(reader.columns))
+    # Reading (decoding) blocks and the Welch arithmetic are timed separately
+    read_seconds = welch_seconds = 0.0
+    blocks = iter(reader.iter_blocks(block_rows))
+    while True:
+        start = time.perf_counter()
+        block = next(blocks, None)
+        mid = time.perf_counter()
+        read_seconds += mid - start
+        if block is None:
+            break
+        acc.update(block)
+        welch_seconds += time.perf_counter() - mid
+    observe(STAGE_METRIC, read_seconds, stage="ide_decode")
+    observe(STAGE_METRIC, welch_seconds, stage="welch")
+    return acc.to_dataframe(reader.columns)
+
+
+def channel_psd(reader, bin_width, max_points=MAX_DATA_POINTS):
+    """
+    Compute a channel's PSD, streaming it when it exceeds ``max_points`` samples.
+
+    Both paths use :class:`WelchAccumulator` and so the cached window and
+    FFT plan (``vc_fftplans``): small channels are read as a single block,
+    larger ones block by block (:func:`welch_streaming`). The result matches
+    ``endaq.calc.psd.welch`` on the channel's DataFrame. Channels shorter than
+    one segment (e.g. a short time window) still go through ``endaq``, where
+    scipy shortens the segment to the data.
+    """
+    if reader.n_samples > max_points:
+        return welch_streaming(reader, bin_width)
+    if reader.n_samples >= int(reader.sample_rate / bin_width):
+        # One read and one pass, without building the timestamp index of to_pandas
+        return welch_streaming(reader, bin_width, block_rows=reader.n_samples)
+    import endaq
+    with stage("to_pandas"):
+        df = reader.to_dataframe()
+    with stage("welch"):
+        return endaq.calc.psd.welch(df, bin_width=bin_width)
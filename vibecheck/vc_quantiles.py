@@ -0,0 +1,96 @@
+# vc_quantiles.py
+# Description: Constant-memory streaming quantile sketches for arrays of values.
+
+"""
+Streaming quantiles with bounded relative error.
+
+Percentile envelopes (L10/L50/L90) of the VC curves need quantiles of the
+per-window level of every band and axis over a whole recording. Keeping
+every window's curves grows with the recording; :class:`QuantileSketch`
+instead counts each value in a logarithmic bucket (as DDSketch does):
+bucket ``i`` holds values in ``(gamma^(i-1), gamma^i]`` with
+``gamma = (1 + a) / (1 - a)``, and a quantile is reported as the bucket's
+midpoint ``2 gamma^i / (gamma + 1)``, within relative error ``a`` of the
+exact order statistic.
+
+A sketch holds one histogram per cell of ``shape`` (e.g. bands × axes)
+over the fixed range ``[min_value, max_value]``, so its memory depends on
+the accuracy and range only, never on the number of values. Values outside
+the range are clamped to it; NaNs are ignored. Sketches over the same cells
+are merged by adding their counts.
+"""
+
+import numpy as np
+
+from .vc_config import ENVELOPE_SKETCH_ACCURACY
+
+
+class QuantileSketch:
+    """
+    Log-bucket quantile sketch for every cell of an array.
+
+    Args:
+        shape (tuple[int]): Shape of one observation, e.g. ``(bands, axes)``
+        relative_accuracy (float): Relative error bound ``a`` of the quantiles
+        min_value (float): Smallest value resolved; smaller values (and zeros)
+            count as this
+        max_value (float): Largest value resolved
+    """
+
+    def __init__(self, shape, relative_accuracy=ENVELOPE_SKETCH_ACCURACY, min_value=1e-12, max_value=1e6):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be between 0 and 1")
+        self.shape = tuple(shape)
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = np.log(self.gamma)
+        self.min_value, self.max_value = float(min_value), float(max_value)
+        self._offset = int(np.ceil(np.log(self.min_value) / self._log_gamma))
+        n_buckets = int(np.ceil(np.log(self.max_value) / self._log_gamma)) - self._offset + 1
+        self.counts = np.zeros(self.shape + (n_buckets,), dtype=np.int32)
+        self.count = np.zeros(self.shape, dtype=np.int64)
+
+    @property
+    def n_buckets(self):
+        return self.counts.shape[-1]
+
+    def update(self, values):
+        """Add ``(n, *shape)`` observations (or a single one shaped ``shape``)."""
+        values = np.asarray(values, dtype=float)
+        if values.shape == self.shape:
+            values = values[np.newaxis]
+        if values.shape[1:] != self.shape:
+            raise ValueError(f"Expected observations shaped {self.shape}, got {values.shape[1:]}")
+        valid = ~np.isnan(values)
+        clipped = np.clip(np.where(valid, values, self.min_value), self.min_value, self.max_value)
+        buckets = np.ceil(np.log(clipped) / self._log_gamma).astype(np.int64) - self._offset
+        np.clip(buckets, 0, self.n_buckets - 1, out=buckets)
+        # One bincount over (cell, bucket) pairs for all observations at once
+        cells = np.broadcast_to(np.arange(int(np.prod(self.shape))).reshape(self.shape), values.shape)
+        flat = (cells * self.n_buckets + buckets)[valid]
+        self.counts += np.bincount(flat, minlength=self.counts.size).reshape(self.counts.shape)
+        self.count += valid.sum(axis=0)
+
+    def merge(self, other):
+        """Add the observations of another sketch with the same cells and buckets."""
+        if other.counts.shape != self.counts.shape or other.gamma != self.gamma:
+            raise ValueError("Sketches differ in shape or accuracy")
+        self.counts += other.counts
+        self.count += other.count
+        return self
+
+    def quantile(self, q):
+        """
+        Estimated ``q``-quantile (0..1) of every cell.
+
+        Returns:
+            numpy.ndarray: Shaped ``shape``; NaN for cells without observations
+        """
+        if not 0 <= q <= 1:
+            raise ValueError("q must be between 0 and 1")
+        cumulative = np.cumsum(self.counts, axis=-1)
+        # Lower order statistic of rank q * (n - 1), as numpy's "lower" method
+        rank = np.floor(q * (self.count - 1))
+        bucket = (cumulative > rank[..., np.newaxis]).argmax(axis=-1)
+        values = 2 * self.gamma ** (bucket + self._offset) / (self.gamma + 1)
+        return np.where(self.count > 0, values, np.nan)
@@ -0,0 +1,228 @@
+# vc_reports.py
+# Description: Indexed on-disk store for generated reports.
+
+"""
+Report storage for the Flask backend.
+
+Every report (or set of files, for batch runs) is saved in its own
+directory under a stable random id, and an in-memory index maps ids to
+directories, so ``/view/<id>/<file>`` is an O(1) lookup that always returns
+the report it was issued for, whatever other users are doing. The index is
+rebuilt from disk once at start-up. A background thread periodically
+evicts reports that have not been viewed for ``REPORT_RETENTION_SECONDS``
+and, least recently viewed first, anything over ``REPORT_STORE_MAX_BYTES``.
+"""
+
+import collections
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+
+from werkzeug.security import safe_join
+
+from .vc_config import (
+    REPORT_EVICTION_INTERVAL,
+    REPORT_RETENTION_SECONDS,
+    REPORT_STORE_DIR,
+    REPORT_STORE_MAX_BYTES,
+)
+
+REPORT_STORE_DIR_NAME = "VibeCheckPro_reports"
+
+_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+
+def default_store_dir():
+    """Return the configured report directory, falling back to the system temp dir."""
+    return REPORT_STORE_DIR or os.path.join(tempfile.gettempdir(), REPORT_STORE_DIR_NAME)
+
+
+def _dir_size(path):
+    total = 0
+    for dirpath, _, filenames in os.walk(path):
+        for name in filenames:
+            try:
+                total += os.path.getsize(os.path.join(dirpath, name))
+            except OSError:
+                pass
+    return total
+
+
+class ReportEntry:
+    """Index record for one stored report."""
+
+    __slots__ = ("id", "path", "size", "created", "accessed")
+
+    def __init__(self, report_id, path, size=0, created=None):
+        self.id = report_id
+        self.path = path
+        self.size = size
+        self.created = created or time.time()
+        self.accessed = self.created
+
+
+class ReportStore:
+    """
+    Reports saved under stable ids with an in-memory LRU index.
+
+    Args:
+        root (str): Directory holding one sub-directory per report
+        max_bytes (int): Total size above which the least recently viewed
+            reports are evicted
+        max_age (float): Seconds since the last view after which a report
+            is evicted
+    """
+
+    def __init__(self, root=None, max_bytes=REPORT_STORE_MAX_BYTES, max_age=REPORT_RETENTION_SECONDS):
+        self.root = root or default_store_dir()
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._index = collections.OrderedDict()  # least recently viewed first
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        os.makedirs(self.root, exist_ok=True)
+        self._load_index()
+
+    def _load_index(self):
+        """Rebuild the index from the report directories already on disk."""
+        entries = []
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            if _ID_PATTERN.match(name) and os.path.isdir(path):
+                mtime = os.path.getmtime(path)
+                entry = ReportEntry(name, path, _dir_size(path), created=mtime)
+                entries.append(entry)
+        for entry in sorted(entries, key=lambda e: e.accessed):
+            self._index[entry.id] = entry
+
+    def create(self):
+        """Reserve a new report id and directory; see :meth:`finalize`."""
+        report_id = uuid.uuid4().hex
+        path = os.path.join(self.root, report_id)
+        os.makedirs(path)
+        with self._lock:
+            self._index[report_id] = ReportEntry(report_id, path)
+        return report_id
+
+    def report_dir(self, report_id):
+        """Directory of a report, or None for unknown ids."""
+        with self._lock:
+            entry = self._index.get(report_id)
+        return entry.path if entry else None
+
+    def finalize(self, report_id):
+        """Record the size of a report whose files were written directly."""
+        path = self.report_dir(report_id)
+        if path is not None:
+            size = _dir_size(path)
+            with self._lock:
+                if report_id in self._index:
+                    self._index[report_id].size = size
+
+    def put(self, content, filename="report.html"):
+        """
+        Save a single-file report.
+
+        Args:
+            content (str or bytes): Report contents
+            filename (str): Name the report is served under
+
+        Returns:
+            str: The report id
+        """
+        report_id = self.create()
+        data = content.encode("utf-8") if isinstance(content, str) else content
+        with open(os.path.join(self.report_dir(report_id), filename), "wb") as f:
+            f.write(data)
+        with self._lock:
+            self._index[report_id].size = len(data)
+        return report_id
+
+    def path(self, report_id, filename):
+        """
+        Resolve a file of a stored report and mark the report as viewed.
+
+        Returns:
+            str or None: The file path, or None if the report or file does not exist
+        """
+        with self._lock:
+            entry = self._index.get(report_id)
+            if entry is None:
+                return None
+            entry.accessed = time.time()
+            self._index.move_to_end(report_id)
+        path = safe_join(entry.path, filename)
+        if path is None or not os.path.isfile(path):
+            return None
+        return path
+
+    def delete(self, report_id):
+        with self._lock:
+            entry = self._index.pop(report_id, None)
+        if entry is not None:
+            shutil.rmtree(entry.path, ignore_errors=True)
+        return entry is not None
+
+    def evict(self, now=None):
+        """
+        Remove expired reports, then the least recently viewed ones while
+        the store is over ``max_bytes``.
+
+        Returns:
+            int: Number of reports removed
+        """
+        now = now or time.time()
+        with self._lock:
+            expired = [e for e in self._index.values() if now - e.accessed > self.max_age]
+            for entry in expired:
+                del self._index[entry.id]
+            total = sum(e.size for e in self._index.values())
+            while total > self.max_bytes and self._index:
+                _, entry = self._index.popitem(last=False)
+                total -= entry.size
+                expired.append(entry)
+        for entry in expired:
+            shutil.rmtree(entry.path, ignore_errors=True)
+        return len(expired)
+
+    def start_eviction(self, interval=REPORT_EVICTION_INTERVAL):
+        """Run :meth:`evict` every ``interval`` seconds in a background thread."""
+        if self._thread is not None:
+            return
+        def run():
+            while not self._stop.wait(interval):
+                self.evict()
+        self.evict()
+        self._thread = threading.Thread(target=run, name="vibecheck-report-eviction", daemon=True)
+        self._thread.start()
+
+    def stop_eviction(self):
+        self._stop.set()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "reports": len(self._index),
+                "bytes": sum(e.size for e in self._index.values()),
+                "max_bytes": self.max_bytes,
+                "max_age": self.max_age,
+            }
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_report_store():
+    """Return the process-wide report store, starting periodic eviction on first use."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ReportStore()
+            _store.start_eviction()
+        return _store
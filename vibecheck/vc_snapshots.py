@@ -0,0 +1,243 @@
+# vc_snapshots.py
+# Description: Background PNG snapshot rendering for PDF reports.
+
+"""
+Off-request PNG rendering through a persistent Kaleido session.
+
+Writing each figure with ``fig.write_image`` inside the request pays the
+Kaleido/Chrome start-up cost per call. Instead, reports submit all their
+figures as one batch to a process-wide :class:`SnapshotRenderer`. Its single
+background thread keeps one Kaleido session open (with several tabs, so a
+batch renders in parallel) and reuses it across requests. Callers get a
+:class:`SnapshotBatch` back immediately and only wait on it when they
+actually need the PNGs, e.g. for the PDF report.
+
+Each batch renders into its own subdirectory of :func:`snapshot_dir`, so
+reports of files with the same name never overwrite each other's PNGs.
+The renderer keeps the ``SNAPSHOT_MAX_BATCHES`` most recent batches; older
+ones are dropped and their PNGs deleted.
+"""
+
+import asyncio
+import atexit
+import logging
+import os
+import queue
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from .vc_config import SNAPSHOT_HEIGHT_PX, SNAPSHOT_MAX_BATCHES, SNAPSHOT_RENDER_TABS, TEMP_PLOT_DIR_NAME
+from .vc_metrics import STAGE_METRIC, observe
+
+logger = logging.getLogger(__name__)
+
+
+def snapshot_dir():
+    """Directory holding rendered PNG snapshots."""
+    return os.path.join(tempfile.gettempdir(), TEMP_PLOT_DIR_NAME)
+
+
+def snapshot_path(ide_path, sensor_name, axis, batch_id):
+    """PNG path for one sensor axis of a recording, in the directory of batch ``batch_id``."""
+    stem = os.path.splitext(os.path.basename(ide_path))[0]
+    safe_name = sensor_name.replace(" ", "_")
+    return os.path.join(snapshot_dir(), batch_id, f"{stem}_{safe_name}_{axis}.png")
+
+
+class SnapshotBatch:
+    """All PNG snapshots of one report; completes when every figure is rendered."""
+
+    def __init__(self, specs, paths, directory):
+        self.specs = specs
+        self.paths = paths
+        self.directory = directory
+        self.error = None
+        self.started = None
+        self.evicted = False
+        self._done = threading.Event()
+
+    @property
+    def done(self):
+        return self._done.is_set()
+
+    def wait(self, timeout=None):
+        """
+        Block until the batch is rendered.
+
+        Returns:
+            list[str] or None: Paths of the PNGs that exist, or None on timeout
+        """
+        if not self._done.wait(timeout):
+            return None
+        return [p for p in self.paths if os.path.exists(p)]
+
+    def discard(self):
+        """Delete the batch's PNGs."""
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+def _kaleido_specs(batch):
+    """Kaleido render requests for every figure in a batch."""
+    from pathlib import Path
+    from .vc_plot_sensor_data import FIGURE_WIDTH_PX, spec_to_figure
+
+    opts = {"format": "png", "width": FIGURE_WIDTH_PX, "height": SNAPSHOT_HEIGHT_PX}
+    return [
+        {"fig": spec_to_figure(spec).to_dict(), "path": Path(path), "opts": opts}
+        for spec, path in zip(batch.specs, batch.paths)
+    ]
+
+
+class SnapshotRenderer:
+    """
+    Persistent renderer worker; one per process.
+
+    The worker thread owns a single Kaleido session (one Chrome with ``tabs``
+    tabs) for its whole lifetime, so only the first report pays the start-up
+    cost. If Kaleido cannot start (e.g. Chrome is not installed) every batch
+    completes with ``error`` set instead of blocking.
+
+    Args:
+        render_fn (callable): Optional ``render_fn(specs, paths, tabs)`` used
+            instead of Kaleido (e.g. in tests)
+        tabs (int): Figures rendered concurrently within a batch
+        max_batches (int): Batches kept for :meth:`batch_for`; the PNGs of
+            older ones are deleted
+    """
+
+    def __init__(self, render_fn=None, tabs=SNAPSHOT_RENDER_TABS, max_batches=SNAPSHOT_MAX_BATCHES):
+        self.render_fn = render_fn
+        self.tabs = tabs
+        self.max_batches = max_batches
+        self.unavailable = None
+        self._queue = queue.Queue()
+        self._batches = OrderedDict()
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._worker, name="vibecheck-snapshots", daemon=True)
+        self._thread.start()
+
+    def submit(self, specs, ide_path, key=None):
+        """
+        Queue every figure of a report for rendering and return immediately.
+
+        Args:
+            specs (list[dict]): Figure specs of the report
+            ide_path (str): Recording the report is of; names the PNGs
+            key (str): Key for :meth:`batch_for`; defaults to the absolute
+                path of ``ide_path``. Uploads held in memory, whose name
+                is not a path, pass a key of their own.
+        """
+        batch_id = uuid.uuid4().hex
+        paths = [snapshot_path(ide_path, spec["name"], spec["axis"], batch_id) for spec in specs]
+        batch = SnapshotBatch(specs, paths, os.path.join(snapshot_dir(), batch_id))
+        key = key or os.path.abspath(ide_path)
+        with self._lock:
+            replaced = self._batches.pop(key, None)
+            self._batches[key] = batch
+            evicted = [self._batches.popitem(last=False)[1]
+                       for _ in range(max(0, len(self._batches) - self.max_batches))]
+        for old in ([replaced] if replaced else []) + evicted:
+            self._evict(old)
+        self._queue.put(batch)
+        return batch
+
+    def batch_for(self, ide_path):
+        """Most recent batch submitted for ``ide_path``, if any."""
+        with self._lock:
+            return self._batches.get(os.path.abspath(ide_path))
+
+    def release(self, ide_path):
+        """Forget the batch of ``ide_path`` and delete its PNGs once they are rendered."""
+        with self._lock:
+            batch = self._batches.pop(os.path.abspath(ide_path), None)
+        if batch is not None:
+            self._evict(batch)
+
+    def _evict(self, batch):
+        # A batch still rendering is deleted by the worker once it is done
+        with self._lock:
+            batch.evicted = True
+            done = batch.done
+        if done:
+            batch.discard()
+
+    def shutdown(self, timeout=5):
+        """Stop the worker, close the Kaleido session and delete the PNGs."""
+        self._queue.put(None)
+        self._thread.join(timeout)
+        with self._lock:
+            batches = list(self._batches.values())
+            self._batches.clear()
+        for batch in batches:
+            self._evict(batch)
+
+    def _next_batch(self):
+        batch = self._queue.get()
+        if batch is not None:
+            os.makedirs(batch.directory, exist_ok=True)
+            batch.started = time.perf_counter()
+        return batch
+
+    def _finish(self, batch, error=None):
+        if error:
+            batch.error = error
+            logger.warning(f"Failed to render PNG snapshots: {error}")
+        else:
+            observe(STAGE_METRIC, time.perf_counter() - batch.started, stage="write_image")
+        with self._lock:
+            batch._done.set()
+            evicted = batch.evicted
+        if evicted:
+            batch.discard()
+        self._queue.task_done()
+
+    def _worker(self):
+        if self.render_fn is None:
+            asyncio.run(self._kaleido_worker())
+            return
+        while (batch := self._next_batch()) is not None:
+            try:
+                self.render_fn(batch.specs, batch.paths, self.tabs)
+                self._finish(batch)
+            except Exception as e:
+                self._finish(batch, str(e))
+
+    async def _kaleido_worker(self):
+        try:
+            import kaleido
+            async with kaleido.Kaleido(n=self.tabs) as k:
+                while (batch := await asyncio.to_thread(self._next_batch)) is not None:
+                    try:
+                        errors = await k.write_fig_from_object(_kaleido_specs(batch))
+                        self._finish(batch, "; ".join(str(e) for e in errors or ()) or None)
+                    except Exception as e:
+                        self._finish(batch, str(e))
+        except Exception as e:
+            self.unavailable = str(e)
+            logger.warning(f"PNG snapshots disabled, Kaleido could not start: {e}")
+            while (batch := self._next_batch()) is not None:
+                self._finish(batch, self.unavailable)
+
+
+_renderer = None
+_renderer_lock = threading.Lock()
+
+
+def get_snapshot_renderer():
+    """Return the process-wide renderer, starting its worker on first use."""
+    global _renderer
+    with _renderer_lock:
+        if _renderer is None:
+            _renderer = SnapshotRenderer()
+            atexit.register(_renderer.shutdown)
+        return _renderer
+
+
+def peek_snapshot_renderer():
+    """Return the process-wide renderer if it has been started, without starting it."""
+    with _renderer_lock:
+        return _renderer
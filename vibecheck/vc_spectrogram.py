@@ -0,0 +1,360 @@
+# vc_spectrogram.py
+# Description: VC curves and VC class per time window across a recording.
+
+"""
+Time-windowed VC analysis.
+
+``analyze_endaq`` gives one VC curve per channel for the whole recording,
+which averages intermittent events (a forklift passing, HVAC cycling) into
+the background. :func:`vc_spectrogram` cuts every channel into consecutive
+windows of ``SPECTROGRAM_WINDOW_SECONDS`` and computes, per window, the
+Welch PSD (same parameters as the whole-file analysis), the VC curves, the
+peak velocity of each axis over ``PLOT_FREQ_RANGE`` and the VC class of the
+window: the lowest level all its axes pass, as ``vc_generate_pdf`` does
+for a whole file.
+
+Windows are laid out on the recording's time axis from its first sample;
+a trailing partial window is dropped. The segments of several windows are
+transformed together in one batched FFT and summed per window with
+``np.add.reduceat``, and each channel is split into runs of windows that
+are analysed in parallel worker processes. A worker reads only its own
+time range: from the columnar sidecar, or from the IDE file through the
+time-window pushdown of ``IDEChannelSource``. Channels are not decimated
+(``ANALYSIS_DECIMATE``): each window is analysed at the native rate.
+"""
+
+import argparse
+import logging
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from .vc_config import (
+    ANALYSIS_BIN_WIDTH,
+    ANALYSIS_FSTART,
+    ANALYSIS_OCTAVE_BINS,
+    COLUMNAR_ENABLED,
+    NUM_WORKERS,
+    PLOT_FREQ_RANGE,
+    SPECTROGRAM_WINDOW_SECONDS,
+    VC_THRESHOLDS,
+)
+from .vc_fftplans import get_plan_cache
+from .vc_metrics import capture, record, stage
+from .vc_octave import vc_curves_array
+from .vc_psd import SEGMENT_BATCH_BYTES, segment_power, welch_density
+
+logger = logging.getLogger(__name__)
+
+
+class VCSpectrogram:
+    """
+    VC curves per time window of one channel.
+
+    Attributes:
+        name (str): Channel name
+        axes (list[str]): Short axis names (``"X"``, ...)
+        start_ns (int): Time of the first sample of the first window (nanoseconds)
+        window_seconds (float): Window length
+        times (numpy.ndarray): Window start times, seconds after ``start_ns``
+        centers (numpy.ndarray): Band centre frequencies (Hz)
+        curves (numpy.ndarray): ``(windows, bands, axes)`` VC curves; NaN for a
+            window too short (e.g. a gap in the recording) for one Welch segment
+        peaks (numpy.ndarray): ``(windows, axes)`` peak velocity over ``freq_range``
+        vc_class (numpy.ndarray): VC class per window, None where none is passed
+    """
+
+    def __init__(self, name, axes, start_ns, window_seconds, centers, curves,
+                 freq_range=PLOT_FREQ_RANGE, thresholds=VC_THRESHOLDS):
+        from .vc_generate_pdf import classify_vc
+
+        self.name = name
+        self.axes = list(axes)
+        self.start_ns = start_ns
+        self.window_seconds = window_seconds
+        self.times = np.arange(len(curves)) * window_seconds
+        self.centers = centers
+        self.curves = curves
+        in_range = (centers >= freq_range[0]) & (centers <= freq_range[1])
+        with np.errstate(invalid="ignore"):
+            self.peaks = curves[:, in_range, :].max(axis=1) if in_range.any() else \
+                np.full((len(curves), len(self.axes)), np.nan)
+        # A window passes a level when all its axes do (vc_generate_pdf._lowest_vc_passed)
+        self.vc_class = classify_vc(self.peaks.max(axis=1), thresholds)
+
+    def summary(self):
+        """Peak per axis and VC class per window, indexed by window start (s)."""
+        df = pd.DataFrame(self.peaks, index=pd.Index(self.times, name="window start (s)"), columns=self.axes)
+        df["vc_class"] = self.vc_class
+        return df
+
+
+def _window_bounds(reader, edges_ns):
+    """Index of the first sample at or after each edge."""
+    return np.array([reader.index_after(t - 1) for t in edges_ns])
+
+
+def iter_window_vc_curves(reader, edges_ns, sample_rate, bin_width=ANALYSIS_BIN_WIDTH, fstart=ANALYSIS_FSTART,
+                          octave_bins=ANALYSIS_OCTAVE_BINS):
+    """
+    VC curves of consecutive time windows of one channel, a batch of windows at a time.
+
+    Args:
+        reader: Channel reader (see ``vc_psd``)
+        edges_ns (list[int]): Window edges in nanoseconds; window ``k`` holds the
+            samples from ``edges_ns[k]`` up to (excluding) ``edges_ns[k + 1]``
+        sample_rate (float): Sample rate of the whole channel, so that every run
+            of windows shares one frequency grid
+
+    Yields:
+        tuple: ``(windows, curves, centers)``: indices of the windows in the batch
+        and their ``(windows, bands, axes)`` curves. Windows too short for one
+        Welch segment are left out.
+    """
+    plan = get_plan_cache().welch_plan(int(sample_rate / bin_width), "hann")
+    nperseg = plan.nperseg
+    step = nperseg - nperseg // 2
+    n_axes = len(reader.columns)
+    freqs = np.fft.rfftfreq(nperseg, 1.0 / sample_rate)
+
+    bounds = _window_bounds(reader, edges_ns)
+    lengths = np.diff(bounds)
+    counts = np.where(lengths >= nperseg, (lengths - nperseg) // step + 1, 0)
+    n_windows = len(lengths)
+    # Complex FFT output dominates: 16 bytes per bin per axis per segment
+    batch_segments = max(1, SEGMENT_BATCH_BYTES // (16 * n_axes * nperseg))
+
+    k = 0
+    while k < n_windows:
+        # Windows k..m-1 share one read and one FFT batch
+        m, n_seg = k + 1, counts[k]
+        while m < n_windows and n_seg + counts[m] <= batch_segments:
+            n_seg += counts[m]
+            m += 1
+        if n_seg:
+            with stage("ide_decode"):
+                data = np.concatenate(list(reader.iter_blocks(start=bounds[k], stop=bounds[m])), axis=0)
+            with stage("welch"):
+                # Axis-major copy, so every segment is contiguous for the FFT
+                data = np.ascontiguousarray(data.T)
+                starts = np.concatenate([bounds[w] - bounds[k] + step * np.arange(counts[w]) for w in range(k, m)])
+                segments = np.lib.stride_tricks.sliding_window_view(data, nperseg, axis=1)[:, starts]
+                power = segment_power(segments.transpose(1, 0, 2), plan.window)
+                # Sum each window's segments: (windows with data, axes, freqs)
+                offsets = np.concatenate([[0], np.cumsum(counts[k:m][counts[k:m] > 0])[:-1]])
+                mean = np.add.reduceat(power, offsets, axis=0) / counts[k:m][counts[k:m] > 0, None, None]
+                psd = welch_density(mean, sample_rate, plan.window_power, nperseg, axis=-1)
+            with stage("vc_curves"):
+                batch, centers = vc_curves_array(psd, freqs, fstart, octave_bins)
+            yield np.arange(k, m)[counts[k:m] > 0], batch.transpose(0, 2, 1), centers
+        k = m
+
+
+def _band_centers(sample_rate, bin_width, fstart, octave_bins):
+    freqs = np.fft.rfftfreq(int(sample_rate / bin_width), 1.0 / sample_rate)
+    return vc_curves_array(np.zeros((1, len(freqs))), freqs, fstart, octave_bins)[1]
+
+
+def window_vc_curves(reader, edges_ns, sample_rate, bin_width=ANALYSIS_BIN_WIDTH, fstart=ANALYSIS_FSTART,
+                     octave_bins=ANALYSIS_OCTAVE_BINS):
+    """
+    VC curves of consecutive time windows of one channel (see :func:`iter_window_vc_curves`).
+
+    Returns:
+        tuple: ``(curves, centers)``, ``curves`` shaped ``(windows, bands, axes)``,
+        NaN for windows too short for one Welch segment
+    """
+    centers = _band_centers(sample_rate, bin_width, fstart, octave_bins)
+    curves = np.full((len(edges_ns) - 1, len(centers), len(reader.columns)), np.nan)
+    for windows, batch, _ in iter_window_vc_curves(reader, edges_ns, sample_rate, bin_width, fstart,
+                                                   octave_bins):
+        curves[windows] = batch
+    return curves, centers
+
+
+def channel_envelopes(reader, params, window_seconds=SPECTROGRAM_WINDOW_SECONDS):
+    """
+    Percentile envelopes of a channel's VC curves across time windows.
+
+    Every window's curves go into a :class:`~vibecheck.vc_quantiles.QuantileSketch`
+    as they are computed, so memory does not grow with the recording.
+
+    Args:
+        reader: Channel reader (see ``vc_psd``)
+        params (dict): Analysis parameters with an ``"envelopes"`` entry holding
+            the exceedance ``levels`` (percent) and the sketch ``accuracy``
+
+    Returns:
+        pandas.DataFrame: Indexed by band centre, one column per axis and
+        level, e.g. ``"Z L10"`` (the level exceeded in 10 % of the windows);
+        None if the channel is shorter than one window
+    """
+    from .vc_quantiles import QuantileSketch
+
+    try:
+        edges = _plan_windows(reader, window_seconds)
+    except ValueError as e:
+        logger.warning("No envelopes: %s", e)
+        return None
+    sample_rate = reader.sample_rate
+    centers = _band_centers(sample_rate, params["bin_width"], params["fstart"], params["octave_bins"])
+    sketch = QuantileSketch((len(centers), len(reader.columns)), params["envelopes"]["accuracy"])
+    for _, batch, _ in iter_window_vc_curves(reader, edges, sample_rate, params["bin_width"], params["fstart"],
+                                             params["octave_bins"]):
+        sketch.update(batch)
+    axes = [c.split()[0] for c in reader.columns]
+    columns, values = [], []
+    for level in params["envelopes"]["levels"]:
+        columns += [f"{ax} L{level:g}" for ax in axes]
+        values.append(sketch.quantile(1 - level / 100))
+    return pd.DataFrame(np.concatenate(values, axis=1), index=pd.Series(centers, name="frequency (Hz)"),
+                        columns=columns)
+
+
+def _analyze_windows(source, edges_ns, sample_rate, params):
+    """Process-pool entry point: VC curves of one run of windows of one channel."""
+    with capture() as metrics:
+        with stage("ide_parse"):
+            reader = source.open()
+        curves, centers = window_vc_curves(reader, edges_ns, sample_rate, params["bin_width"], params["fstart"],
+                                           params["octave_bins"])
+    return curves, centers, metrics
+
+
+def _plan_windows(reader, window_seconds):
+    """Window edges (nanoseconds) of the whole windows of a channel."""
+    window_ns = int(round(window_seconds * 1e9))
+    start_ns = reader.timestamp_ns(0)
+    # The last sample's period counts towards the recording's length
+    end_ns = reader.timestamp_ns(reader.n_samples - 1) + int(round(1e9 / reader.sample_rate))
+    n_windows = (end_ns - start_ns) // window_ns
+    if n_windows < 1:
+        raise ValueError(f"{reader.name} is shorter than one {window_seconds:g} s window")
+    return start_ns + window_ns * np.arange(n_windows + 1, dtype=np.int64)
+
+
+def vc_spectrogram(file_path, window_seconds=SPECTROGRAM_WINDOW_SECONDS, workers=NUM_WORKERS,
+                   columnar=COLUMNAR_ENABLED, status_callback=None, start=None, end=None, axes=None,
+                   channels=None):
+    """
+    VC curves and VC class per ``window_seconds`` window of every acceleration channel.
+
+    ``file_path``, ``columnar`` and the selection (``start``, ``end``,
+    ``axes``, ``channels``) are as for ``analyze_endaq``. Each channel's
+    windows are split into runs analysed by up to ``workers`` processes.
+
+    Returns:
+        list[VCSpectrogram]: One per channel; None for channels not selected
+        and, with a warning, for channels shorter than one window
+
+    Raises:
+        ValueError: If no selected channel is at least one window long
+    """
+    from .vc_analyzer_endaq import (
+        analysis_params,
+        analysis_selection,
+        channel_sources,
+        describe_source,
+        is_in_memory,
+    )
+
+    if window_seconds * ANALYSIS_BIN_WIDTH < 1:
+        raise ValueError(f"Windows must be at least {1 / ANALYSIS_BIN_WIDTH:g} s long "
+                         f"(one Welch segment at {ANALYSIS_BIN_WIDTH:g} Hz resolution)")
+    params = analysis_params(decimate=False)
+    selection = analysis_selection(start, end, axes, channels)
+    all_sources = channel_sources(file_path, columnar, selection)
+    if not any(source is not None for source in all_sources):
+        raise ValueError(f"No acceleration channel to analyse in {describe_source(file_path)}")
+
+    # Lay out the windows of every channel
+    plans = {}
+    with stage("ide_parse"):
+        for i, source in enumerate(all_sources):
+            if source is None:
+                continue
+            reader = source.open()
+            try:
+                plans[i] = (source, reader, _plan_windows(reader, window_seconds))
+            except ValueError as e:
+                logger.warning("No spectrogram: %s", e)
+    if not plans:
+        raise ValueError(f"No channel of {describe_source(file_path)} is longer than one "
+                         f"{window_seconds:g} s window")
+
+    workers = 1 if is_in_memory(file_path) else min(workers or 1, os.cpu_count() or 1)
+    tasks = []
+    for i, (source, reader, edges) in plans.items():
+        n_runs = min(workers, len(edges) - 1)
+        for run in np.array_split(np.arange(len(edges) - 1), n_runs):
+            if len(run):
+                tasks.append((i, run[0], edges[run[0]:run[-1] + 2]))
+
+    results = {}
+
+    def report():
+        if status_callback:
+            status_callback("progress", f"Analyzed {len(results)} of {len(tasks)} window runs",
+                            progress=len(results) / len(tasks))
+
+    if workers <= 1:
+        for i, first, edges in tasks:
+            _, reader, _ = plans[i]
+            with capture() as metrics:
+                results[i, first] = window_vc_curves(reader, edges, reader.sample_rate, params["bin_width"],
+                                                     params["fstart"], params["octave_bins"])
+            record(metrics)
+            report()
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+            futures = {pool.submit(_analyze_windows, plans[i][0].time_window(int(edges[0]), int(edges[-1]) - 1),
+                                   edges, plans[i][1].sample_rate, params): (i, first)
+                       for i, first, edges in tasks}
+            for future in as_completed(futures):
+                curves, centers, metrics = future.result()
+                record(metrics)
+                results[futures[future]] = (curves, centers)
+                report()
+
+    spectrograms = [None] * len(all_sources)
+    for i, (source, reader, edges) in plans.items():
+        runs = sorted((first, value) for (j, first), value in results.items() if j == i)
+        curves = np.concatenate([curves for _, (curves, _) in runs], axis=0)
+        centers = runs[0][1][1]
+        axes = [c.split()[0] for c in reader.columns]
+        spectrograms[i] = VCSpectrogram(reader.name, axes, int(edges[0]), window_seconds, centers, curves)
+    return spectrograms
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="VC class per time window of an enDAQ .IDE file.")
+    parser.add_argument("ide_file", help="Path to the .IDE input file")
+    parser.add_argument("-w", "--window", type=float, default=SPECTROGRAM_WINDOW_SECONDS,
+                        help="Window length in seconds")
+    parser.add_argument("-j", "--workers", type=int, default=NUM_WORKERS, help="Worker processes")
+    parser.add_argument("-o", "--output", help="Also save the spectrograms to this .npz file")
+    args = parser.parse_args(argv)
+    try:
+        spectrograms = vc_spectrogram(args.ide_file, args.window, workers=args.workers)
+    except (OSError, ValueError) as e:
+        print(str(e), file=sys.stderr)
+        return 1
+    arrays = {}
+    for i, spec in enumerate(spectrograms):
+        if spec is None:
+            continue
+        print(f"{spec.name}:")
+        print(spec.summary().to_string())
+        arrays.update({f"curves_{i}": spec.curves, f"centers_{i}": spec.centers, f"times_{i}": spec.times,
+                       f"vc_class_{i}": spec.vc_class.astype(str)})
+    if args.output:
+        np.savez_compressed(args.output, **arrays)
+        print(f"Spectrograms saved to: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
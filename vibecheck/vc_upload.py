@@ -0,0 +1,75 @@
+# vc_upload.py
+# Description: Upload buffering for the Flask backend.
+
+"""
+Single-write handling of IDE uploads.
+
+Werkzeug normally parses an upload into its own spooled temporary file,
+after which ``FileStorage.save`` copies it to disk a second time. With
+:class:`UploadRequest` installed as the app's request class, the multipart
+parser writes each upload directly into the buffer it will be analysed
+from:
+
+* uploads up to ``UPLOAD_MEMORY_MAX_BYTES`` go to an in-memory ``BytesIO``
+  and are handed to the analysis as bytes (see :func:`upload_source`);
+* larger ones go to a named spool file (written exactly once) whose path
+  the IDE reader and worker processes open in place.
+
+Spool files are removed when the request closes.
+"""
+
+import io
+import os
+import tempfile
+
+from flask import Request
+
+from .vc_config import UPLOAD_MEMORY_MAX_BYTES, UPLOAD_SPOOL_DIR
+
+# Name prefix of the spool files of large uploads
+SPOOL_PREFIX = "VibeCheckPro_upload_"
+
+
+class UploadRequest(Request):
+    """Flask request that parses file uploads into analysable buffers."""
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        if total_content_length is not None and total_content_length <= UPLOAD_MEMORY_MAX_BYTES:
+            return io.BytesIO()
+        spool = tempfile.NamedTemporaryFile(prefix=SPOOL_PREFIX, suffix=".IDE", dir=UPLOAD_SPOOL_DIR,
+                                            delete=False)
+        self.__dict__.setdefault("_spool_paths", []).append(spool.name)
+        return spool
+
+    def close(self):
+        super().close()
+        for path in self.__dict__.pop("_spool_paths", []):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def upload_source(file):
+    """
+    Return what ``analyze_endaq`` should read for an uploaded file.
+
+    Args:
+        file (werkzeug.datastructures.FileStorage): The upload
+
+    Returns:
+        bytes or str: The contents for in-memory uploads, else the spool path
+    """
+    stream = file.stream
+    if isinstance(stream, io.BytesIO):
+        # CPython hands back the BytesIO's own bytes object here (trimmed in
+        # place) rather than copying it. getbuffer() would avoid even that,
+        # but its export pins the buffer and makes the request's close() raise.
+        return stream.getvalue()
+    name = getattr(stream, "name", None)
+    if isinstance(name, str) and os.path.isfile(name):
+        stream.flush()
+        return name
+    # Some other stream (e.g. a test client passing a file object): read it
+    stream.seek(0)
+    return stream.read()
@@ -1,15 +1,20 @@
 # vc_utils.py
 # Description: Utility functions for the VC Analyzer.
 
+import atexit
 import datetime as dt
+import logging
 import os
 import re
 import traceback
 import sys
 import tempfile
 import shutil
+import threading
 from pathlib import Path
 
+from .vc_logging import AsyncFileLog
+
 # --- Define AppName for consistency (matches vc_analyzer_endaq.py) ---
 APP_NAME = "VibeCheckPro"
 
@@ -54,63 +59,166 @@ def clear_file_size_cache():
     global _file_size_cache
     _file_size_cache.clear()
 
-# Global variable to store the temporary log file path
-_temp_log_file = None
+# The temporary log is written by a background thread through one open file
+# handle (see vc_logging); these functions only queue records.
+_temp_log = None
+_temp_log_lock = threading.Lock()
 
-def _get_temp_log_file():
-    """Get or create the temporary log file path."""
-    global _temp_log_file
-    if _temp_log_file is None:
+# Level names accepted by _write_to_temp_log; anything else is logged as INFO
+_TEMP_LOG_LEVELS = {
+    "DEBUG": logging.DEBUG,
+    "INFO": logging.INFO,
+    "WARNING": logging.WARNING,
+    "WARN": logging.WARNING,
+    "ERROR": logging.ERROR,
+    "CRITICAL": logging.CRITICAL,
+}
+
+class _TempLogFormatter(logging.Formatter):
+    """``[time] [LEVEL] message`` lines; blocks logged with ``raw`` are written as is."""
+
+    def __init__(self):
+        super().__init__("[%(asctime)s] [%(levelname)s] %(message)s", datefmt="%Y-%m-%d %H:%M:%S")
+
+    def format(self, record):
+        if getattr(record, "raw", False):
+            return record.getMessage()
+        return super().format(record)
+
+def _open_temp_log(path=None, mode="a"):
+    """Start the temporary log (a new temp file unless ``path`` is given)."""
+    global _temp_log
+    if path is None:
         fd, path = tempfile.mkstemp(suffix='.txt', prefix='vibecheck_temp_')
         os.close(fd)
-        _temp_log_file = path
-    return _temp_log_file
+    _close_temp_log()
+    _temp_log = AsyncFileLog(path, _TempLogFormatter(), mode=mode)
+    return _temp_log
+
+@atexit.register
+def _close_temp_log():
+    # Also run at exit, so records still queued reach the file
+    global _temp_log
+    if _temp_log is not None:
+        _temp_log.close()
+        _temp_log = None
+
+def _current_temp_log():
+    with _temp_log_lock:
+        return _temp_log or _open_temp_log()
+
+def _get_temp_log_file():
+    """Get or create the temporary log file path."""
+    return _current_temp_log().path
 
 def _write_to_temp_log(message, level="INFO"):
-    """Write a message to the temporary log file."""
+    """Queue a message for the temporary log file."""
     try:
-        log_file = _get_temp_log_file()
-        timestamp = dt.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        with open(log_file, "a") as f:
-            f.write(f"[{timestamp}] [{level}] {message}\n")
+        _current_temp_log().log(_TEMP_LOG_LEVELS.get(str(level).upper(), logging.INFO), "%s", message)
     except Exception as e:
         print(f"Failed to write to temp log: {str(e)}")
 
-def save_temp_log_to_desktop():
-    """Save the temporary log file to the desktop."""
+def log_error_to_file(error_message, traceback_str, error_type, program_state=None):
+    """
+    Log an error report to the temporary log file.
+
+    The report is on disk when this returns, ready for :func:`save_temp_log_to_desktop`.
+
+    Returns:
+        str: Path of the temporary log file, or None on failure
+    """
     try:
-        if _temp_log_file and os.path.exists(_temp_log_file):
-            desktop_path = os.path.join(os.path.expanduser("~"), "Desktop")
-            final_path = os.path.join(desktop_path, "vibecheck_error.txt")
-            
-            # Read the temp file content
-            with open(_temp_log_file, 'r') as f:
-                content = f.read()
-            
-            # Write to desktop with additional formatting
-            with open(final_path, 'w') as f:
-                f.write(f"{'='*50}\n")
-                f.write(f"VibeCheck Pro Error Report\n")
-                f.write(f"{'='*50}\n\n")
-                f.write(content)
-                f.write(f"\n{'='*50}\n")
-            
-            # Clean up temp file
-            os.remove(_temp_log_file)
-            return final_path
+        lines = ["", "=" * 50, f"Error Type: {error_type}", f"Error Message: {error_message}"]
+        if program_state:
+            lines += [
+                "",
+                "Program State:",
+                f"Start Time: {program_state.get('start_time', 'N/A')}",
+                f"Error Time: {program_state.get('error_time', 'N/A')}",
+                f"Input Files: {', '.join(program_state.get('input_files', []))}",
+                f"Output Directory: {program_state.get('output_dir', 'N/A')}",
+                f"Location/Tool: {program_state.get('location_tool', 'N/A')}",
+                "",
+                "Progress Messages:",
+            ]
+            for msg in program_state.get('progress_messages', []):
+                line = f"[{msg['timestamp']}] {msg['type']}: {msg['message']}"
+                if msg['detail']:
+                    line += f" (Detail: {msg['detail']})"
+                if msg['progress'] is not None:
+                    line += f" [Progress: {msg['progress']*100:.0f}%]"
+                lines.append(line)
+        lines += ["", f"Traceback:\n{traceback_str}", "=" * 50]
+
+        temp_log = _current_temp_log()
+        temp_log.log(logging.ERROR, "%s", "\n".join(lines), extra={"raw": True})
+        temp_log.flush()
+        return temp_log.path
     except Exception as e:
-        print(f"Failed to save log to desktop: {str(e)}")
+        print(f"Failed to write error log: {str(e)}")
+        return None
+
+def create_temp_log():
+    """
+    Start a new temporary log file for storing error information.
+
+    Returns:
+        str: Path to the created temporary log file
+    """
+    try:
+        timestamp = dt.datetime.now().strftime("%Y%m%d_%H%M%S")
+        path = os.path.join(tempfile.gettempdir(), f"vibecheck_temp_log_{timestamp}.txt")
+        with _temp_log_lock:
+            temp_log = _open_temp_log(path, mode="w")
+        header = (f"VibeCheck Pro Temporary Log\n"
+                  f"Created: {dt.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n" + "=" * 50 + "\n")
+        temp_log.log(logging.INFO, "%s", header, extra={"raw": True})
+        return path
+    except Exception as e:
+        print(f"Error creating temporary log: {str(e)}")
         return None
 
 def cleanup_temp_log():
-    """Clean up the temporary log file if it exists."""
-    global _temp_log_file
+    """
+    Remove the temporary log file if it exists.
+    This should be called when the application closes or when starting a new analysis.
+    """
+    with _temp_log_lock:
+        path = _temp_log.path if _temp_log is not None else None
+        _close_temp_log()
+    if path and os.path.exists(path):
+        try:
+            os.remove(path)
+        except Exception as e:
+            print(f"Error removing temporary log: {str(e)}")
+
+def save_temp_log_to_desktop():
+    """
+    Save the temporary log file to the user's desktop.
+    This is used when an error occurs and the user wants to save the error information.
+
+    Returns:
+        str: Path to the saved log file, or None if the operation failed
+    """
+    temp_log = _temp_log
+    if temp_log is None or not os.path.exists(temp_log.path):
+        return None
+
     try:
-        if _temp_log_file and os.path.exists(_temp_log_file):
-            os.remove(_temp_log_file)
-            _temp_log_file = None
+        # Get desktop path
+        desktop_path = os.path.join(os.path.expanduser("~"), "Desktop")
+        if not os.path.exists(desktop_path):
+            return None
+
+        # Copy what has been logged so far
+        temp_log.flush()
+        timestamp = dt.datetime.now().strftime("%Y%m%d_%H%M%S")
+        dest_path = os.path.join(desktop_path, f"vibecheck_error_{timestamp}.txt")
+        shutil.copy2(temp_log.path, dest_path)
+        return dest_path
     except Exception as e:
-        print(f"Failed to cleanup temp log: {str(e)}")
+        print(f"Error saving temporary log to desktop: {str(e)}")
+        return None
 
 def _default_status_callback(message_type, message, detail=None, progress=None):
     """Default callback for status updates (prints to console)."""
@@ -121,6 +229,27 @@ def _default_status_callback(message_type, message, detail=None, progress=None):
         log_msg += f" [Progress: {progress*100:.0f}%]"
     print(log_msg)
 
+def scaled_status_callback(status_callback, start, end):
+    """
+    Wrap a status callback so a sub-task's 0-1 progress maps onto ``start``-``end``.
+
+    Args:
+        status_callback (callable): Callback with the ``_default_status_callback`` signature, or None
+        start (float): Overall progress when the sub-task begins
+        end (float): Overall progress when the sub-task completes
+
+    Returns:
+        callable or None: The wrapped callback (None if ``status_callback`` is None)
+    """
+    if status_callback is None:
+        return None
+
+    def callback(message_type, message, detail=None, progress=None):
+        if progress is not None:
+            progress = start + (end - start) * progress
+        status_callback(message_type, message, detail=detail, progress=progress)
+    return callback
+
 def extract_datetime_from_filename(filename):
     """
     Extracts datetime object from filename using various common patterns.
@@ -155,42 +284,6 @@ def extract_datetime_from_filename(filename):
                 continue
     return None # Return None if no pattern matches
 
-def log_error_to_file(error_message, traceback_str, error_type, program_state=None):
-    """Logs an error to the temporary log file."""
-    try:
-        log_file = _get_temp_log_file()
-        timestamp = dt.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        
-        with open(log_file, "a") as f:
-            f.write(f"\n{'='*50}\n")
-            f.write(f"Error Type: {error_type}\n")
-            f.write(f"Error Message: {error_message}\n")
-            
-            if program_state:
-                f.write("\nProgram State:\n")
-                f.write(f"Start Time: {program_state.get('start_time', 'N/A')}\n")
-                f.write(f"Error Time: {program_state.get('error_time', 'N/A')}\n")
-                f.write(f"Input Files: {', '.join(program_state.get('input_files', []))}\n")
-                f.write(f"Output Directory: {program_state.get('output_dir', 'N/A')}\n")
-                f.write(f"Location/Tool: {program_state.get('location_tool', 'N/A')}\n")
-                
-                f.write("\nProgress Messages:\n")
-                for msg in program_state.get('progress_messages', []):
-                    f.write(f"[{msg['timestamp']}] {msg['type']}: {msg['message']}")
-                    if msg['detail']:
-                        f.write(f" (Detail: {msg['detail']})")
-                    if msg['progress'] is not None:
-                        f.write(f" [Progress: {msg['progress']*100:.0f}%]")
-                    f.write("\n")
-            
-            f.write(f"\nTraceback:\n{traceback_str}\n")
-            f.write(f"{'='*50}\n")
-            
-        return log_file
-    except Exception as e:
-        print(f"Failed to write error log: {str(e)}")
-        return None
-
 def resource_path(relative_path):
     """
     Get the absolute path to a resource file.
@@ -208,70 +301,3 @@ def resource_path(relative_path):
     except Exception:
         base_path = os.path.abspath(".")
     return os.path.join(base_path, relative_path)
-
-def create_temp_log():
-    """
-    Create a temporary log file for storing error information.
-    
-    Returns:
-        str: Path to the created temporary log file
-    """
-    global _temp_log_file
-    try:
-        # Create a temporary file that will be automatically deleted when closed
-        temp_dir = tempfile.gettempdir()
-        timestamp = dt.datetime.now().strftime("%Y%m%d_%H%M%S")
-        _temp_log_file = os.path.join(temp_dir, f"vibecheck_temp_log_{timestamp}.txt")
-        
-        # Create the file and write initial information
-        with open(_temp_log_file, 'w', encoding='utf-8') as f:
-            f.write(f"VibeCheck Pro Temporary Log\n")
-            f.write(f"Created: {dt.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write("=" * 50 + "\n\n")
-            
-        return _temp_log_file
-    except Exception as e:
-        print(f"Error creating temporary log: {str(e)}")
-        return None
-
-def cleanup_temp_log():
-    """
-    Remove the temporary log file if it exists.
-    This should be called when the application closes or when starting a new analysis.
-    """
-    global _temp_log_file
-    if _temp_log_file and os.path.exists(_temp_log_file):
-        try:
-            os.remove(_temp_log_file)
-            _temp_log_file = None
-        except Exception as e:
-            print(f"Error removing temporary log: {str(e)}")
-
-def save_temp_log_to_desktop():
-    """
-    Save the temporary log file to the user's desktop.
-    This is used when an error occurs and the user wants to save the error information.
-    
-    Returns:
-        str: Path to the saved log file, or None if the operation failed
-    """
-    global _temp_log_file
-    if not _temp_log_file or not os.path.exists(_temp_log_file):
-        return None
-        
-    try:
-        # Get desktop path
-        desktop_path = os.path.join(os.path.expanduser("~"), "Desktop")
-        if not os.path.exists(desktop_path):
-            return None
-            
-        # Create the destination file path
-        timestamp = dt.datetime.now().strftime("%Y%m%d_%H%M%S")
-        dest_path = os.path.join(desktop_path, f"vibecheck_error_{timestamp}.txt")
-        
-        # Copy the file
-        shutil.copy2(_temp_log_file, dest_path)
-        return dest_path
-    except Exception as e:
-        print(f"Error saving temporary log to desktop: {str(e)}")
-        return None
\ No newline at end of file